@@ -0,0 +1,283 @@
+#!/usr/bin/python3 -O
+import sys, os, os.path, argparse, json, time, random, tempfile, itertools, \
+	platform, contextlib
+from functools import partial as partialfn
+
+import schema_matching
+from schema_matching.actions.collect import parse_schema_instance
+from schema_matching.actions.match import get_best_schema_mapping
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.description import default as default_description
+from schema_matching.utilities.argparse import ChoicesRangeHelpFormatter
+
+
+DESCRIPTION_MODULES = (
+	'schema_matching.collector.description.normal.L1',
+	'schema_matching.collector.description.normal.L2',
+)
+
+
+
+def main(argv=None):
+	opts = argparser.parse_args(argv)
+	if min(opts.instances) < 2:
+		argparser.error('Schema matching needs at least 2 schema instances.')
+	results = {
+		'python': platform.python_version(),
+		'implementation': platform.python_implementation(),
+		'machine': platform.machine(),
+		'cpu_count': os.cpu_count(),
+		'runs': [],
+	}
+
+	# compare-descriptions looks up schema descriptors by base name
+	cwd = os.getcwd()
+	with tempfile.TemporaryDirectory() as tmpdir:
+		os.chdir(tmpdir)
+		try:
+			for row_count, column_count, instance_count in itertools.product(
+				opts.rows, opts.columns, opts.instances
+			):
+				configuration = {
+					'rows': row_count, 'columns': column_count,
+					'instances': instance_count}
+				print(format_configuration(configuration), end=' ', file=sys.stderr,
+					flush=True)
+				paths = write_schema_instances(
+					'{rows:d}x{columns:d}x{instances:d}'.format_map(configuration),
+					row_count, column_count, instance_count, opts.seed)
+				timings = run_benchmarks(paths, opts.repeat, opts.actions)
+				results['runs'].append(dict(configuration, timings=timings))
+				print('done', file=sys.stderr)
+		finally:
+			os.chdir(cwd)
+
+	if opts.output:
+		with open(opts.output, 'w') as f:
+			json.dump(results, f, indent='\t', sort_keys=True)
+			f.write('\n')
+
+	baseline = None
+	if opts.baseline:
+		with open(opts.baseline) as f:
+			baseline = json.load(f)
+	regressions = print_results(results, baseline, opts.tolerance, opts.min_time)
+	return int(bool(regressions))
+
+
+def run_benchmarks(paths, repeat=1, actions=True):
+	"""
+	:param paths: list[str]
+	:param repeat: int
+	:param actions: bool
+		whether to run the match, validate and compare-descriptions actions
+		end-to-end, too
+	:return: dict[str, float]
+		the best time of each step in seconds
+	"""
+	timings = {}
+	for _ in range(repeat):
+		for name, duration in benchmark_steps(paths, actions):
+			timings[name] = min(timings.get(name, duration), duration)
+	return timings
+
+
+def benchmark_steps(paths, actions=True):
+	"""
+	:return: iterable[(str, float)]
+		the names and durations of the measured steps
+	"""
+	collectors = []
+	start = time.perf_counter()
+	for path in paths:
+		with open(path) as f:
+			collectors.append(MultiphaseCollector(parse_schema_instance(f),
+				os.path.basename(path)))
+	yield 'ingest', time.perf_counter() - start
+
+	# the durations of each phase summed over all schema instances
+	phase_durations = []
+	phase_idx = 0
+	def phase_callback(_):
+		nonlocal start, phase_idx
+		now = time.perf_counter()
+		if phase_idx == len(phase_durations):
+			phase_durations.append(0)
+		phase_durations[phase_idx] += now - start
+		phase_idx += 1
+		start = now
+
+	for collector in collectors:
+		phase_idx = 0
+		start = time.perf_counter()
+		collector.do_phases(default_description.descriptions, phase_callback)
+	for phase_idx, duration in enumerate(phase_durations):
+		yield 'collect phase {:d}'.format(phase_idx + 1), duration
+
+	collectors.sort(key=MultiphaseCollector.columncount)
+	start = time.perf_counter()
+	norms = [
+		MultiphaseCollector.results_norms(a, b, default_description.weights)
+		for a, b in itertools.combinations(collectors, 2)
+	]
+	yield 'results_norms', time.perf_counter() - start
+
+	start = time.perf_counter()
+	for distance_matrix in norms:
+		get_best_schema_mapping(distance_matrix)
+	yield 'get_best_schema_mapping', time.perf_counter() - start
+
+	if actions:
+		common_args = ('--field-delimiter=,', '--no-profile-cache', '-o', os.devnull)
+		for name, args in (
+			('match', ('--match',) + common_args + tuple(paths[:2])),
+			('validate', ('--validate',) + common_args + tuple(paths)),
+			('compare_descriptions', ('--compare-descriptions',) + common_args +
+				tuple(itertools.chain.from_iterable(
+					('--desc', ':' + module) for module in DESCRIPTION_MODULES)) +
+				tuple(paths)),
+		):
+			start = time.perf_counter()
+			with open(os.devnull, 'w') as devnull:
+				with contextlib.redirect_stdout(devnull), \
+						contextlib.redirect_stderr(devnull):
+					schema_matching.main(args)
+			yield name, time.perf_counter() - start
+
+
+def write_schema_instances(path_prefix, row_count, column_count,
+	instance_count, seed=0
+):
+	"""
+	Writes schema instances with the same abstract schema, but differently
+	ordered columns and different rows, and their schema descriptors for the
+	validate action.
+
+	:return: list[str] the paths of the schema instances
+	"""
+	rnd = random.Random(seed)
+	schema = [
+		partialfn(column_generators[column_idx % len(column_generators)],
+			random.Random(rnd.getrandbits(64)))
+		for column_idx in range(column_count)
+	]
+
+	paths = []
+	for instance_idx in range(instance_count):
+		column_order = list(range(column_count))
+		rnd.shuffle(column_order)
+		path = '{}-{:d}.csv'.format(path_prefix, instance_idx)
+		with open(path, 'w') as f:
+			for _ in range(row_count):
+				f.write(','.join([schema[column_idx]() for column_idx in column_order]))
+				f.write('\n')
+		with open(path[:-len('.csv')] + '_desc.txt', 'w') as f:
+			for mapped, original in enumerate(column_order, 1):
+				print(mapped, original + 1, sep=',', file=f)
+		paths.append(path)
+	return paths
+
+
+__words = (
+	'alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta',
+	'iota', 'kappa', 'lambda', 'mu', 'nu', 'xi', 'omicron', 'pi', 'rho',
+	'sigma', 'tau', 'upsilon', 'phi', 'chi', 'psi', 'omega')
+
+column_generators = (
+	lambda rnd: str(rnd.randrange(1 << 20)),
+	lambda rnd: format(rnd.gauss(100, 15), '.2f'),
+	lambda rnd: rnd.choice(__words),
+	lambda rnd: '{}-{:04d}'.format(rnd.choice('ABCDEF'), rnd.randrange(10000)),
+	lambda rnd: str(rnd.randrange(10)),
+	lambda rnd: ' '.join(rnd.choice(__words) for _ in range(rnd.randrange(1, 6))),
+	lambda rnd: '{:04d}-{:02d}-{:02d}'.format(
+		rnd.randrange(1990, 2030), rnd.randrange(1, 13), rnd.randrange(1, 29)),
+	lambda rnd: format(rnd.expovariate(0.01), '.4g'),
+)
+
+
+def format_configuration(configuration):
+	return '{rows:d} rows, {columns:d} columns, {instances:d} instances:' \
+		.format_map(configuration)
+
+
+def print_results(results, baseline=None, tolerance=0.25, min_time=0.01,
+	out=sys.stdout
+):
+	"""
+	Prints the timings of all runs, compared to the matching ones of a
+	baseline, if any.
+
+	:return: list[(dict, str)]
+		the configurations and steps that were slower than in the baseline by
+		more than 'tolerance' (relative) and 'min_time' (absolute)
+	"""
+	baseline_runs = {
+		get_configuration_key(run): run['timings']
+		for run in (baseline or {}).get('runs', ())
+	}
+	regressions = []
+	for run in results['runs']:
+		print(format_configuration(run), file=out)
+		baseline_timings = baseline_runs.get(get_configuration_key(run), {})
+		for name, duration in run['timings'].items():
+			line = '  {:<24s} {:9.3f} s'.format(name, duration)
+			baseline_duration = baseline_timings.get(name)
+			if baseline_duration is not None:
+				line += '  ({:+.1%} vs. {:.3f} s)'.format(
+					duration / baseline_duration - 1 if baseline_duration else 0,
+					baseline_duration)
+				if (duration - baseline_duration > min_time and
+					duration > baseline_duration * (1 + tolerance)
+				):
+					line += '  REGRESSION'
+					regressions.append((run, name))
+			print(line, file=out)
+
+	if baseline is not None:
+		print('{:d} regression(s)'.format(len(regressions)), file=out)
+	return regressions
+
+
+def get_configuration_key(run):
+	return run['rows'], run['columns'], run['instances']
+
+
+def _int_list(s):
+	return list(map(int, s.split(',')))
+
+
+argparser = argparse.ArgumentParser(
+	formatter_class=ChoicesRangeHelpFormatter,
+	description="Measures the duration of the steps of schema matching on "
+		"generated schema instances for all combinations of the given row, "
+		"column and schema instance counts.")
+argparser.add_argument('--rows', type=_int_list, default=[1000, 10000],
+	metavar='N[,N...]', help="Row counts (default: 1000,10000)")
+argparser.add_argument('--columns', type=_int_list, default=[5, 50],
+	metavar='N[,N...]', help="Column counts (default: 5,50)")
+argparser.add_argument('--instances', type=_int_list, default=[2],
+	metavar='N[,N...]', help="Schema instance counts, at least 2 (default: 2)")
+argparser.add_argument('--repeat', type=int, choices=range(1, sys.maxsize),
+	default=1, help="Report the best of %(metavar)s runs (default: %(default)d)",
+	metavar='N')
+argparser.add_argument('--no-actions', dest='actions', action='store_false',
+	help="Skip the end-to-end runs of the match, validate and "
+		"compare-descriptions actions.")
+argparser.add_argument('--seed', type=int, default=0,
+	help="Seed of the generated data (default: %(default)d)")
+argparser.add_argument('-o', '--output', metavar='FILE.json', help=
+	"Store the results in %(metavar)s.")
+argparser.add_argument('--baseline', metavar='FILE.json', help=
+	"Compare the results to earlier ones stored in %(metavar)s; exits with "
+	"status 1 if a step became slower.")
+argparser.add_argument('--tolerance', type=float, default=0.25, help=
+	"The relative slowdown to tolerate (default: %(default)s)")
+argparser.add_argument('--min-time', type=float, default=0.01,
+	metavar='SECONDS', help=
+	"The absolute slowdown to tolerate (default: %(default)s)")
+
+
+
+if __name__ == '__main__':
+	sys.exit(main())
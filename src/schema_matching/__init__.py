@@ -1,4 +1,4 @@
-import sys
+import sys, contextlib
 from . import actions
 from .actions import argument_parser
 
@@ -13,11 +13,37 @@ def main(argv=None):
 				.format(opts.action[0]),
 			file=sys.stderr)
 
+	if opts.incremental and not opts.profile_cache:
+		argument_parser.error('--incremental requires a profile cache.')
+
+	if opts.sample_fraction is not None and not 0 < opts.sample_fraction <= 1:
+		argument_parser.error('The sample fraction must be in (0, 1].')
+	if opts.incremental and (
+		opts.sample is not None or opts.sample_fraction is not None
+	):
+		argument_parser.error("--incremental doesn't work with sampling.")
+	if opts.converge is not None and not opts.converge >= 0:
+		argument_parser.error('The convergence tolerance must be non-negative.')
+	if opts.incremental and opts.converge is not None:
+		argument_parser.error("--incremental doesn't work with --converge.")
+
 	if opts.action[1] == 1:
 		dispatcher = __single_collectorset_description_action
 	else:
 		dispatcher = __multi_collectorset_description_action
-	return dispatcher(opts)
+
+	report_file = opts.report
+	del opts.report
+	with contextlib.ExitStack() as stack:
+		if report_file is not None:
+			from .utilities.report import RunReport
+			run_report = stack.enter_context(RunReport())
+			stack.callback(run_report.write, report_file)
+		if opts.profile:
+			from .collector.profiling import CollectorProfiler
+			profiler = stack.enter_context(CollectorProfiler())
+			stack.callback(profiler.print_table, sys.stderr)
+		return dispatcher(opts)
 
 
 def __single_collectorset_description_action(options):
@@ -1,4 +1,4 @@
-import sys, argparse
+import sys, os, argparse
 from .. import collector, utilities
 
 
@@ -36,10 +36,11 @@ add_action('compare-descriptions', -1, help=
 	"DESCRIPTIONs.")
 
 p.add_argument('schema_instances', nargs=range(2, sys.maxsize),
-	type=argparse.FileType('r'), action=utilities.argparse.NargsRangeAction,
+	type=utilities.argparse.DecompressingFileType('r'),
+	action=utilities.argparse.NargsRangeAction,
 	metavar='SCHEMA-INSTANCE', help=
 	"The path to a delimited (e. g. CSV) file of records conforming to an "
-	"(unknown) schema")
+	"(unknown) schema; it may be compressed with gzip, bzip2 or xz")
 p.add_argument('-d', '--desc', action='append', dest='collectorset_descriptions',
 	metavar='(:MODULENAME | MODULEFILE)', type=collector.description.argparser,
 	help=
@@ -51,6 +52,9 @@ p.add_argument('-d', '--desc', action='append', dest='collectorset_descriptions'
 			"functions to collector classes. You should probably use an instance "
 			"of WeightDict. For examples see the modules in the "
 			"collector.descriptions package.\n"
+	"	 'constraints' - (optional) A sequence of predicates over pairs of "
+			"column collector sets; column pairs for which any of them is false "
+			"are never matched.\n"
 	"Some modes of operation allow or require multiple descriptions, that can "
 	"be specified by multiple occurrences of this option. (default: "
 	"collector.descriptions.default)")
@@ -63,6 +67,107 @@ p.add_argument('--time-limit', type=int, choices=range(sys.maxsize),
 	"If running 'match' mode takes longer than %(metavar)s, the program is "
 	"interrupted and its results up to that point written to the output "
 	"destination. '0' means unrestricted time (default).")
+p.add_argument('--norms-backend', choices=('numpy', 'python'), help=
+	"The implementation of the computation of the norms between all column "
+	"pairs; 'numpy' requires NumPy (default: 'numpy' if available, otherwise "
+	"'python')")
+p.add_argument('--matcher',
+	choices=('hungarian', 'branch-and-bound', 'exhaustive'),
+	default='hungarian', help=
+	"The search strategy for the best column mapping: 'hungarian' solves the "
+	"assignment problem in polynomial time; 'branch-and-bound' improves on a "
+	"greedy mapping until it is optimal or the time limit is reached, in which "
+	"case it reports the remaining optimality gap; 'exhaustive' enumerates all "
+	"mappings and serves as a (slow) reference (default: %(default)s)")
+p.add_argument('--strict-types', action='store_true', help=
+	"Never match numeric with non-numeric columns. Columns without a "
+	"compatible counterpart remain unmatched. The matching problem is split "
+	"into independent blocks of compatible columns, which are solved "
+	"separately.")
+p.add_argument('-j', '--jobs', type=int, choices=range(1, sys.maxsize),
+	default=1, metavar='N', help=
+	"Collect the schema instances, split into groups of columns if there are "
+	"fewer instances than jobs, and solve independent blocks of the matching "
+	"problem in up to %(metavar)s worker processes; the latter only without a "
+	"time limit (default: %(default)d)")
+p.add_argument('--top-k', type=int, choices=range(1, sys.maxsize), default=1,
+	metavar='N', help=
+	"Additionally list the next best column mappings up to rank %(metavar)s "
+	"with their norms in 'match' and 'validate' mode (default: %(default)d)")
+p.add_argument('--streaming', action='store_true', help=
+	"Read SCHEMA-INSTANCE files anew for each collection phase instead of "
+	"keeping all their records in memory. This limits the memory use to the "
+	"collected data at the expense of parsing each file multiple times. Has "
+	"no effect on the standard input or other non-regular files. With fewer "
+	"SCHEMA-INSTANCEs than --jobs, files are split into byte ranges at line "
+	"breaks, which are collected in parallel; fields must not contain line "
+	"breaks then.")
+p.add_argument('--column-cache', action='store_true', help=
+	"Store the parsed columns of each SCHEMA-INSTANCE file in a binary file "
+	"next to it with the suffix '.columns' and map that into memory instead of "
+	"parsing the file again in later runs, as long as the size and "
+	"modification time of the file are unchanged. Has no effect with "
+	"--streaming or on compressed or non-regular files.")
+sample_group = p.add_mutually_exclusive_group()
+sample_group.add_argument('--sample', type=int, choices=range(1, sys.maxsize),
+	metavar='N', help=
+	"Collect only a random sample of %(metavar)s records of each "
+	"SCHEMA-INSTANCE, drawn in a single pass with reservoir sampling. Item "
+	"counts of the whole columns are estimated from the sampling ratio. Not "
+	"with --incremental; with --streaming the sample is kept in memory.")
+sample_group.add_argument('--sample-fraction', type=float, metavar='P', help=
+	"Collect each record of a SCHEMA-INSTANCE with probability %(metavar)s "
+	"(0 < %(metavar)s ≤ 1) only. Not with --incremental.")
+p.add_argument('--sample-seed', type=int, default=0, metavar='SEED', help=
+	"The seed of the random samples (default: %(default)d)")
+p.add_argument('--converge', type=float, metavar='TOLERANCE', help=
+	"Stop a collection phase early once the running averages, standard "
+	"deviations and letter distributions of all columns changed by no more "
+	"than %(metavar)s (relative to their magnitude, or in L1 distance of "
+	"the distributions) between two checkpoints. Records are visited in a "
+	"strided order spread over the whole SCHEMA-INSTANCE, and later phases "
+	"collect only the records collected until then. The records are kept in "
+	"memory; --streaming has no effect.")
+p.add_argument('--converge-interval', type=int, choices=range(1, sys.maxsize),
+	default=4096, metavar='N', help=
+	"Check the convergence every %(metavar)s records (default: %(default)d)")
+p.add_argument('--deduplicate', action='store_true', help=
+	"Pass each distinct item of a column to the collectors only once with "
+	"the number of its occurrences, which speeds up columns with many "
+	"repeated items. The items of in-memory columns of strings are counted "
+	"all at once, others in batches of records to bound the memory use. The "
+	"results are the same up to rounding.")
+p.add_argument('--profile-cache', metavar='DIR',
+	default=os.environ.get('SCHEMA_MATCHING_PROFILE_CACHE') or None, help=
+	"Store the collected column profiles of SCHEMA-INSTANCEs in %(metavar)s "
+	"and reuse them for unchanged files and collector descriptions instead of "
+	"reading the files again (default: $SCHEMA_MATCHING_PROFILE_CACHE, if set)")
+p.add_argument('--no-profile-cache', dest='profile_cache', action='store_const',
+	const=None, help="Disable the profile cache.")
+p.add_argument('--profile-cache-size', type=int, choices=range(sys.maxsize),
+	default=256, metavar='MIB', help=
+	"Evict the least recently used profiles when the profile cache grows "
+	"beyond %(metavar)s MiB (default: %(default)d)")
+p.add_argument('--incremental', action='store_true', help=
+	"Keep a profile of each uncompressed regular SCHEMA-INSTANCE file in the "
+	"profile cache and, if only records were appended to a file since, "
+	"collect just those and merge them into its profile. Falls back to reading the whole file if "
+	"the new records change its column types or other collected parameters. "
+	"Requires --profile-cache.")
+p.add_argument('--profile', action='store_true', help=
+	"Count the calls and measure the wall and CPU time of the methods of each "
+	"collector class per collection phase, of the transformation of the rows "
+	"and of the norm computation, and print them as a table sorted by wall "
+	"time to the standard error output.")
+p.add_argument('--report', type=argparse.FileType('w'), metavar='FILE.json',
+	help=
+	"Write a machine-readable report of the run to %(metavar)s: the rows, "
+	"columns and bytes read, the executed collection phases and the wall time "
+	"and peak memory of each stage per SCHEMA-INSTANCE, and the duration and "
+	"search statistics of the norm computation and matching. The peak memory "
+	"of a stage is measured with tracemalloc, which slows down the run; the "
+	"peak resident set size is that of the process up to the end of the "
+	"stage.")
 p.add_argument('--field-delimiter', metavar='DELIM', default=';', help=
 	"The field delimiter of SCHEMA-INSTANCEs (default: '%(default)s')")
 p.add_argument('--number-format', metavar='FORMAT', default='.3e', help=
@@ -1,9 +1,20 @@
-import sys, os.path, csv
+import sys, os, os.path, io, csv, hashlib, functools, types, contextlib, locale, \
+	time, tempfile
 from functools import partial as partialfn
-from ..utilities.iterator import map_inplace
+from concurrent.futures import ProcessPoolExecutor
+from ..utilities.iterator import map_inplace, each
 from ..utilities.functional import memberfn
 from ..utilities.operator import noop
+from ..utilities.cache import LRUDirectoryCache
 from ..collector.multiphase import MultiphaseCollector
+from ..collector.itemcount import ItemCountCollector
+from ..collector.onlinevariance import OnlineItemVarianceCollector
+from ..collector.rowset import StreamingRowset, ChunkedRowset, ColumnarRowset
+from ..collector.convergence import ConvergenceCheck
+from ..collector import profiling
+from ..utilities import compression, report
+from ..utilities.sampling import Sampler
+from .. import collector
 
 
 
@@ -12,38 +23,915 @@ def collect(src, collectorset_description, **kwargs):
 	Collects info about the columns of the data set in file "path" according
 	over multiple phases based on a description of those phases.
 
+	If a profile cache is configured and the collector set description is a
+	description module, the results are looked up in and stored to that cache.
+	With 'incremental', regular files are collected with collect_incremental.
+
 	:param src: io.IOBase | MultiphaseCollector
-	:param collectorset_description: tuple[type | ItemCollector | callable]
+	:param collectorset_description: module | tuple[type | ItemCollector | callable]
 	:return: MultiphaseCollector
 	"""
 	verbosity = kwargs.get('verbose', 0)
+	descriptions = getattr(
+		collectorset_description, 'descriptions', collectorset_description)
 
 	if isinstance(src, MultiphaseCollector):
 		multiphasecollector = src.reset()
 	else:
+		multiphasecollector = None
 		if verbosity >= 2:
 			src_name = getattr(src, 'name', None)
 			if src_name:
 				print(src_name, end=':\n', file=sys.stderr)
-		multiphasecollector = read_schema_instance(src, **kwargs)
 
-	multiphasecollector.do_phases(collectorset_description,
-		memberfn(print_phase_results, kwargs.get('number_format', '')) if verbosity >= 2 else None)
+	incremental_profile = None
+	prefix_digest = None
+	source_digest = None
+	if multiphasecollector is None and kwargs.get('incremental'):
+		incremental_profile = get_incremental_profile(
+			src, collectorset_description, **kwargs)
+		if incremental_profile is not None:
+			# hash the file once for both the profiles
+			_, profile = incremental_profile
+			source_digest, prefix_digest = file_digests(
+				src, profile and profile['size'])
+
+	source_digest, cache_key, collector_sets = profile_cache_lookup(
+		src, collectorset_description, source_digest, **kwargs)
+	if collector_sets is not None:
+		multiphasecollector = \
+			load_results(src, collector_sets, source_digest, verbosity)
+		if verbosity >= 2:
+			print('(from profile cache)', file=sys.stderr)
+			print_phase_results(multiphasecollector, kwargs.get('number_format', ''))
+			print(file=sys.stderr)
+		return multiphasecollector
+
+	phase_callback = (
+		memberfn(print_phase_results, kwargs.get('number_format', ''))
+		if verbosity >= 2 else None)
+	if incremental_profile is not None:
+		multiphasecollector = collect_incremental(
+			src, collectorset_description, source_digest, incremental_profile,
+			prefix_digest, phase_callback, **kwargs)
+	else:
+		if multiphasecollector is None:
+			multiphasecollector = read_schema_instance(src,
+				source_digest=source_digest,
+				collectorset_description=collectorset_description, **kwargs)
+		multiphasecollector.do_phases(descriptions, phase_callback)
 	if verbosity >= 2:
 		print(file=sys.stderr)
 
+	if cache_key is not None:
+		get_profile_cache(**kwargs)[cache_key] = \
+			list(multiphasecollector.merged_predecessors)
+
 	return multiphasecollector
 
 
-def read_schema_instance(src, field_delimiter=',', verbosity=0, **kwargs):
-	src_name = getattr(src, 'name', None)
-	src_name = '<unknown schema instance>' if src_name is None else os.path.basename(src_name)
-	reader = map(partialfn(map_inplace, str.strip),
-		csv.reader(src, delimiter=field_delimiter, skipinitialspace=True))
-	result = MultiphaseCollector(reader, src_name, verbosity)
+def get_incremental_profile(src, collectorset_description,
+	field_delimiter=',', **kwargs
+):
+	"""
+	:param src: io.IOBase
+	:param collectorset_description: module
+	:param field_delimiter: str
+	:return: (str, dict | None) | None
+		the profile cache key of the incremental profile of 'src' and the
+		profile, if any; None if 'src' isn't an uncompressed regular file,
+		there's no profile cache, the description isn't a module or its
+		collectors can't merge their states
+	"""
+	profile_cache = get_profile_cache(**kwargs)
+	path = getattr(src, 'name', None)
+	if (profile_cache is None or
+		not isinstance(collectorset_description, types.ModuleType) or
+		not (isinstance(path, str) and os.path.isfile(path)) or
+		is_compressed(src) or
+		not can_merge_description(collectorset_description)
+	):
+		return None
+
+	profile_key = profile_cache_key('incremental:' + os.path.abspath(path),
+		collectorset_description, field_delimiter)
+	return profile_key, profile_cache.get(profile_key)
+
+
+def collect_incremental(src, collectorset_description, source_digest,
+	incremental_profile, prefix_digest=None, phase_callback=None,
+	field_delimiter=',', verbose=0, **kwargs
+):
+	"""
+	Collects info about a regular file with an incremental profile in the
+	profile cache. If the file only had rows appended since the profile was
+	stored, only those are collected and merged into the profile. If there is
+	no such profile, the file changed otherwise, or the new rows change
+	anything that earlier phases determined, e. g. column types or the bins
+	of distribution tables, all rows are collected. Either way the profile
+	is updated.
+
+	Column types are determined as in streaming mode, i. e. with the
+	tolerance for invalid items checked after all rows.
+
+	:param src: io.IOBase
+	:param collectorset_description: module
+	:param source_digest: str
+		the content hash of 'src'
+	:param incremental_profile: (str, dict | None)
+		the result of get_incremental_profile
+	:param prefix_digest: str | None
+		the content hash of the part of 'src' that the profile was stored for
+	:param phase_callback: callable
+	:param field_delimiter: str
+	:param verbose: int
+	:return: MultiphaseCollector
+	"""
+	profile_key, profile = incremental_profile
+	path = src.name
+	read_chunk_rows = partialfn(read_file_chunk_rows, path, field_delimiter,
+		getattr(src, 'encoding', None), getattr(src, 'errors', None))
+	size = os.path.getsize(path)
+	name = get_source_name(src)
+
+	multiphasecollector = None
+	if profile is not None and profile['ends_with_line_break'] and \
+			profile['size'] <= size and prefix_digest == profile['digest']:
+		report.update_instance(name, file_size=size - profile['size'],
+			streamed=True)
+		if profile['size'] == size:
+			multiphasecollector = MultiphaseCollector.from_results(
+				profile['collector_sets'], name, verbose, source_digest)
+		else:
+			if verbose >= 2:
+				print('(incremental update from byte {:d})'.format(profile['size']),
+					file=sys.stderr)
+			multiphasecollector = MultiphaseCollector(
+				ChunkedRowset(read_chunk_rows, [(profile['size'], size)],
+					previous_results=profile['collector_sets']),
+				name, verbose, source_digest)
+			try:
+				multiphasecollector.do_phases(
+					collectorset_description.descriptions, phase_callback)
+			except ValueError as ex:
+				if verbose >= 1:
+					print('{}: The incremental profile is out of date ({}); collecting all rows.'
+							.format(name, ex),
+						file=sys.stderr)
+				multiphasecollector = None
+
+	if multiphasecollector is not None:
+		getattr(src, 'close', noop)()
+	else:
+		# collect all rows as in streaming mode
+		multiphasecollector = read_schema_instance(src, field_delimiter, verbose,
+			source_digest=source_digest,
+			collectorset_description=collectorset_description,
+			**dict(kwargs, streaming=True))
+		multiphasecollector.do_phases(
+			collectorset_description.descriptions, phase_callback)
+
+	get_profile_cache(**kwargs)[profile_key] = {
+		'size': size, 'digest': source_digest,
+		'ends_with_line_break': _ends_with_line_break(path, size),
+		'collector_sets': list(multiphasecollector.merged_predecessors),
+	}
+	return multiphasecollector
+
+
+def _ends_with_line_break(path, size):
+	if not size:
+		return True
+	with open(path, 'rb') as f:
+		f.seek(size - 1)
+		return f.read(1) == b'\n'
+
+
+def profile_cache_lookup(src, collectorset_description, source_digest=None,
+	**kwargs
+):
+	"""
+	:param src: io.IOBase | MultiphaseCollector
+	:param collectorset_description: module | tuple
+	:param source_digest: str
+		the content hash of 'src', if already known
+	:return: (str | None, str | None, list[ItemCollectorSet] | None)
+		the content hash of 'src', the profile cache key of its results and the
+		results stored under that key, as far as available
+	"""
+	profile_cache = get_profile_cache(**kwargs)
+	if isinstance(src, MultiphaseCollector):
+		source_digest = src.source_digest
+	elif source_digest is None and profile_cache is not None:
+		source_digest = file_digest(src)
+
+	if profile_cache is None or source_digest is None or \
+			getattr(collectorset_description, 'descriptions', None) is None:
+		return source_digest, None, None
+	cache_key = profile_cache_key(source_digest, collectorset_description,
+		kwargs.get('field_delimiter'), get_sampler(**kwargs),
+		get_convergence_check(**kwargs))
+	return source_digest, cache_key, profile_cache.get(cache_key)
+
+
+def load_results(src, collector_sets, source_digest=None, verbosity=0):
+	"""
+	:param src: io.IOBase | MultiphaseCollector
+	:param collector_sets: iterable[ItemCollectorSet]
+		the finished collector sets of all columns of 'src'
+	:return: MultiphaseCollector
+		'src' with the given results or, if 'src' is a file, a new collector
+		with them, in which case 'src' is closed
+	"""
+	if isinstance(src, MultiphaseCollector):
+		return src.load_results(collector_sets)
+	multiphasecollector = MultiphaseCollector.from_results(
+		collector_sets, get_source_name(src), verbosity, source_digest)
+	getattr(src, 'close', noop)()
+	return multiphasecollector
+
+
+def collect_all(srcs, collectorset_description, jobs=1, executor=None,
+	**kwargs
+):
+	"""
+	Collects info about multiple schema instances like 'collect'.
+
+	With more than one job, the collection of each schema instance runs in
+	one of up to 'jobs' worker processes and only the finished results are
+	sent back. If there are fewer schema instances than jobs, in-memory
+	instances are additionally split into groups of columns and streamed
+	files into byte ranges of rows, whose results are merged. Sources that
+	can't be reopened in another process, e. g. the standard input,
+	collector set descriptions other than modules and incremental profiles
+	are collected in this process.
+
+	:param srcs: iterable[io.IOBase | MultiphaseCollector]
+	:param collectorset_description: module | tuple
+	:param jobs: int
+	:param executor: concurrent.futures.Executor
+		a pool of 'jobs' worker processes to use instead of starting one
+	:return: list[MultiphaseCollector]
+	"""
+	srcs = list(srcs)
+	description_spec = get_description_spec(collectorset_description)
+	if (jobs is None or jobs <= 1 or description_spec is None or
+		kwargs.get('incremental')
+	):
+		results = [collect(src, collectorset_description, **kwargs) for src in srcs]
+		_summarize_results(results, **kwargs)
+		return results
+
+	verbosity = kwargs.get('verbose', 0)
+	worker_options = {
+		k: v for k, v in kwargs.items() if k in __worker_option_names}
+	worker_options['report'] = report.active is not None
+	group_count = -(-jobs // len(srcs)) if len(srcs) < jobs else 1
+	results = [None] * len(srcs)
+	tasks = []
+	chunked_src_indices = []
+	for src_idx, src in enumerate(srcs):
+		source = _get_task_source(src)
+		if source is None:
+			continue
+		is_streamed = (isinstance(source, tuple) and kwargs.get('streaming') and
+			kwargs.get('converge') is None)
+		if (is_streamed and group_count > 1 and not is_compressed(src) and
+			can_merge_description(collectorset_description)
+		):
+			chunked_src_indices.append(src_idx)
+			continue
+		source_digest, cache_key, collector_sets = \
+			profile_cache_lookup(src, collectorset_description, **kwargs)
+		if collector_sets is not None:
+			results[src_idx] = load_results(
+				src, collector_sets, source_digest, verbosity)
+			continue
+		if (not is_streamed if isinstance(source, tuple) else
+			source.can_select_columns()
+		):
+			src_group_count = group_count
+		else:
+			src_group_count = 1
+		tasks.extend(
+			(src_idx, source_digest, cache_key, (
+				source, description_spec, group_idx, src_group_count,
+				worker_options))
+			for group_idx in range(src_group_count))
+
+	src_collector_sets = [[] for _ in srcs]
+	with contextlib.ExitStack() as stack:
+		if (tasks or chunked_src_indices) and executor is None:
+			executor = stack.enter_context(ProcessPoolExecutor(jobs))
+		if tasks:
+			task_results = profiling.executor_map(
+				executor, _collect_task, [task[-1] for task in tasks])
+		else:
+			task_results = ()
+
+		for src_idx in chunked_src_indices:
+			results[src_idx] = collect(srcs[src_idx], collectorset_description,
+				chunk_executor=executor, chunk_count=group_count, **kwargs)
+
+		# collect the remaining sources here in the meantime
+		for src_idx, src in enumerate(srcs):
+			if results[src_idx] is None and _get_task_source(src) is None:
+				results[src_idx] = collect(src, collectorset_description, **kwargs)
+
+		for (src_idx, _, _, _), (collector_sets, messages, report_instances) in \
+				zip(tasks, task_results):
+			src_collector_sets[src_idx].extend(collector_sets)
+			sys.stderr.write(messages)
+			if report_instances:
+				report.active.merge(report_instances)
+
+	for src_idx, source_digest, cache_key, _ in tasks:
+		if results[src_idx] is None:
+			collector_sets = src_collector_sets[src_idx]
+			results[src_idx] = load_results(
+				srcs[src_idx], collector_sets, source_digest, verbosity)
+			if cache_key is not None:
+				get_profile_cache(**kwargs)[cache_key] = collector_sets
+
+	_summarize_results(results, **kwargs)
+	return results
+
+
+__worker_option_names = frozenset((
+	'verbose', 'field_delimiter', 'number_format', 'streaming', 'column_cache',
+	'sample', 'sample_fraction', 'sample_seed', 'converge', 'converge_interval',
+	'deduplicate'))
+
+
+def _get_task_source(src):
+	"""
+	:param src: io.IOBase | MultiphaseCollector
+	:return: (str, str, str) | MultiphaseCollector | None
+		the path, encoding and error handling of a regular file, a collector or
+		None if 'src' can't be sent to another process
+	"""
+	if isinstance(src, MultiphaseCollector):
+		return src
+	path = getattr(src, 'name', None)
+	if isinstance(path, str) and os.path.isfile(path):
+		return (path, getattr(src, 'encoding', None), getattr(src, 'errors', None))
+	return None
+
+
+def _collect_task(task):
+	"""
+	Collects info about a group of columns of a schema instance in a worker
+	process.
+
+	:param task: (tuple | MultiphaseCollector, str, int, int, dict)
+	:return: (list[ItemCollectorSet], str, list[dict] | None)
+		the results of the columns of the group, the diagnostic messages that
+		occurred and, if the 'report' option is set, the schema instance
+		records of a run report
+	"""
+	source, description_spec, group_idx, group_count, kwargs = task
+	collectorset_description = _load_description(description_spec)
+	messages = io.StringIO()
+	with contextlib.ExitStack() as stack:
+		stack.enter_context(contextlib.redirect_stderr(messages))
+		run_report = (
+			stack.enter_context(report.RunReport())
+			if kwargs.get('report') else None)
+		collector_sets = _collect_task_group(
+			source, collectorset_description, group_idx, group_count, kwargs)
+	return (collector_sets, messages.getvalue(),
+		run_report and list(run_report.instances.values()))
+
+
+def _collect_task_group(source, collectorset_description, group_idx,
+	group_count, kwargs
+):
+	if isinstance(source, tuple):
+		path, encoding, errors = source
+		src = compression.open_file(path, encoding=encoding, errors=errors)
+		if group_count > 1:
+			src = read_schema_instance(src, **kwargs)
+	else:
+		src = source
+
+	if group_count > 1:
+		column_count = src.columncount()
+		columns = slice(
+			column_count * group_idx // group_count,
+			column_count * (group_idx + 1) // group_count)
+		if columns.start == columns.stop:
+			return []
+		src = src.select_columns(columns)
+		if kwargs.get('verbose', 0) >= 2:
+			print('{}, columns {:d}-{:d}:'.format(
+					src.name, columns.start + 1, columns.stop),
+				file=sys.stderr)
+
+	multiphasecollector = collect(src, collectorset_description, **kwargs)
+	return list(multiphasecollector.merged_predecessors)
+
+
+def get_description_spec(collectorset_description):
+	"""
+	:param collectorset_description: module | tuple
+	:return: str | None
+		an argument to collector.description.argparser that loads the same
+		description module again, e. g. in another process, or None if there is
+		none
+	"""
+	if not isinstance(collectorset_description, types.ModuleType):
+		return None
+	name = collectorset_description.__name__
+	if name == getattr(collectorset_description, '__file__', None):
+		# loaded from a file path
+		return name
+	return ':' + name
+
+
+@functools.lru_cache(maxsize=None)
+def _load_description(description_spec):
+	return collector.description.argparser(description_spec)
+
+
+def read_schema_instance(src, field_delimiter=',', verbose=0,
+	source_digest=None, profile_cache=None, streaming=False,
+	chunk_executor=None, chunk_count=1, column_cache=False, deduplicate=False,
+	collectorset_description=None, **kwargs
+):
+	"""
+	:param src: io.IOBase
+	:param field_delimiter: str
+	:param verbose: int
+	:param source_digest: str
+	:param profile_cache: str
+	:param streaming: bool
+		Read the rows of a regular file anew for each collection phase instead
+		of keeping them in memory; other sources are always kept in memory.
+	:param chunk_executor: concurrent.futures.Executor
+		If streaming, read and collect up to 'chunk_count' byte ranges of the
+		file in parallel with this executor, unless 'collectorset_description'
+		has collectors that can't merge their states.
+	:param chunk_count: int
+	:param column_cache: bool
+		Map the parsed columns of a regular file from a sidecar column file, if
+		it's up to date, instead of parsing the file, and write it otherwise;
+		see read_column_cache. Not with sampling or compressed files.
+	:param deduplicate: bool
+		Collect the distinct items of each column with the number of their
+		occurrences instead of every occurrence; not in byte ranges collected
+		in parallel.
+	:param kwargs: dict
+		The sampling and convergence options, if any; see get_sampler and
+		get_convergence_check. Rows are always kept in memory to check the
+		convergence.
+	:param collectorset_description: module | tuple
+		the description that the rows are going to be collected with
+	:return: MultiphaseCollector
+	"""
+	if source_digest is None and profile_cache:
+		source_digest = file_digest(src)
+
+	path = getattr(src, 'name', None)
+	name = get_source_name(src)
+	is_file = isinstance(path, str) and os.path.isfile(path)
+	sampler = get_sampler(**kwargs)
+	convergence = get_convergence_check(**kwargs)
+	streaming = streaming and convergence is None
+	if is_file:
+		report.update_instance(name, file_size=os.path.getsize(path),
+			streamed=streaming)
+	with report.stage('parse', name):
+		if streaming and is_file:
+			encoding = getattr(src, 'encoding', None)
+			errors = getattr(src, 'errors', None)
+			if (chunk_executor is not None and chunk_count > 1 and
+				sampler is None and not is_compressed(src) and
+				can_merge_description(collectorset_description)
+			):
+				rowset = ChunkedRowset(
+					partialfn(read_file_chunk_rows, path, field_delimiter, encoding, errors),
+					get_file_chunks(path, chunk_count), chunk_executor)
+			else:
+				rowset = StreamingRowset(
+					partialfn(read_file_rows, path, field_delimiter, encoding, errors),
+					sampler=sampler)
+		elif (column_cache and is_file and sampler is None and
+			not is_compressed(src)
+		):
+			rowset = read_column_cache(src, field_delimiter, verbose)
+		else:
+			rowset = parse_schema_instance(src, field_delimiter, verbose, sampler)
+	result = MultiphaseCollector(rowset, name, verbose, source_digest,
+		sampler, convergence, deduplicate)
 	getattr(src, 'close', noop)()
 	return result
 
 
+def parse_schema_instance(src, field_delimiter=',', verbose=0, sampler=None):
+	"""
+	:param src: io.TextIOBase
+	:param field_delimiter: str
+	:param verbose: int
+	:param sampler: utilities.sampling.Sampler
+		keeps only a sample of the rows, if not None
+	:return: ColumnarRowset
+	"""
+	start_time = time.perf_counter()
+	rows = csv.reader(src, delimiter=field_delimiter, skipinitialspace=True)
+	if sampler is not None:
+		rows = sampler(rows)
+	# strip only the distinct items of each column
+	rowset = ColumnarRowset(rows, str.strip)
+	if verbose >= 2:
+		duration = time.perf_counter() - start_time
+		print('Read {:d} rows in {:.3f} s ({:.0f} rows/s)'.format(
+				len(rowset), duration, len(rowset) / duration if duration else 0),
+			file=sys.stderr)
+	return rowset
+
+
+COLUMN_CACHE_SUFFIX = '.columns'
+
+
+def read_column_cache(src, field_delimiter=',', verbose=0):
+	"""
+	Maps the parsed columns of a regular file from the column file next to
+	it (with the suffix COLUMN_CACHE_SUFFIX) if that was written for the same
+	size and modification time of the file and the same parser settings.
+	Otherwise the file is parsed and the column file is (re)written.
+
+	:param src: io.TextIOBase
+	:param field_delimiter: str
+	:param verbose: int
+	:return: ColumnarRowset
+	"""
+	stat = os.stat(src.fileno())
+	key = (stat.st_size, stat.st_mtime_ns, field_delimiter,
+		getattr(src, 'encoding', None), getattr(src, 'errors', None))
+	cache_path = src.name + COLUMN_CACHE_SUFFIX
+	rowset = ColumnarRowset.map_file(cache_path, key)
+	if rowset is not None:
+		if verbose >= 2:
+			print('(from column cache)', file=sys.stderr)
+		return rowset
+
+	rowset = parse_schema_instance(src, field_delimiter, verbose)
+	try:
+		fd, tmp_path = tempfile.mkstemp(COLUMN_CACHE_SUFFIX + '.tmp', '.',
+			os.path.dirname(cache_path))
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				rowset.write_to(f, key)
+			os.replace(tmp_path, cache_path)
+		except:
+			os.unlink(tmp_path)
+			raise
+	except OSError as ex:
+		if verbose >= 1:
+			print("Warning: Couldn't write the column cache of {}: {}".format(
+					src.name, ex),
+				file=sys.stderr)
+	return rowset
+
+
+def read_rows(src, field_delimiter=','):
+	return map(partialfn(map_inplace, str.strip),
+		csv.reader(src, delimiter=field_delimiter, skipinitialspace=True))
+
+
+def read_file_rows(path, field_delimiter=',', encoding=None, errors=None):
+	with compression.open_file(path, encoding=encoding, errors=errors) as src:
+		yield from read_rows(src, field_delimiter)
+
+
+def read_file_chunk_rows(path, field_delimiter=',', encoding=None,
+	errors=None, chunk=(0, None)
+):
+	"""
+	:param chunk: (int, int)
+		the byte range of the chunk, which must start at the beginning of a line
+	:return: iterable[list[str]]
+		the rows of a chunk of a file as returned by get_file_chunks
+	"""
+	start, stop = chunk
+	encoding = encoding or locale.getpreferredencoding(False)
+	with open(path, 'rb') as f:
+		f.seek(start)
+		lines = (line.decode(encoding, errors or 'strict')
+			for line in _read_lines_until(f, start, stop))
+		yield from read_rows(lines, field_delimiter)
+
+
+def _read_lines_until(f, position, stop):
+	for line in f:
+		if stop is not None and position >= stop:
+			break
+		position += len(line)
+		yield line
+
+
+def get_file_chunks(path, chunk_count):
+	"""
+	Splits a file into byte ranges of roughly equal size at line boundaries.
+	Fields with line breaks and encodings in which a line feed isn't the byte
+	0x0A aren't supported.
+
+	:param path: str
+	:param chunk_count: int
+	:return: list[(int, int)]
+		the byte ranges of up to 'chunk_count' chunks
+	"""
+	size = os.path.getsize(path)
+	boundaries = [0]
+	with open(path, 'rb') as f:
+		for chunk_idx in range(1, chunk_count):
+			offset = size * chunk_idx // chunk_count
+			if offset <= boundaries[-1]:
+				continue
+			# start at the previous byte to keep boundaries at line starts
+			f.seek(offset - 1)
+			f.readline()
+			boundary = f.tell()
+			if boundaries[-1] < boundary < size:
+				boundaries.append(boundary)
+	boundaries.append(size)
+	return list(zip(boundaries, boundaries[1:]))
+
+
+def get_sampler(sample=None, sample_fraction=None, sample_seed=0, **kwargs):
+	"""
+	:param sample: int
+		the number of rows to draw with reservoir sampling
+	:param sample_fraction: float
+		the probability of each row to be drawn, if 'sample' is None
+	:param sample_seed: int
+	:return: Sampler | None
+		a sampler of the rows of a schema instance or None to read all rows
+	"""
+	if sample is None and sample_fraction is None:
+		return None
+	return Sampler(sample, None if sample is not None else sample_fraction,
+		sample_seed)
+
+
+def get_convergence_check(converge=None, converge_interval=4096, **kwargs):
+	"""
+	:param converge: float
+		the tolerance of the changes of the collected estimates
+	:param converge_interval: int
+		the number of rows between convergence checks
+	:return: ConvergenceCheck | None
+		a check to stop collection phases early or None to collect all rows
+	"""
+	if converge is None:
+		return None
+	return ConvergenceCheck(converge, converge_interval)
+
+
+def can_merge_description(collectorset_description):
+	"""
+	:param collectorset_description: module | tuple | None
+	:return: bool
+		whether the collectors of the description can merge their states, so
+		that rows can be collected in separate ranges; True for None
+	"""
+	if collectorset_description is None:
+		return True
+	return collector.plan.can_merge(getattr(
+		collectorset_description, 'descriptions', collectorset_description))
+
+
+def is_compressed(src):
+	"""
+	:param src: io.IOBase
+	:return: bool
+		whether 'src' was opened with compression.open_file and is decompressed
+		on the fly
+	"""
+	return getattr(src, 'compression', None) is not None
+
+
+def get_source_name(src):
+	src_name = getattr(src, 'name', None)
+	return '<unknown schema instance>' if src_name is None else os.path.basename(src_name)
+
+
+def _summarize_results(multiphasecollectors, verbose=0, number_format='',
+	**kwargs
+):
+	each(report_schema_instance, multiphasecollectors)
+	if verbose >= 1:
+		each(memberfn(print_sample_summary, number_format), multiphasecollectors)
+
+
+def report_schema_instance(multiphasecollector):
+	"""
+	Records the row and column count of a collected schema instance in the
+	active run report, if any.
+
+	:param multiphasecollector: MultiphaseCollector
+	"""
+	if report.active is None:
+		return
+	item_counts = [
+		item_count
+		for item_count in map(memberfn(dict.get, ItemCountCollector),
+			multiphasecollector.merged_predecessors)
+		if item_count is not None and item_count.has_collected]
+	report.update_instance(multiphasecollector.name,
+		rows=max((item_count.count for item_count in item_counts), default=None),
+		population_rows=max(
+			map(ItemCountCollector.get_population_count, item_counts), default=None),
+		columns=multiphasecollector.columncount())
+
+
+def print_sample_summary(multiphasecollector, number_format=''):
+	"""
+	Prints the sample and population size of a sampled schema instance and
+	the 95 % confidence intervals of the averages of its numeric columns, as
+	far as their variance was collected; nothing if it wasn't sampled.
+
+	:param multiphasecollector: MultiphaseCollector
+	:param number_format: str
+	"""
+	item_counts = [
+		collector_set.get(ItemCountCollector)
+		for collector_set in multiphasecollector.merged_predecessors]
+	if not any(item_count is not None and item_count.population_count is not None
+		for item_count in item_counts
+	):
+		return
+
+	sample_size = max(item_count.count
+		for item_count in item_counts if item_count is not None)
+	population_size = max(item_count.get_population_count()
+		for item_count in item_counts if item_count is not None)
+	print('{}: sampled {:d} of {:d} rows ({:.1%})'.format(
+			multiphasecollector.name, sample_size, population_size,
+			sample_size / population_size if population_size else 1),
+		file=sys.stderr)
+
+	for column_idx, (collector_set, item_count) in enumerate(
+		zip(multiphasecollector.merged_predecessors, item_counts), 1
+	):
+		variance = collector_set.get(OnlineItemVarianceCollector)
+		if variance is None or item_count is None:
+			continue
+		population_count = (
+			variance.count * item_count.get_population_count() / item_count.count
+			if item_count.count else None)
+		interval = variance.get_confidence_interval(population_count)
+		if interval is not None:
+			print('  column {:d}: average {:{}} ± {:{}} (95 % confidence)'.format(
+					column_idx, variance.mean, number_format, interval, number_format),
+				file=sys.stderr)
+
+
 def print_phase_results(multiphasecollector, number_format=''):
 	print(multiphasecollector.merged_predecessors.as_str(number_format), file=sys.stderr)
+
+
+PROFILE_CACHE_VERSION = 1
+
+
+def get_profile_cache(profile_cache=None, profile_cache_size=256, **kwargs):
+	"""
+	:param profile_cache: str
+		the profile cache directory, if any
+	:param profile_cache_size: int
+		the size limit of the profile cache in MiB
+	:return: LRUDirectoryCache | None
+	"""
+	if not profile_cache:
+		return None
+	return LRUDirectoryCache(profile_cache, profile_cache_size << 20)
+
+
+def file_digest(src, chunk_size=1 << 20):
+	"""
+	Computes a content hash of a seekable text file and rewinds it, or of the
+	compressed file of a stream opened with compression.open_file.
+
+	:param src: io.TextIOBase
+	:return: str | None
+	"""
+	if is_compressed(src):
+		# hash the compressed file instead of decompressing it twice
+		return file_prefix_digest(src.name, os.path.getsize(src.name))
+
+	return file_digests(src, None, chunk_size)[0]
+
+
+def file_digests(src, prefix_size=None, chunk_size=1 << 20):
+	"""
+	Computes the content hash of a seekable text file like file_digest and,
+	in the same pass, that of its first 'prefix_size' bytes like
+	file_prefix_digest, and rewinds it.
+
+	:param src: io.TextIOBase
+	:param prefix_size: int | None
+	:return: (str | None, str | None)
+		the content hashes of the file and of its prefix; the latter is None if
+		'prefix_size' is None or exceeds the size of the file
+	"""
+	if is_compressed(src):
+		return file_digest(src), None
+	buffer = getattr(src, 'buffer', None)
+	if buffer is None or not buffer.seekable():
+		return None, None
+
+	digest = hashlib.sha256()
+	prefix_digest = None
+	position = 0
+	while True:
+		read_size = chunk_size
+		if prefix_size is not None and prefix_digest is None:
+			if position == prefix_size:
+				prefix_digest = digest.hexdigest()
+			else:
+				read_size = min(read_size, prefix_size - position)
+		chunk = buffer.read(read_size)
+		if not chunk:
+			break
+		digest.update(chunk)
+		position += len(chunk)
+	src.seek(0)
+	return digest.hexdigest(), prefix_digest
+
+
+def file_prefix_digest(path, size, chunk_size=1 << 20):
+	"""
+	Computes the same content hash as file_digest for the first 'size' bytes
+	of a file.
+
+	:param path: str
+	:param size: int
+	:return: str
+	"""
+	digest = hashlib.sha256()
+	with open(path, 'rb') as f:
+		while size > 0:
+			chunk = f.read(min(chunk_size, size))
+			if not chunk:
+				break
+			digest.update(chunk)
+			size -= len(chunk)
+	return digest.hexdigest()
+
+
+def profile_cache_key(source_digest, description_module, field_delimiter,
+	sampler=None, convergence=None
+):
+	"""
+	:param source_digest: str
+	:param description_module: module
+	:param field_delimiter: str
+	:param sampler: utilities.sampling.Sampler
+	:param convergence: collector.convergence.ConvergenceCheck
+	:return: str
+	"""
+	digest = hashlib.sha256()
+	parts = [
+		str(PROFILE_CACHE_VERSION), source_digest,
+		description_digest(description_module), repr(field_delimiter)]
+	if sampler is not None:
+		parts.append(repr(sampler))
+	if convergence is not None:
+		parts.append(repr(convergence))
+	for part in parts:
+		digest.update(part.encode())
+		digest.update(b'\0')
+	return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def description_digest(description_module):
+	"""
+	Identifies a collector description module by its name and source and the
+	source of the collector package.
+
+	:param description_module: module
+	:return: str
+	"""
+	digest = hashlib.sha256(description_module.__name__.encode())
+	path = getattr(description_module, '__file__', None)
+	if path:
+		with open(path, 'rb') as f:
+			digest.update(f.read())
+	digest.update(_collector_package_digest().encode())
+	return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _collector_package_digest():
+	digest = hashlib.sha256()
+	package_dir = os.path.dirname(collector.__file__)
+	for dirpath, dirnames, filenames in os.walk(package_dir):
+		dirnames.sort()
+		for filename in sorted(filenames):
+			if filename.endswith('.py'):
+				path = os.path.join(dirpath, filename)
+				digest.update(os.path.relpath(path, package_dir).encode())
+				with open(path, 'rb') as f:
+					digest.update(f.read())
+	return digest.hexdigest()
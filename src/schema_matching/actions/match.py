@@ -1,63 +1,95 @@
 import sys
-import collections, itertools, operator
-from itertools import repeat
-from functools import partial as partialfn
+import collections.abc, itertools, operator, contextlib
+from concurrent.futures import ProcessPoolExecutor
 from .. import utilities
-from ..utilities import iterator, infinity
-from ..utilities.iterator import each, map_inplace
+from ..utilities import assignment, report, operator as uoperator
 from ..utilities.functional import memberfn, composefn
+from ..collector import columntype
 from ..collector.multiphase import MultiphaseCollector
 from ..utilities.timelimit import Timelimit
-from .collect import collect
+from .collect import collect_all
 
 
 
 def match(schema_instances, collectorset_description, **kwargs):
 	assert len(schema_instances) == 2 # TODO: raise proper error
 	with Timelimit(kwargs.pop('time_limit', None)):
+		search_stats = []
 		collectors, sort_order, best_match = \
-			collect_analyse_match(schema_instances, collectorset_description, **kwargs)
-		assert len(best_match) == 1
-		_, _, best_match_norm, best_match = best_match[0]
+			collect_analyse_match(schema_instances, collectorset_description,
+				search_stats=search_stats, **kwargs)
+		assert len(best_match) == 1 and len(search_stats) == 1
+		_, _, best_match_norm, best_match, alternatives = best_match[0]
 		isreversed = not utilities.iterator.issorted(sort_order)
 
 		if kwargs.get('verbose', 0) >= 1:
-			print('norm:', format(best_match_norm, kwargs.get('number_format', '')),
+			number_format = kwargs.get('number_format', '')
+			print('norm:', format(best_match_norm, number_format),
+				*format_optimality_gap(best_match_norm, search_stats[0], number_format),
 				file=sys.stderr)
-		print_match_result(best_match, isreversed, **kwargs)
+		print_match_result(best_match, isreversed, alternatives, **kwargs)
 	return 0
 
 
-def collect_analyse_match(collectors, collectorset_description, **kwargs):
+def collect_analyse_match(collectors, collectorset_description,
+	search_stats=None, **kwargs
+):
 	"""
+	With more than one job, a single pool of worker processes serves the
+	collection and the matching of all combinations.
+
 	:param collectors: list[io.IOBase | MultiphaseCollector]
 	:param collectorset_description: object
-	:return: list[MultiphaseCollector], list[int], list[int, int, float, list[int]]
+	:param search_stats: list[dict]
+		receives the search statistics of each combination, if not None
+	:return: list[MultiphaseCollector], list[int],
+		list[int, int, float, list[int], list[(float, tuple[int])]]
 	"""
-	assert isinstance(collectors, collections.Sequence) and len(collectors) >= 2
-	collect_functor = \
-		memberfn(collect, collectorset_description.descriptions, **kwargs)
+	assert isinstance(collectors, collections.abc.Sequence) and len(collectors) >= 2
+	jobs = kwargs.get('jobs', 1)
+	with contextlib.ExitStack() as stack:
+		executor = None
+		if jobs is not None and jobs > 1:
+			executor = stack.enter_context(ProcessPoolExecutor(jobs))
+		return __collect_analyse_match(collectors, collectorset_description,
+			executor, search_stats, **kwargs)
+
 
+def __collect_analyse_match(collectors, collectorset_description, executor,
+	search_stats, **kwargs
+):
 	if isinstance(collectors[0], MultiphaseCollector):
 		assert all(map(memberfn(isinstance, MultiphaseCollector), collectors))
 		assert utilities.iterator.issorted(collectors, MultiphaseCollector.columncount)
 		sort_order = None
-		each(collect_functor, collectors)
+		collect_all(collectors, collectorset_description, executor=executor,
+			**kwargs)
 	else:
 		# The first collector shall have the least columns.
 		sort_order, collectors = \
 			utilities.iterator.sorted_with_order(
-				map(collect_functor, collectors), MultiphaseCollector.columncount)
+				collect_all(collectors, collectorset_description,
+					executor=executor, **kwargs),
+				MultiphaseCollector.columncount)
 
 	# analyse collected data
-	norms_combinations = [
-		[c1_idx, c2_idx,
-			MultiphaseCollector.results_norms(collectors[c1_idx], collectors[c2_idx],
-				collectorset_description.weights), None]
-		for c1_idx, c2_idx in itertools.combinations(range(len(collectors)), 2)]
+	norms_combinations = []
+	for c1_idx, c2_idx in itertools.combinations(range(len(collectors)), 2):
+		with report.stage('norms') as stage:
+			stage['instances'] = [collectors[c1_idx].name, collectors[c2_idx].name]
+			norms_combinations.append([c1_idx, c2_idx,
+				MultiphaseCollector.results_norms(collectors[c1_idx], collectors[c2_idx],
+					collectorset_description.weights, kwargs.get('norms_backend')),
+				None])
+
+	constraints = get_hard_constraints(collectorset_description, **kwargs)
+	if constraints:
+		for c1_idx, c2_idx, norms, _ in norms_combinations:
+			apply_hard_constraints(
+				norms, collectors[c1_idx], collectors[c2_idx], constraints)
 
 	if kwargs.get('verbose', 0) >= 1:
-		formatter = memberfn(format, kwargs.get('number_format', ''))
+		formatter = memberfn(format_norm, kwargs.get('number_format', ''))
 		for c1_idx, c2_idx, norms, _ in norms_combinations:
 			print('Per-column norms:',
 				collectors[c2_idx].name, '/', collectors[c1_idx].name,
@@ -66,73 +98,167 @@ def collect_analyse_match(collectors, collectorset_description, **kwargs):
 				sep=' |\n| ', end=' |\n\n', file=sys.stderr)
 
 	# find minimal combinations
+	alternatives_count = kwargs.get('top_k', 1) - 1
 	for norms_combination in norms_combinations: # TODO: rewrite as functional clause
-		norms_combination[2:4] = get_best_schema_mapping(norms_combination[2])
+		norms = norms_combination[2]
+		stats = dict()
+		with report.stage('matching') as stage:
+			stage['instances'] = [
+				collectors[norms_combination[0]].name,
+				collectors[norms_combination[1]].name]
+			stage['search'] = stats
+			best_match, alternatives = get_ranked_schema_mappings(norms,
+				get_best_schema_mapping(norms, kwargs.get('matcher'), stats,
+					map if executor is None else executor.map),
+				alternatives_count)
+			norms_combination[2:4] = best_match
+			norms_combination.append(alternatives)
+		if search_stats is not None:
+			search_stats.append(stats)
 
 	return collectors, sort_order, norms_combinations
 
 
-def get_best_schema_mapping(distance_matrix):
+def get_hard_constraints(collectorset_description, **kwargs):
+	"""
+	:param collectorset_description: object
+	:return: list[callable]
+	"""
+	constraints = list(getattr(collectorset_description, 'constraints', ()))
+	if kwargs.get('strict_types'):
+		constraints.append(columntype.compatible_column_types)
+	return constraints
+
+
+def apply_hard_constraints(distance_matrix, collector_a, collector_b, constraints):
 	"""
+	Forbids (i. e. sets to None) all entries of a distance matrix between column
+	pairs that violate at least one hard constraint.
+
 	:param distance_matrix: list[list[float]]
+	:param collector_a: MultiphaseCollector
+	:param collector_b: MultiphaseCollector
+	:param constraints: iterable[callable]
+		predicates over pairs of ItemCollectorSets, which are True for allowed
+		pairs
+	:return: list[list[float]]
+	"""
+	for row, b in zip(distance_matrix, collector_b.merged_predecessors):
+		for j, a in enumerate(collector_a.merged_predecessors):
+			if row[j] is not None and \
+					not all(constraint(a, b) for constraint in constraints):
+				row[j] = None
+	return distance_matrix
+
+
+def get_best_schema_mapping(distance_matrix, matcher='hungarian', stats=None,
+	map_blocks=map
+):
+	"""
+	Solves each independent block of allowed column pairs separately; see
+	utilities.assignment.decomposed_column_assignment.
+
+	:param distance_matrix: list[list[float]]
+	:param matcher: str
+	:param stats: dict
+	:param map_blocks: callable
+		a map implementation to solve blocks with, e. g. of an executor;
+		ignored while a time limit is active.
 	:return: (float, tuple[int])
 	"""
-	assert operator.eq(*utilities.minmax(map(len, distance_matrix)))
-	successor = (1).__add__
-	predecessor = (1).__rsub__
-
-	maxI = len(distance_matrix) # row count
-	maxJ = len(distance_matrix[0]) # column count
-	assert maxI >= maxJ
-	rangeJ = range(maxJ)
-	known_mappings = list(repeat(None, maxJ))
-
-	iter_unmapped = partialfn(filter,
-		composefn(known_mappings.__getitem__, partialfn(operator.is_, None)),
-		rangeJ)
-
-	def sweep_row(i, skippable_count):
-		if Timelimit.interrupted_flag or skippable_count < 0:
-			return infinity, None
-		if i == maxI:
-			return 0, tuple(known_mappings)
-
-		# try to skip column j
-		minlength, minpath = sweep_row(successor(i), predecessor(skippable_count))
-
-		for j in iter_unmapped():
-			if Timelimit.interrupted_flag:
-				break
-			d = distance_matrix[i][j]
-			if d is not None:
-				known_mappings[j] = i
-				length, path = sweep_row(successor(i), skippable_count)
-				known_mappings[j] = None
-				length += d
-				if length < minlength:
-					assert path is not None
-					minlength = length
-					minpath = path
-		return minlength, minpath
-
-	return sweep_row(0, maxI - maxJ)
-
-
-def print_match_result(column_mappings, reversed=False, **kwargs):
+	search = schema_mapping_searches[matcher or 'hungarian']
+	if Timelimit.interrupted_flag is not None:
+		map_blocks = map
+	return assignment.decomposed_column_assignment(
+		distance_matrix, search, stats, map_blocks)
+
+
+def get_ranked_schema_mappings(distance_matrix, best_match, count):
+	"""
+	Returns the best mapping and the next best 'count' mappings in the order
+	of ascending norms.
+
+	The best match of the chosen matcher is merged into the ranking of
+	utilities.assignment.ranked_column_assignments. If the matcher didn't
+	find the optimum, e. g. because it was interrupted, a better mapping from
+	the ranking becomes the best mapping, and 'best_match' is ranked by its
+	norm among the alternatives.
+
+	:param distance_matrix: list[list[float]]
+	:param best_match: (float, tuple[int])
+	:param count: int
+	:return: (float, tuple[int]), list[(float, tuple[int])]
+	"""
+	best_mapping = best_match[1]
+	if count <= 0 or best_mapping is None:
+		return best_match, []
+	ranked_mappings = [best_match]
+	ranked_mappings.extend(itertools.filterfalse(
+		composefn(operator.itemgetter(1), best_mapping.__eq__),
+		itertools.islice(
+			assignment.ranked_column_assignments(distance_matrix), count + 1)))
+	# stable, so that 'best_match' stays first among equal norms
+	ranked_mappings.sort(key=operator.itemgetter(0))
+	return ranked_mappings[0], ranked_mappings[1:count + 1]
+
+
+schema_mapping_searches = {
+	'hungarian': assignment.min_cost_column_assignment,
+	'branch-and-bound': assignment.branch_and_bound_column_assignment,
+	'exhaustive': assignment.exhaustive_column_assignment,
+}
+
+
+def format_optimality_gap(norm, stats, number_format=''):
+	"""
+	:param norm: float
+	:param stats: dict
+	:param number_format: str
+	:return: tuple[str]
+	"""
+	if not stats.get('interrupted'):
+		return ()
+	lower_bound = stats.get('lower_bound')
+	if lower_bound is None:
+		return ('(interrupted, optimality gap unknown)',)
+	return ('(interrupted, optimality gap ≤ {:{}})'.format(
+		norm - lower_bound, number_format),)
+
+
+def print_match_result(column_mappings, reversed=False, alternatives=(), **kwargs):
 	"""
 	:param column_mappings: list[int]
 	:param reversed: bool
+	:param alternatives: list[(float, list[int])]
 	:param offset: int
 	"""
+	__print_column_mappings(column_mappings, reversed, **kwargs)
+
+	out = kwargs.get('output', sys.stdout)
+	number_format = kwargs.get('number_format', '')
+	for rank, (norm, alternative) in enumerate(alternatives, 2):
+		print('', '#{:d}, norm: {:{}}'.format(rank, norm, number_format),
+			sep='\n', file=out)
+		__print_column_mappings(alternative, reversed, **kwargs)
+
+
+def __print_column_mappings(column_mappings, reversed=False, **kwargs):
 	if not column_mappings:
 		return
 
 	offset = kwargs.get('column_offset', 1)
+	column_mappings = tuple(itertools.filterfalse(
+		composefn(uoperator.second, uoperator.isnone),
+		enumerate(column_mappings)))
 	column_mappings = [
-		map(str, range(offset, offset + len(column_mappings))),
-		map(composefn(offset.__add__, str), column_mappings)
+		map(composefn(uoperator.first, offset.__add__, str), column_mappings),
+		map(composefn(uoperator.second, offset.__add__, str), column_mappings)
 	]
 	if reversed:
 		column_mappings.reverse()
 	print(*map(' <-> '.join, map(tuple, zip(*column_mappings))),
 		sep='\n', file=kwargs.get('output', sys.stdout))
+
+
+def format_norm(norm, format_spec=''):
+	return '-' if norm is None else format(norm, format_spec)
@@ -2,9 +2,10 @@ import sys, os.path, operator
 from math import fsum
 from operator import itemgetter
 from .. import utilities
+from ..utilities import compression
 from ..utilities.iterator import sort_by_order
 from ..utilities.functional import memberfn
-from .match import collect_analyse_match
+from .match import collect_analyse_match, print_match_result
 
 
 
@@ -36,15 +37,19 @@ def validate_stats(schema_instances, collectorset_description, **kwargs):
 	counts = (
 		validate_result(
 			(schema_instances[c1_idx].name, schema_instances[c2_idx].name),
-			best_match, best_match_norm, print_total, **kwargs)
-		for c1_idx, c2_idx, best_match_norm, best_match in best_matches)
+			best_match, best_match_norm, print_total, alternatives, **kwargs)
+		for c1_idx, c2_idx, best_match_norm, best_match, alternatives
+			in best_matches)
 	return (collectors, sort_order, best_matches, tuple(map(sum, zip(*counts))))
 
 
-def validate_result(schema_instance_paths, found_mappings, norm, print_names=False, **kwargs):
+def validate_result(schema_instance_paths, found_mappings, norm,
+	print_names=False, alternatives=(), **kwargs
+):
 	"""
 	:param schema_instance_paths: list[str | io.IOBase]
 	:param found_mappings: list[int]
+	:param alternatives: list[(float, list[int])]
 	:return: (int, int, int, int)
 	"""
 	assert len(schema_instance_paths) == 2
@@ -94,6 +99,11 @@ def validate_result(schema_instance_paths, found_mappings, norm, print_names=Fal
 			kwargs.get('number_format', '')),
 		end='\n\n', file=out)
 
+	if alternatives:
+		print('Alternative mappings:', end='', file=out)
+		print_match_result(None, False, alternatives, **kwargs)
+		print(file=out)
+
 	return successful_count, invalid_count, impossible_count, missing_count
 
 
@@ -102,6 +112,7 @@ def read_schema_descriptor(schema_src):
 	:param schema_src: str | io.IOBase
 	:return: dict[int, int]
 	"""
+	schema_src = compression.strip_suffix(schema_src)
 	with open(os.path.splitext(schema_src)[0] + '_desc.txt') as f:
 		return {
 			int(mapped): int(original)
@@ -1,4 +1,4 @@
-import copy
+import copy, math, operator, itertools
 
 
 
@@ -44,11 +44,111 @@ class ItemCollector(object):
 		pass
 
 
+	def collect_batch(self, items, collector_set):
+		"""Called with a sequence of consecutive items in a column instead of
+		'collect' for each of them.
+
+		Dependencies are guaranteed to have collected the same items before this
+		collector. Override this in subclasses that can process many items more
+		efficiently than one at a time.
+		"""
+		collect = self.collect
+		for item in items:
+			collect(item, collector_set)
+
+
+	def collect_weighted(self, items, weights, collector_set):
+		"""Called with distinct items of a column and the number of their
+		occurrences instead of 'collect_batch' with each of them repeated as
+		often.
+
+		Dependencies are guaranteed to have collected the same items before this
+		collector. Override this in subclasses that can process an item with a
+		weight more efficiently than all its occurrences.
+		"""
+		self.collect_batch(
+			list(itertools.chain.from_iterable(map(itertools.repeat, items, weights))),
+			collector_set)
+
+
+	@classmethod
+	def collects_items(cls):
+		"""Whether this collector overrides 'collect' or 'collect_batch'."""
+		return not (cls.collect is ItemCollector.collect and
+			cls.collect_batch is ItemCollector.collect_batch)
+
+
+	def merge(self, other):
+		"""Adds the state of another collector of the same type and phase, that
+		collected the items of the same column following the ones of this
+		collector, as if this collector had collected them itself.
+
+		Collectors that don't collect items have no state to merge; others must
+		override this. Raises ValueError if the state of 'other' depends on
+		different parameters, e. g. results of a previous phase.
+
+		:param other: ItemCollector
+		:return: self
+		"""
+		if self.collects_items():
+			raise NotImplementedError(
+				'{} can\'t merge its state'.format(type(self).__name__))
+		return self
+
+
+	@classmethod
+	def can_merge(cls):
+		"""Whether this collector overrides 'merge' or has no state to merge."""
+		return cls.merge is not ItemCollector.merge or not cls.collects_items()
+
+
 	def get_result(self, collector_set):
 		"""Returns the result of this collector after all items have been collected."""
 		raise NotImplementedError
 
 
+	@property
+	def is_saturated(self):
+		"""Whether further items of the current phase can't change the result,
+		so that they needn't be passed to this collector anymore.
+		"""
+		return False
+
+
+	def get_estimate(self):
+		"""Returns an estimate of the result from the items collected so far in the
+		current phase, whose changes tell whether the result has converged, or
+		None if there are no items to estimate it from yet. Estimates must not
+		change with further items; see estimate_change.
+
+		Override this in subclasses whose results stabilise with the number of
+		items, e. g. averages or distributions.
+		"""
+		return None
+
+
+	@classmethod
+	def provides_estimate(cls):
+		"""Whether this collector overrides 'get_estimate'."""
+		return cls.get_estimate is not ItemCollector.get_estimate
+
+
+	@staticmethod
+	def estimate_change(a, b):
+		"""Returns the change from estimate 'a' to 'b' relative to the magnitude
+		of 'b'. This implementation expects numbers or tuples of numbers of the
+		same scale, e. g. an average with its standard deviation.
+		"""
+		if not isinstance(a, tuple):
+			a = (a,)
+			b = (b,)
+		change = max(map(abs, map(operator.sub, a, b)))
+		scale = max(map(abs, b))
+		if scale:
+			return change / scale
+		return 0.0 if not change else math.inf
+
+
 	@property
 	def has_collected(self): return self.__has_collected
 	def set_collected(self): self.__has_collected = True
@@ -12,7 +12,11 @@ from .itemcount import ItemCountCollector
 __decimal_regex = re.compile(r"\s*([-+]?)(|\d[^,.]*?|[^,.]*\d|.*?([,.]).*?)\s*$")
 
 def decimal_info(item):
-	m = re.match(__decimal_regex, item)
+	info = _plain_decimal_info(item)
+	if info is not None:
+		return info
+
+	m = __decimal_regex.match(item)
 	if not m:
 		return None
 
@@ -36,6 +40,28 @@ def decimal_info(item):
 	return decimal_separator, total_len, invalid_char_count
 
 
+def _plain_decimal_info(item):
+	"""
+	Returns the same as decimal_info for items consisting of an optional sign,
+	decimal digits and at most one decimal separator, and None for all others.
+	"""
+	digits = item[1:] if item[:1] in ('-', '+') else item
+	dot = digits.find('.')
+	comma = digits.find(',')
+	if comma < 0 or 0 <= dot < comma:
+		separator_idx, decimal_separator = dot, '.'
+	else:
+		separator_idx, decimal_separator = comma, ','
+	if separator_idx >= 0:
+		digits = digits[:separator_idx] + digits[separator_idx+1:]
+	else:
+		decimal_separator = ''
+	# decimal characters are exactly the ones matched by '\d'
+	if digits.isdecimal():
+		return decimal_separator, len(item), 0
+	return None
+
+
 def tofloat(item):
 	item = item.replace(',', '.', 1)
 	try:
@@ -56,13 +82,16 @@ def _make_type_distance_matrix(type_sequence):
 	return [
 		[
 				float(a is not b)
-			if isinstance(a, Number) is isinstance(b, Number) else
+			if issubclass(a, Number) is issubclass(b, Number) else
 				infinity
 			for a in type_sequence
 		]
 		for b in type_sequence
 	]
 
+_VALID, _TOLERATED, _INVALID = range(3)
+
+
 class ColumnTypeItemCollector(ItemCollector):
 
 	result_dependencies = (ItemCountCollector,)
@@ -86,6 +115,11 @@ class ColumnTypeItemCollector(ItemCollector):
 		super().__init__()
 		self.__type_index = -1
 		self.__tolerance_exceeded_count = 0
+		self.__item_count = 0
+		# how the int-like items before the first other one would have fared
+		# with a float column; see merge
+		self.__int_prefix_tolerated = 0
+		self.__int_prefix_invalid = False
 
 		self.max_invalid_absolute = max_invalid_absolute
 		self.max_invalid_relative = max_invalid_relative
@@ -97,40 +131,219 @@ class ColumnTypeItemCollector(ItemCollector):
 
 	def collect(self, item, collector_set = None):
 		assert not self.has_collected
+		self.__item_count += 1
 		if self.__type_index <= 0: # none or int
-			if item == '-' or item.isdigit():
+			if item == '-':
+				# a missing number, which doesn't make a column numeric by itself
+				return
+			if item.isdecimal():
 				self.__type_index = 0
 				return
+			if item.isdigit():
+				self.__type_index = 0
+				self.__add_int_prefix_item(item)
+				return
 			self.__type_index = 1
 
 		if self.__type_index == 1: # float
-			info = decimal_info(item)
-			if info:
-				if not info[2]:
-					return
-				if (info[2] <= self.max_invalid_absolute and
-					info[2] <= info[1] * self.max_invalid_relative
+			decimal_class = self.__get_decimal_class(item)
+			if decimal_class == _VALID:
+				return
+			if decimal_class == _TOLERATED:
+				self.__tolerance_exceeded_count += 1
+				# without a known item count the tolerance is checked later
+				if (self.__total_max_invalid_absolute is None or
+					not self.__total_max_invalid_absolute < self.__tolerance_exceeded_count
 				):
-					self.__tolerance_exceeded_count += 1
-					if not self.__total_max_invalid_absolute < self.__tolerance_exceeded_count:
-						return
+					return
 			self.__type_index += 1
 
 
+	def collect_batch(self, items, collector_set = None):
+		"""
+		Classifies each distinct item only once and then advances through the
+		same states as 'collect' would for each item.
+		"""
+		assert not self.has_collected
+		self.__item_count += len(items)
+		if self.__type_index == 2 or not items: # already str
+			return
+
+		if self.__type_index <= 0: # none or int
+			isint = {item: self.__isint(item) for item in set(items)}
+			try:
+				start = list(map(isint.__getitem__, items)).index(False)
+			except ValueError:
+				start = None
+			nondecimal = frozenset(item
+				for item, item_isint in isint.items()
+				if item_isint and not (item == '-' or item.isdecimal()))
+			if nondecimal:
+				for item in items[:start]:
+					if item in nondecimal:
+						self.__add_int_prefix_item(item)
+			if start is None:
+				if any(item != '-' for item in isint):
+					self.__type_index = 0
+				return
+			self.__type_index = 1
+			items = items[start:]
+
+		# float
+		decimal_classes = {item: self.__get_decimal_class(item) for item in set(items)}
+		decimal_classes = list(map(decimal_classes.__getitem__, items))
+		try:
+			stop = decimal_classes.index(_INVALID)
+		except ValueError:
+			stop = len(decimal_classes)
+		else:
+			self.__type_index = 2
+			del decimal_classes[stop:]
+
+		tolerance_exceeded_count = \
+			self.__tolerance_exceeded_count + decimal_classes.count(_TOLERATED)
+		if (self.__total_max_invalid_absolute is not None and
+			self.__total_max_invalid_absolute < tolerance_exceeded_count
+		):
+			# 'collect' stops counting after the first excess item
+			tolerance_exceeded_count = self.__total_max_invalid_absolute + 1
+			self.__type_index = 2
+		self.__tolerance_exceeded_count = tolerance_exceeded_count
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		"""
+		Classifies each item only once and advances through the same states as
+		'collect_batch' would for the items repeated as often as their weights.
+		"""
+		assert not self.has_collected
+		self.__item_count += sum(weights)
+		if self.__type_index == 2 or not items: # already str
+			return
+
+		start = 0
+		if self.__type_index <= 0: # none or int
+			start = None
+			for item_idx, item in enumerate(items):
+				if not self.__isint(item):
+					start = item_idx
+					break
+			for item, weight in zip(items[:start], weights[:start]):
+				if not (item == '-' or item.isdecimal()):
+					self.__add_int_prefix_item(item, weight)
+			if start is None:
+				if any(item != '-' for item in items):
+					self.__type_index = 0
+				return
+			self.__type_index = 1
+
+		# float
+		tolerance_exceeded_count = self.__tolerance_exceeded_count
+		for item, weight in zip(items[start:], weights[start:]):
+			decimal_class = self.__get_decimal_class(item)
+			if decimal_class == _INVALID:
+				self.__type_index = 2
+				break
+			if decimal_class == _TOLERATED:
+				tolerance_exceeded_count += weight
+
+		if (self.__total_max_invalid_absolute is not None and
+			self.__total_max_invalid_absolute < tolerance_exceeded_count
+		):
+			# 'collect' stops counting after the first excess item
+			tolerance_exceeded_count = self.__total_max_invalid_absolute + 1
+			self.__type_index = 2
+		self.__tolerance_exceeded_count = tolerance_exceeded_count
+
+
+	def merge(self, other):
+		"""
+		Both collectors must have the same item count threshold, i. e. the same
+		item count collector or none.
+		"""
+		if self.__total_max_invalid_absolute != other.__total_max_invalid_absolute:
+			raise ValueError(
+				'Column type collectors with different thresholds can\'t be merged')
+		self.__item_count += other.__item_count
+		if self.__type_index == 2: # str
+			return self
+
+		if self.__type_index <= 0: # none or int
+			# 'other' started in the same state
+			if not self.__int_prefix_invalid:
+				self.__int_prefix_tolerated += other.__int_prefix_tolerated
+				self.__int_prefix_invalid = other.__int_prefix_invalid
+			self.__type_index = max(self.__type_index, other.__type_index)
+			self.__tolerance_exceeded_count = other.__tolerance_exceeded_count
+			return self
+
+		# float: the int-like items of 'other' would have been decimals
+		tolerance_exceeded_count = \
+			self.__tolerance_exceeded_count + other.__int_prefix_tolerated
+		if other.__int_prefix_invalid:
+			self.__type_index = 2
+		else:
+			tolerance_exceeded_count += other.__tolerance_exceeded_count
+			self.__type_index = max(self.__type_index, other.__type_index)
+		if (self.__total_max_invalid_absolute is not None and
+			self.__total_max_invalid_absolute < tolerance_exceeded_count
+		):
+			tolerance_exceeded_count = self.__total_max_invalid_absolute + 1
+			self.__type_index = 2
+		self.__tolerance_exceeded_count = tolerance_exceeded_count
+		return self
+
+
+	@staticmethod
+	def __isint(item):
+		return item == '-' or item.isdigit()
+
+
+	def __add_int_prefix_item(self, item, weight=1):
+		# only int-like items with digits other than '0'-'9' may be invalid or
+		# tolerated decimals
+		if not self.__int_prefix_invalid:
+			decimal_class = self.__get_decimal_class(item)
+			if decimal_class == _TOLERATED:
+				self.__int_prefix_tolerated += weight
+			elif decimal_class == _INVALID:
+				self.__int_prefix_invalid = True
+
+
+	def __get_decimal_class(self, item):
+		info = decimal_info(item)
+		if info:
+			if not info[2]:
+				return _VALID
+			if (info[2] <= self.max_invalid_absolute and
+				info[2] <= info[1] * self.max_invalid_relative
+			):
+				return _TOLERATED
+		return _INVALID
+
+
+	@property
+	def is_saturated(self):
+		return self.__type_index == 2 # str
+
+
 	def get_result(self, collector_set = None):
 		assert self.has_collected
-		if self.__type_index == 1 and self.__total_max_invalid_absolute is None:
-			set_length = self.__get_set_length(collector_set)
-			self.__total_max_invalid_absolute = \
-				0 if set_length is None else int(set_length * self.total_max_invalid)
-			if self.__total_max_invalid_absolute < self.__tolerance_exceeded_count:
-				self.__type_index += 1
-
-		return self.__type_sequence[self.__type_index]
+		return self.__type_sequence[self.__get_type_index()]
 
 
 	def get_transformer(self):
-		return self.__transformers[self.__type_index]
+		return self.__transformers[self.__get_type_index()]
+
+
+	def __get_type_index(self):
+		# without a known item count check the tolerance now, but leave the
+		# state as it is to allow merging
+		if (self.__type_index == 1 and self.__total_max_invalid_absolute is None and
+			int(self.__item_count * self.total_max_invalid) < self.__tolerance_exceeded_count
+		):
+			return 2
+		return self.__type_index
 
 
 	@staticmethod
@@ -152,6 +365,23 @@ class ColumnTypeItemCollector(ItemCollector):
 
 
 
+def compatible_column_types(a, b):
+	"""
+	A hard matching constraint that forbids pairs of numeric and non-numeric
+	columns.
+
+	:param a: ItemCollectorSet
+	:param b: ItemCollectorSet
+	:return: bool
+	"""
+	a = a.get(ColumnTypeItemCollector)
+	b = b.get(ColumnTypeItemCollector)
+	return (a is None or b is None or
+		ColumnTypeItemCollector.result_norm(a.get_result(), b.get_result())
+			!= infinity)
+
+
+
 class factory(object):
 
 	__pre_dependencies = (ColumnTypeItemCollector,)
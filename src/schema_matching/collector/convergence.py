@@ -0,0 +1,150 @@
+import math, collections.abc
+
+
+
+class ConvergenceCheck(object):
+	"""
+	Stops the collection of a phase early, once the estimates of the results
+	of all collectors of the phase that provide one (see
+	ItemCollector.get_estimate) changed by no more than 'tolerance' between two
+	checkpoints 'interval' rows apart. Phases without such collectors collect
+	all rows.
+
+	Rows are visited in a strided order that spreads over the whole rowset
+	(see StridedOrder), so that the rows collected until then aren't biased by
+	the order of the source, e. g. of a sorted file. This requires random
+	access to the rows, i. e. a ColumnarRowset or a sequence.
+	"""
+
+	def __init__(self, tolerance, interval=4096):
+		"""
+		:param tolerance: float
+			the largest change of an estimate between checkpoints, that counts
+			as converged; see ItemCollector.estimate_change
+		:param interval: int
+			the number of rows between checkpoints
+		"""
+		assert tolerance >= 0 and interval >= 1
+		super().__init__()
+		self.tolerance = tolerance
+		self.interval = interval
+		self.order = None
+		self.row_count = None
+		self.__estimates = None
+
+
+	@staticmethod
+	def applies_to(collector_sets):
+		"""
+		:param collector_sets: iterable[ItemCollectorSet]
+		:return: bool
+			whether any collector of the current phase provides an estimate
+		"""
+		return any(
+			not collector.has_collected and collector.provides_estimate()
+			for collector_set in collector_sets
+			for collector in collector_set.values())
+
+
+	def column_batches(self, rows):
+		"""
+		:param rows: ColumnarRowset | sequence[list]
+		:return: iterable[tuple[list]]
+			the items of all columns in batches of 'interval' rows in strided
+			order; 'row_count' holds the number of rows visited so far.
+		"""
+		order = self.order = StridedOrder(len(rows))
+		self.row_count = 0
+		self.__estimates = None
+		interval = self.interval
+		column_batches = getattr(rows, 'column_batches', None)
+		if column_batches is not None:
+			batches = column_batches(interval, order)
+		else:
+			batches = (
+				tuple(zip(*map(rows.__getitem__, order[start:start + interval])))
+				for start in range(0, len(order), interval))
+
+		for columns in batches:
+			self.row_count = min(self.row_count + interval, len(order))
+			yield columns
+
+
+	def has_converged(self, collector_sets):
+		"""
+		Compares the estimates of the collectors of the current phase to those
+		at the previous checkpoint, if any.
+
+		:param collector_sets: iterable[ItemCollectorSet]
+		:return: bool
+		"""
+		collectors = [
+			collector
+			for collector_set in collector_sets
+			for collector in collector_set.values()
+			if not collector.has_collected and collector.provides_estimate()]
+		estimates = [collector.get_estimate() for collector in collectors]
+		previous_estimates, self.__estimates = self.__estimates, estimates
+		if previous_estimates is None or not collectors:
+			return False
+		return all(map(self.__has_converged,
+			collectors, previous_estimates, estimates))
+
+
+	def __has_converged(self, collector, previous_estimate, estimate):
+		if previous_estimate is None or estimate is None:
+			# no items so far or since
+			return previous_estimate is estimate
+		return collector.estimate_change(previous_estimate, estimate) <= self.tolerance
+
+
+	@property
+	def has_stopped(self):
+		"""Whether the last phase stopped before all rows were collected."""
+		return self.row_count is not None and self.row_count < len(self.order)
+
+
+	def __repr__(self):
+		return '{}(tolerance={!r}, interval={!r})'.format(
+			type(self).__name__, self.tolerance, self.interval)
+
+
+
+class StridedOrder(collections.abc.Sequence):
+	"""
+	A permutation of the indices of 'count' rows, that visits every
+	'stride'-th row modulo 'count', where 'stride' is the closest number to
+	'count' divided by the golden ratio that is coprime to 'count'. Any prefix
+	of the permutation spreads evenly over all rows.
+	"""
+
+	__inverse_golden_ratio = (math.sqrt(5) - 1) / 2
+
+
+	def __init__(self, count):
+		super().__init__()
+		self.count = count
+		stride = max(round(count * self.__inverse_golden_ratio), 1)
+		while math.gcd(stride, count) > 1:
+			stride += 1
+		self.stride = stride
+
+
+	def __len__(self):
+		return self.count
+
+
+	def __getitem__(self, index):
+		"""
+		:param index: int | slice
+		:return: int | list[int]
+		"""
+		count = self.count
+		stride = self.stride
+		if isinstance(index, slice):
+			return [i * stride % count for i in range(*index.indices(count))]
+		if index < 0:
+			index += count
+		if not 0 <= index < count:
+			raise IndexError(index)
+		return index * stride % count
@@ -2,8 +2,8 @@ from ...weight import WeightDict, normalize_exp
 from ... import columntype
 from ...itemaverage import ItemAverageCollector
 from ...letteraverage import ItemLetterAverageCollector
-from ...variance import ItemVariationCoefficientCollector
-from ...lettervariance import LetterVariationCoefficient
+from ...onlinevariance import (
+	OnlineItemVariationCoefficientCollector, OnlineLetterVariationCoefficient)
 from ...itemprobability import ItemProbabilityCollector
 from ...letterprobability import LetterProbablilityCollector
 from ...letterentropy import NormalizedLetterEntropyCollector
@@ -16,7 +16,7 @@ descriptions = (
 	columntype.factory(
 		ItemLetterAverageCollector, ItemAverageCollector),
 	columntype.factory(
-		LetterVariationCoefficient, ItemVariationCoefficientCollector),
+		OnlineLetterVariationCoefficient, OnlineItemVariationCoefficientCollector),
 	columntype.factory(
 		LetterProbablilityCollector, ItemProbabilityCollector),
 	columntype.factory(
@@ -15,6 +15,9 @@ class ItemCountCollector(ItemCollector):
 			self.count = 0
 			assert previous_collector_set is None or \
 				isinstance(previous_collector_set, ItemCollectorSet)
+		# the estimated item count of the whole column if only a sample of its
+		# items is collected
+		self.population_count = None
 
 
 	def collect(self, item, collector_set = None):
@@ -22,6 +25,33 @@ class ItemCountCollector(ItemCollector):
 		self.count += 1
 
 
+	def collect_batch(self, items, collector_set = None):
+		assert not self.has_collected
+		self.count += len(items)
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		assert not self.has_collected
+		self.count += sum(weights)
+
+
+	def merge(self, other):
+		self.count += other.count
+		if self.population_count is not None or other.population_count is not None:
+			self.population_count = \
+				self.get_population_count() + other.get_population_count()
+		return self
+
+
+	def get_population_count(self):
+		"""
+		:return: int
+			the (estimated) item count of the whole column, of which this
+			collector may have collected a sample
+		"""
+		return self.count if self.population_count is None else self.population_count
+
+
 	def get_result(self, collector_set = None):
 		assert self.has_collected
 		return self.count
@@ -5,7 +5,7 @@ from .columntype import ColumnTypeItemCollector
 from .itemcount import ItemCountCollector
 from .minitem import MinItemCollector
 from .maxitem import MaxItemCollector
-from .variance import ItemVarianceCollector
+from .onlinevariance import OnlineItemVarianceCollector
 from ..utilities.distribution import (
 	UniformBinDistributionTable, SparseDistributionTable)
 
@@ -13,7 +13,7 @@ from ..utilities.distribution import (
 
 class ItemFrequencyCollector(ItemCollector):
 
-	pre_dependencies = (ItemCountCollector, MinItemCollector, MaxItemCollector, ItemVarianceCollector)
+	pre_dependencies = (ItemCountCollector, MinItemCollector, MaxItemCollector, OnlineItemVarianceCollector)
 
 
 	def __init__(self, previous_collector_set):
@@ -39,5 +39,24 @@ class ItemFrequencyCollector(ItemCollector):
 			self.frequencies.increase(item)
 
 
+	def collect_batch(self, items, collector_set=None):
+		self.frequencies.increase_all(
+			[item for item in items if item is not None])
+
+
+	def collect_weighted(self, items, weights, collector_set=None):
+		increase = self.frequencies.increase
+		for item, weight in zip(items, weights):
+			if item is not None:
+				increase(item, weight)
+
+
+	def merge(self, other):
+		if type(self.frequencies) is not type(other.frequencies):
+			raise ValueError('Different kinds of distribution tables can\'t be merged')
+		self.frequencies.merge(other.frequencies)
+		return self
+
+
 	def get_result(self, collector_set=None):
 		return self.frequencies
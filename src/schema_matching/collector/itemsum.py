@@ -1,5 +1,6 @@
 from math import isnan
 from .base import ItemCollector
+from ..utilities.operator import second
 
 
 
@@ -19,5 +20,33 @@ class ItemSumCollector(ItemCollector):
 			self.type_error_count += 1
 
 
+	def collect_batch(self, items, collector_set = None):
+		values = [item for item in items if item is not None]
+		try:
+			# skip NaN like 'collect'
+			self.sum = sum([item for item in values if item == item], self.sum)
+		except TypeError:
+			ItemCollector.collect_batch(self, values, collector_set)
+		self.type_error_count += len(items) - len(values)
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		values = [
+			(item, weight) for item, weight in zip(items, weights)
+			if item is not None]
+		try:
+			self.sum = sum(
+				[item * weight for item, weight in values if item == item], self.sum)
+		except TypeError:
+			ItemCollector.collect_weighted(self, *zip(*values), collector_set)
+		self.type_error_count += sum(weights) - sum(map(second, values))
+
+
+	def merge(self, other):
+		self.sum += other.sum
+		self.type_error_count += other.type_error_count
+		return self
+
+
 	def get_result(self, collector_set = None):
 		return self.sum
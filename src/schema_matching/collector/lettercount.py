@@ -1,3 +1,4 @@
+import operator
 from .base import ItemCollector
 
 if __debug__:
@@ -17,5 +18,20 @@ class ItemLetterCountCollector(ItemCollector):
 		self.letter_count += len(item)
 
 
+	def collect_batch(self, items, collector_set = None):
+		assert all(isinstance(item, basestring) for item in items)
+		self.letter_count += sum(map(len, items))
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		assert all(isinstance(item, basestring) for item in items)
+		self.letter_count += sum(map(operator.mul, map(len, items), weights))
+
+
+	def merge(self, other):
+		self.letter_count += other.letter_count
+		return self
+
+
 	def get_result(self, collector_set = None):
 		return self.letter_count
@@ -19,7 +19,10 @@ class LetterEntropyCollector(ItemCollector):
 
 	def get_result(self, collector_set):
 		dist = collector_set[LetterProbablilityCollector].get_result(collector_set)
-		base = len(dist) if self.base is NORMALIZED else self.base
+		base = len(dist) if self.base == NORMALIZED else self.base
+		if base == 1:
+			# a single letter carries no information
+			return 0.0
 		return -fsum(map(self.__event_entropy, filter(None, dist.values()))) / log(base)
 
 
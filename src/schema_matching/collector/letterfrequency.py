@@ -1,3 +1,4 @@
+from collections import Counter, defaultdict
 from .base import ItemCollector
 from ..utilities.distribution import SparseDistributionTable
 
@@ -19,9 +20,46 @@ class LetterFrequencyCollector(ItemCollector):
 			self.frequencies[c] += 1
 
 
+	def collect_batch(self, items, collector_set=None):
+		assert all(isinstance(item, basestring) for item in items)
+		self.frequencies.increase_all(''.join(items))
+
+
+	def collect_weighted(self, items, weights, collector_set=None):
+		assert all(isinstance(item, basestring) for item in items)
+		# count the letters of all items with the same weight at once
+		weight_items = defaultdict(list)
+		for item, weight in zip(items, weights):
+			weight_items[weight].append(item)
+		frequencies = self.frequencies
+		for weight, items in weight_items.items():
+			for c, count in Counter(''.join(items)).items():
+				frequencies[c] += count * weight
+
+
+	def merge(self, other):
+		self.frequencies.merge(other.frequencies)
+		return self
+
+
 	def get_result(self, collector_set=None):
 		return self.frequencies
 
 
+	def get_estimate(self):
+		"""
+		:return: SparseDistributionTable | None
+			the letter distribution of the items collected so far
+		"""
+		if not self.frequencies:
+			return None
+		return self.frequencies.normalize()
+
+
+	@staticmethod
+	def estimate_change(a, b):
+		return a.distance_to(b)
+
+
 	def as_str(self, collector_set=None, number_fmt=''):
 		return format(self.get_result(collector_set), number_fmt)
@@ -25,6 +25,20 @@ class LetterVarianceCollector(ItemCollector):
 		self.sum_of_squares += square(len(item) - self.letter_average)
 
 
+	def collect_weighted(self, items, weights, collector_set = None):
+		letter_average = self.letter_average
+		self.sum_of_squares += sum(
+			square(len(item) - letter_average) * weight
+			for item, weight in zip(items, weights))
+
+
+	def merge(self, other):
+		if self.letter_average != other.letter_average:
+			raise ValueError('Variances around different averages can\'t be merged')
+		self.sum_of_squares += other.sum_of_squares
+		return self
+
+
 	def get_result(self, collector_set):
 		return self.sum_of_squares / collector_set[ItemLetterCountCollector].get_result()
 
@@ -15,5 +15,21 @@ class MaxItemCollector(ItemCollector):
 			self.max = item
 
 
+	def collect_batch(self, items, collector_set = None):
+		# NaN never compares greater than anything
+		values = [item for item in items if item is not None and item == item]
+		if values:
+			self.collect(max(values), collector_set)
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		self.collect_batch(items, collector_set)
+
+
+	def merge(self, other):
+		self.collect(other.max)
+		return self
+
+
 	def get_result(self, collector_set = None):
 		return self.max
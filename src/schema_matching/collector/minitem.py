@@ -15,5 +15,21 @@ class MinItemCollector(ItemCollector):
 			self.min = item
 
 
+	def collect_batch(self, items, collector_set = None):
+		# NaN never compares less than anything
+		values = [item for item in items if item is not None and item == item]
+		if values:
+			self.collect(min(values), collector_set)
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		self.collect_batch(items, collector_set)
+
+
+	def merge(self, other):
+		self.collect(other.min)
+		return self
+
+
 	def get_result(self, collector_set = None):
 		return self.min
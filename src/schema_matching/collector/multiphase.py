@@ -1,16 +1,15 @@
-import copy, collections
-from ..utilities import iterator as uiterator
-from itertools import filterfalse, zip_longest, islice, chain
-from functools import partial as partialfn
-from ..utilities.iterator import each, consume
+import sys, copy, collections.abc
+from ..utilities.iterator import each
 from ..utilities.functional import memberfn, composefn
+from ..utilities import report
 
-from .base import ItemCollector
-from .tag import TagCollector
 from .set import ItemCollectorSet
 from .rows import RowCollector
+from .rowset import StreamingRowset, ChunkedRowset, ColumnarRowset
 from .itemcount import ItemCountCollector
 from .columntype import ColumnTypeItemCollector
+from .plan import compile_plan
+from . import profiling
 
 if __debug__:
 	import operator
@@ -20,12 +19,75 @@ if __debug__:
 class MultiphaseCollector(object):
 	"""Manages a sequence of collection phases"""
 
-	def __init__(self, rowset, name=None, verbosity=0):
+	def __init__(self, rowset, name=None, verbosity=0, source_digest=None,
+		sampler=None, convergence=None, deduplicate=False
+	):
+		"""
+		:param rowset: iterable[list] | ColumnarRowset | StreamingRowset |
+				ChunkedRowset | None
+			None if the collector is only going to hold previous results; see
+			from_results. A StreamingRowset or ChunkedRowset is read again for
+			every phase instead of being kept in memory.
+		:param name: str
+		:param verbosity: int
+		:param source_digest: str
+			a content hash of the source of 'rowset', if known
+		:param sampler: utilities.sampling.Sampler
+			the sampler that drew 'rowset' from its source, if any; the item
+			counts of the whole columns are estimated from its population and
+			sample size.
+		:param convergence: ConvergenceCheck
+			stops the first phase early whose results have converged; all
+			following phases collect only the rows collected until then. The
+			item counts of the whole columns are estimated from the share of
+			those rows. Requires an in-memory rowset.
+		:param deduplicate: bool
+			collect the distinct items of each column with the number of their
+			occurrences; see RowCollector.collect_all
+		"""
+		assert convergence is None or not isinstance(
+			rowset, (StreamingRowset, ChunkedRowset))
 		self.name = name
 		self.verbosity = verbosity
-		self.rowset = rowset if isinstance(rowset, collections.Sequence) else tuple(rowset)
-		#assert operator.eq(*utilities.minmax(map(len, self.rowset)))
-		self.reset(None)
+		self.source_digest = source_digest
+		self.sampler = sampler
+		self.convergence = convergence
+		self.deduplicate = deduplicate
+		if rowset is None:
+			self.rowset = None
+			self.merged_predecessors = RowCollector((), verbosity)
+		else:
+			self.rowset = (
+					rowset
+				if isinstance(rowset, (collections.abc.Sequence, ColumnarRowset,
+					StreamingRowset, ChunkedRowset)) else
+					tuple(rowset))
+			#assert operator.eq(*utilities.minmax(map(len, self.rowset)))
+			self.reset(None)
+
+
+	@classmethod
+	def from_results(cls, collector_sets, name=None, verbosity=0, source_digest=None):
+		"""
+		Creates a collector from the finished collector sets of a previous run
+		without any rows.
+
+		:param collector_sets: iterable[ItemCollectorSet]
+		:return: MultiphaseCollector
+		"""
+		return cls(None, name, verbosity, source_digest).load_results(collector_sets)
+
+
+	def load_results(self, collector_sets):
+		"""
+		Replaces the results of all phases with finished collector sets, e. g.
+		of a previous run.
+
+		:param collector_sets: iterable[ItemCollectorSet]
+		:return: self
+		"""
+		self.merged_predecessors = RowCollector(collector_sets, self.verbosity)
+		return self
 
 
 	def reset(self, keep=(ItemCountCollector, ColumnTypeItemCollector)):
@@ -51,6 +113,15 @@ class MultiphaseCollector(object):
 				each(memberfn(add_copy_and_dependencies, None),
 					filter(keep, predecessor.values()))
 				yield ics
+		elif isinstance(self.rowset, (StreamingRowset, ChunkedRowset)):
+			# the item count is collected in the first phase instead
+			for _ in range(self.rowset.columncount()):
+				yield ItemCollectorSet()
+		elif isinstance(self.rowset, ColumnarRowset):
+			for _ in range(self.rowset.columncount()):
+				ics = ItemCollectorSet()
+				ics.add(ItemCountCollector(len(self.rowset)), True)
+				yield ics
 		else:
 			for _ in range(len(self.rowset[0])):
 				ics = ItemCollectorSet()
@@ -60,22 +131,32 @@ class MultiphaseCollector(object):
 
 	def do_phases(self, collectorset_description, callback=None):
 		phase_count = 0
+		profiler = profiling.active
 		while True:
-			phase_descriptions = self.get_phase_descriptions(collectorset_description)
-			if __debug__:
-				phase_descriptions = tuple(phase_descriptions)
-
-			for phase_description in phase_descriptions:
-				if self.__contains_factory(phase_description):
-					assert phase_description is not phase_descriptions[0]
-					break
-				self.__do_phase_magic(self.__gen_itemcollector_sets(phase_description))
+			plan = self.get_plan(collectorset_description)
+			if self.verbosity >= 2:
+				print(plan, file=sys.stderr)
+
+			for predecessors, independent in zip(
+				self.merged_predecessors, plan.independent_tags
+			):
+				predecessors[independent] = independent
+
+			for phase_description in plan:
+				if profiler is not None:
+					profiler.enter_phase(phase_count + 1)
 				phase_count += 1
+				self.__do_phase_magic(
+					self.__gen_itemcollector_sets(phase_description), phase_count)
 				if callback is not None:
 					callback(self)
-			else:
+
+			if not plan.is_partial:
 				break
 
+		if profiler is not None:
+			profiler.enter_phase(None)
+
 		if __debug__:
 			for coll_set in self.merged_predecessors:
 				independent = frozenset((template.get_type(coll_set) for template in collectorset_description))
@@ -91,77 +172,13 @@ class MultiphaseCollector(object):
 			for desc, pred in zip(phase_desc, self.merged_predecessors))
 
 
-	@staticmethod
-	def __contains_factory(phase_desc):
-		return not all((
-			isinstance(ctype, ItemCollector) or
-				(type(ctype) is type and issubclass(ctype, ItemCollector))
-			for ctype in chain(*filter(None, phase_desc))))
-
-
-	def get_phase_descriptions(self, collectorset_description):
-		# column-first ordering
-		phase_descriptions = map(
-			partialfn(self.__get_dependency_chain, collectorset_description),
-			self.merged_predecessors)
-		# transpose to phase-first ordering
-		phase_descriptions = zip_longest(*phase_descriptions)
-		return phase_descriptions
-
-
-	def __get_dependency_chain(self, collectorset_description, predecessors=None):
+	def get_plan(self, collectorset_description):
 		"""
-		Returns a list of phase-wise collector descriptions for a single column.
-
 		:param collectorset_description: iterable
-		:param predecessors: ItemCollectorSet
-		:return: list[dict]
+		:return: CollectionPlan
+			the plan for the next collection passes based on the results so far
 		"""
-		phase = dict(filterfalse(
-			lambda item: item[0] is None or item[0] in predecessors,
-			((template.get_type(predecessors), template)
-				for template in collectorset_description)))
-		independent = TagCollector('independent', frozenset(phase.keys()), True)
-
-		phases = []
-		collector_min_phases = dict()
-		phase_pre_dependencies = None
-		phase_result_dependencies = set()
-
-		def must_add_dependency(dep):
-			return (dep not in phase and
-				dep not in phase_result_dependencies and
-				dep not in phase_pre_dependencies)
-
-		def add_dependencies(template):
-			if template.pre_dependencies:
-				for dep in filterfalse(predecessors.__contains__, template.pre_dependencies):
-					phase_pre_dependencies.setdefault(dep, dep)
-					collector_min_phases[dep] = len(phases) - 1
-			else:
-				for dep in filter(must_add_dependency, template.result_dependencies):
-					add_dependencies(dep)
-					phase_result_dependencies.add(dep)
-
-		# resolve dependencies and push them to an earlier phase
-		while phase:
-			phase_pre_dependencies = dict()
-			phase_result_dependencies.clear()
-			each(add_dependencies, phase.keys())
-			phases.append(phase)
-			phase = phase_pre_dependencies
-
-		# remove later duplicates
-		consume((
-			each(memberfn(dict.pop, ctype, None), islice(phases, 0, -min_phase_idx))
-			for ctype, min_phase_idx in collector_min_phases.items()))
-
-		if predecessors is not None:
-			predecessors[independent] = independent
-		elif phases:
-			phases[-1][independent] = independent
-
-		return uiterator.filter(None, reversed(phases))
+		return compile_plan(collectorset_description, self.merged_predecessors)
 
 
 	def do_phase(self, phase_description):
@@ -169,13 +186,56 @@ class MultiphaseCollector(object):
 			for pred in self.merged_predecessors))
 
 
-	def __do_phase_magic(self, itemcollector_sets):
+	def __do_phase_magic(self, itemcollector_sets, phase_number=None):
+		suffix = '' if phase_number is None else ' {:d}'.format(phase_number)
 		phase = RowCollector(itemcollector_sets, self.verbosity)
-		phase.collect_all(self.rowset)
-		phase.transform_all(self.rowset)
+		convergence = self.convergence
+		with report.stage('phase' + suffix, self.name) as stage_record:
+			phase.collect_all(self.rowset,
+				convergence=convergence, deduplicate=self.deduplicate)
+		if self.sampler is not None and self.sampler.sample_size:
+			self.__set_population_counts(phase)
+		if convergence is not None and convergence.has_stopped:
+			stage_record['rows'] = convergence.row_count
+			self.__select_collected_rows(phase, phase_number)
+		with report.stage('transform' + suffix, self.name):
+			phase.transform_all(self.rowset)
 		self.merged_predecessors = phase
 
 
+	def __set_population_counts(self, collector_sets):
+		ratio = self.sampler.population_size / self.sampler.sample_size
+		for collector_set in collector_sets:
+			item_count = collector_set.get(ItemCountCollector)
+			if item_count is not None and item_count.population_count is None:
+				item_count.population_count = round(item_count.count * ratio)
+
+
+	def __select_collected_rows(self, collector_sets, phase_number=None):
+		convergence = self.convergence
+		row_count = convergence.row_count
+		if self.verbosity >= 2:
+			print('{}: phase {} converged after {:d} of {:d} rows'.format(
+					self.name, '?' if phase_number is None else phase_number,
+					row_count, len(convergence.order)),
+				file=sys.stderr)
+
+		indices = convergence.order[:row_count]
+		select_rows = getattr(self.rowset, 'select_rows', None)
+		self.rowset = (
+			select_rows(indices) if select_rows is not None else
+			tuple(map(self.rowset.__getitem__, indices)))
+		# the items of all columns were counted for all rows
+		for collector_set in collector_sets:
+			item_count = collector_set.get(ItemCountCollector)
+			if item_count is not None:
+				if item_count.population_count is None:
+					item_count.population_count = item_count.count
+				item_count.count = row_count
+		# the following phases collect the selected rows completely
+		self.convergence = None
+
+
 	__call__ = do_phase
 
 
@@ -183,15 +243,42 @@ class MultiphaseCollector(object):
 		return len(self.merged_predecessors)
 
 
-	def results_norms(a, b, weights=None):
+	def results_norms(a, b, weights=None, backend=None):
 		"""
 		:param a: self
 		:param b: MultiphaseCollector
+		:param weights: WeightDict
+		:param backend: str
 		:return: list[list[float]]
 		"""
-		return a.merged_predecessors.results_norms(b.merged_predecessors, weights)
+		return a.merged_predecessors.results_norms(
+			b.merged_predecessors, weights, backend)
+
+
+	def can_select_columns(self):
+		return isinstance(self.rowset, ColumnarRowset)
+
+
+	def select_columns(self, columns):
+		"""
+		:param columns: slice
+		:return: MultiphaseCollector
+			a collector for the selected columns only, which shares their rows
+			and results so far with this one; see can_select_columns.
+		"""
+		assert self.can_select_columns()
+		selection = MultiphaseCollector(None, self.name, self.verbosity,
+			self.source_digest, self.sampler, copy.copy(self.convergence),
+			self.deduplicate)
+		selection.rowset = self.rowset.select_columns(columns)
+		selection.merged_predecessors = \
+			RowCollector(self.merged_predecessors[columns], self.verbosity)
+		return selection
 
 
 	def copy(self):
-		return MultiphaseCollector(
-			copy.deepcopy(self.rowset), self.name, self.verbosity)
+		# a streaming rowset shares its sampler
+		rowset, sampler = copy.deepcopy((self.rowset, self.sampler))
+		return MultiphaseCollector(rowset, self.name, self.verbosity,
+			self.source_digest, sampler, copy.copy(self.convergence),
+			self.deduplicate)
@@ -0,0 +1,267 @@
+import operator
+from math import isnan, sqrt, fsum
+from ..utilities.operator import square, second
+from .base import ItemCollector
+from .lettercount import ItemLetterCountCollector
+
+
+
+class OnlineItemVarianceCollector(ItemCollector):
+	"""
+	Computes the same variance as ItemVarianceCollector, but in a single pass
+	with Welford's algorithm, i. e. without a preceding ItemAverageCollector
+	phase.
+	"""
+
+	def __init__(self, previous_collector_set=None):
+		super().__init__(previous_collector_set)
+		self.count = 0
+		self.nan_count = 0
+		self.mean = 0
+		self.sum_of_squares = 0
+
+
+	def collect(self, item, collector_set=None):
+		try:
+			if isnan(item):
+				self.nan_count += 1
+				return
+		except TypeError:
+			return
+
+		self.count += 1
+		delta = item - self.mean
+		self.mean += delta / self.count
+		self.sum_of_squares += delta * (item - self.mean)
+
+
+	def collect_batch(self, items, collector_set=None):
+		values = [item for item in items if item is not None]
+		numbers = [item for item in values if item == item]
+		try:
+			moments = _moments(numbers)
+		except TypeError:
+			ItemCollector.collect_batch(self, values, collector_set)
+		else:
+			self.count, self.mean, self.sum_of_squares = _merge_moments(
+				(self.count, self.mean, self.sum_of_squares), moments)
+			self.nan_count += len(values) - len(numbers)
+
+
+	def collect_weighted(self, items, weights, collector_set=None):
+		values = [
+			(item, weight) for item, weight in zip(items, weights)
+			if item is not None]
+		numbers = [(item, weight) for item, weight in values if item == item]
+		try:
+			moments = _weighted_moments(*zip(*numbers)) if numbers else (0, 0, 0)
+		except TypeError:
+			ItemCollector.collect_weighted(self, *zip(*values), collector_set)
+		else:
+			self.count, self.mean, self.sum_of_squares = _merge_moments(
+				(self.count, self.mean, self.sum_of_squares), moments)
+			self.nan_count += sum(map(second, values)) - moments[0]
+
+
+	def merge(self, other):
+		self.count, self.mean, self.sum_of_squares = _merge_moments(
+			(self.count, self.mean, self.sum_of_squares),
+			(other.count, other.mean, other.sum_of_squares))
+		self.nan_count += other.nan_count
+		return self
+
+
+	@property
+	def average(self):
+		"""The average as computed by ItemAverageCollector, which counts NaN items."""
+		if not self.nan_count:
+			return self.mean
+		return self.mean * self.count / (self.count + self.nan_count)
+
+
+	def get_estimate(self):
+		"""
+		:return: (float, float) | None
+			the mean and standard deviation of the numbers collected so far
+		"""
+		if not self.count:
+			return None
+		return self.mean, sqrt(self.sum_of_squares / self.count)
+
+
+	def get_confidence_interval(self, population_count=None, z=1.96):
+		"""
+		:param population_count: int
+			the number of numbers of the whole column, if only a sample of them
+			was collected
+		:param z: float
+			the standard normal quantile of the confidence level
+		:return: float | None
+			the half-width of the confidence interval of the mean of the column
+			estimated from the collected numbers, or None if there are fewer
+			than two
+		"""
+		if self.count < 2:
+			return None
+		variance = self.sum_of_squares / (self.count - 1) / self.count
+		if population_count:
+			# finite population correction
+			variance *= max(1 - self.count / population_count, 0)
+		return z * sqrt(variance)
+
+
+	def get_result(self, collector_set=None):
+		sum_of_squares = self.sum_of_squares
+		if self.nan_count:
+			# ItemVarianceCollector measures the deviation from 'average'
+			sum_of_squares += self.count * square(self.mean - self.average)
+		return sum_of_squares / self.count
+
+
+
+def _moments(values):
+	"""
+	:param values: list[numbers.Real]
+	:return: (int, float, float)
+		the count, mean and sum of squared differences from the mean of 'values'
+	"""
+	if not values:
+		return 0, 0, 0
+	mean = fsum(values) / len(values)
+	return len(values), mean, fsum([square(value - mean) for value in values])
+
+
+def _weighted_moments(values, weights):
+	"""
+	:param values: sequence[numbers.Real]
+	:param weights: sequence[int]
+		the number of occurrences of each value
+	:return: (int, float, float)
+		the count, mean and sum of squared differences from the mean of all
+		occurrences of 'values'
+	"""
+	count = sum(weights)
+	if not count:
+		return 0, 0, 0
+	mean = fsum(map(operator.mul, values, weights)) / count
+	return count, mean, fsum([
+		square(value - mean) * weight for value, weight in zip(values, weights)])
+
+
+def _merge_moments(a, b):
+	"""
+	Combines the counts, means and sums of squared differences from the mean
+	of two sets of values (Chan et al.).
+
+	:param a: (int, float, float)
+	:param b: (int, float, float)
+	:return: (int, float, float)
+	"""
+	count_a, mean_a, sum_of_squares_a = a
+	count_b, mean_b, sum_of_squares_b = b
+	if not count_b:
+		return a
+	if not count_a:
+		return b
+	count = count_a + count_b
+	delta = mean_b - mean_a
+	return (
+		count, mean_a + delta * count_b / count,
+		sum_of_squares_a + sum_of_squares_b +
+			square(delta) * count_a * count_b / count)
+
+
+
+class OnlineItemStandardDeviationCollector(ItemCollector):
+
+	result_dependencies = (OnlineItemVarianceCollector,)
+
+	def get_result(self, collector_set):
+		return sqrt(collector_set[OnlineItemVarianceCollector].get_result(collector_set))
+
+
+
+class OnlineItemVariationCoefficientCollector(ItemCollector):
+
+	result_dependencies = (OnlineItemVarianceCollector,)
+
+	def get_result(self, collector_set = None):
+		varcoll = collector_set[OnlineItemVarianceCollector]
+		return sqrt(varcoll.get_result()) / varcoll.average
+
+
+
+class OnlineLetterVarianceCollector(ItemCollector):
+	"""
+	Computes the same result as LetterVarianceCollector in a single pass with
+	Welford's algorithm.
+	"""
+
+	result_dependencies = (ItemLetterCountCollector,)
+
+
+	def __init__(self, previous_collector_set=None):
+		super().__init__(previous_collector_set)
+		self.count = 0
+		self.letter_average = 0
+		self.sum_of_squares = 0
+
+
+	def collect(self, item, collector_set = None):
+		length = len(item)
+		self.count += 1
+		delta = length - self.letter_average
+		self.letter_average += delta / self.count
+		self.sum_of_squares += delta * (length - self.letter_average)
+
+
+	def collect_batch(self, items, collector_set=None):
+		self.count, self.letter_average, self.sum_of_squares = _merge_moments(
+			(self.count, self.letter_average, self.sum_of_squares),
+			_moments(list(map(len, items))))
+
+
+	def collect_weighted(self, items, weights, collector_set=None):
+		self.count, self.letter_average, self.sum_of_squares = _merge_moments(
+			(self.count, self.letter_average, self.sum_of_squares),
+			_weighted_moments(list(map(len, items)), weights))
+
+
+	def merge(self, other):
+		self.count, self.letter_average, self.sum_of_squares = _merge_moments(
+			(self.count, self.letter_average, self.sum_of_squares),
+			(other.count, other.letter_average, other.sum_of_squares))
+		return self
+
+
+	def get_estimate(self):
+		"""
+		:return: (float, float) | None
+			the average and standard deviation of the item lengths so far
+		"""
+		if not self.count:
+			return None
+		return self.letter_average, sqrt(self.sum_of_squares / self.count)
+
+
+	def get_result(self, collector_set):
+		return self.sum_of_squares / collector_set[ItemLetterCountCollector].get_result()
+
+
+
+class OnlineLetterStandardDeviationCollector(ItemCollector):
+
+	result_dependencies = (OnlineLetterVarianceCollector,)
+
+	def get_result(self, collector_set):
+		return sqrt(collector_set[OnlineLetterVarianceCollector].get_result(collector_set))
+
+
+
+class OnlineLetterVariationCoefficient(ItemCollector):
+
+	result_dependencies = (OnlineLetterVarianceCollector,)
+
+	def get_result(self, collector_set):
+		varcoll = collector_set[OnlineLetterVarianceCollector]
+		return sqrt(varcoll.get_result(collector_set)) / varcoll.letter_average
@@ -0,0 +1,240 @@
+import collections
+from itertools import filterfalse, zip_longest, islice, chain
+from ..utilities.iterator import each, consume
+from ..utilities.operator import first, second
+from ..utilities.functional import memberfn
+from ..utilities.string import join
+from .base import ItemCollector
+from .tag import TagCollector
+from .columntype import ColumnTypeItemCollector, factory as columntype_factory
+
+
+
+class CollectionPlan(object):
+	"""
+	An execution plan for a collector set description on a schema instance:
+	a sequence of collection passes over all rows, each with a phase
+	description (a dict of collector types to templates, or None) per column.
+
+	A plan is partial if later passes contain collector factories, which can
+	only be resolved with the results of this plan. The remaining passes must
+	be planned once it has run.
+	"""
+
+	def __init__(self, passes, independent_tags, is_partial=False):
+		"""
+		:param passes: tuple[tuple[dict | None]]
+		:param independent_tags: tuple[TagCollector]
+			the collector types of each column that were requested by the
+			description and are not merely dependencies
+		:param is_partial: bool
+		"""
+		super().__init__()
+		self.passes = passes
+		self.independent_tags = independent_tags
+		self.is_partial = is_partial
+
+
+	def __len__(self):
+		return len(self.passes)
+
+
+	def __iter__(self):
+		return iter(self.passes)
+
+
+	def as_str(self, column_offset=1):
+		lines = [join(
+			'Collection plan: ', str(len(self)), ' pass',
+			'' if len(self) == 1 else 'es',
+			', to be continued' if self.is_partial else '')]
+
+		for pass_idx, phase_description in enumerate(self.passes, 1):
+			# group the columns with the same work
+			columns = collections.OrderedDict()
+			for column_idx, column_description in enumerate(phase_description):
+				if column_description:
+					columns.setdefault(
+						tuple(map(_get_name, column_description.keys())), []
+					).append(str(column_idx + column_offset))
+			for collector_names, column_indices in columns.items():
+				lines.append(join(
+					'  ', str(pass_idx), '. columns ', ', '.join(column_indices),
+					': ', ', '.join(collector_names)))
+
+		return '\n'.join(lines)
+
+
+	def __str__(self): return self.as_str()
+
+
+
+def _get_name(ctype):
+	return getattr(ctype, '__name__', None) or type(ctype).__name__
+
+
+plan_cache_size = 64
+
+__plan_cache = collections.OrderedDict()
+
+
+def compile_plan(collectorset_description, column_predecessors):
+	"""
+	Compiles an execution plan for a collector set description on a schema
+	instance, whose columns have already collected 'column_predecessors'.
+
+	The collectors of each column are scheduled in the pass after their
+	pre-dependencies, and the dependency chains of all columns start with the
+	first pass, so that a plan has as many passes as the longest chain.
+	Collectors aren't moved to earlier passes, since the rows are transformed
+	between passes. The last 'plan_cache_size' plans are cached by the
+	description and the collector types and column types of the
+	predecessors, which the choice of collector templates may depend on.
+
+	:param collectorset_description: iterable
+	:param column_predecessors: iterable[ItemCollectorSet]
+	:return: CollectionPlan
+	"""
+	column_predecessors = tuple(column_predecessors)
+	try:
+		cache_key = (
+			tuple(collectorset_description),
+			tuple(map(_get_signature, column_predecessors)))
+		plan = __plan_cache.get(cache_key)
+		if plan is not None:
+			__plan_cache.move_to_end(cache_key)
+	except TypeError:
+		# unhashable templates
+		cache_key = None
+		plan = None
+
+	if plan is None:
+		plan = _compile_plan(collectorset_description, column_predecessors)
+		if cache_key is not None:
+			__plan_cache[cache_key] = plan
+			if len(__plan_cache) > plan_cache_size:
+				__plan_cache.popitem(False)
+
+	return plan
+
+
+def _compile_plan(collectorset_description, column_predecessors):
+	chain_cache = dict()
+
+	def get_chain(predecessors):
+		signature = _get_signature(predecessors)
+		dependency_chain = chain_cache.get(signature)
+		if dependency_chain is None:
+			dependency_chain = \
+				_get_dependency_chain(collectorset_description, predecessors)
+			chain_cache[signature] = dependency_chain
+		return dependency_chain
+
+	chains = tuple(map(get_chain, column_predecessors))
+	passes = []
+	is_partial = False
+	# transpose to pass-first ordering; columns with shorter chains are done
+	# early
+	for phase_description in zip_longest(*map(first, chains)):
+		if _contains_factory(phase_description):
+			assert passes
+			is_partial = True
+			break
+		passes.append(phase_description)
+
+	return CollectionPlan(
+		tuple(passes), tuple(map(second, chains)), is_partial)
+
+
+def can_merge(collectorset_description):
+	"""
+	Whether all collectors that a description may use, including their
+	dependencies, can merge their states (see ItemCollector.merge), which
+	collecting the rows in separate ranges requires. Templates other than
+	collectors and column type factories count as unmergeable.
+
+	:param collectorset_description: iterable
+	:return: bool
+	"""
+	templates = list(collectorset_description)
+	visited = set()
+	while templates:
+		template = templates.pop()
+		if template is None or id(template) in visited:
+			continue
+		visited.add(id(template))
+		if isinstance(template, columntype_factory):
+			templates.extend((template.string_collector, template.numeric_collector))
+			continue
+		ctype = type(template) if isinstance(template, ItemCollector) else template
+		if not (isinstance(ctype, type) and issubclass(ctype, ItemCollector) and
+			ctype.can_merge()
+		):
+			return False
+		templates.extend(ctype.pre_dependencies)
+		templates.extend(ctype.result_dependencies)
+	return True
+
+
+def _get_signature(predecessors):
+	ctc = predecessors.get(ColumnTypeItemCollector)
+	column_type = ctc.get_result() if ctc is not None and ctc.has_collected else None
+	return frozenset(predecessors.keys()), column_type
+
+
+def _contains_factory(phase_description):
+	return not all((
+		isinstance(ctype, ItemCollector) or
+			(type(ctype) is type and issubclass(ctype, ItemCollector))
+		for ctype in chain(*filter(None, phase_description))))
+
+
+def _get_dependency_chain(collectorset_description, predecessors):
+	"""
+	Returns the phase-wise collector descriptions for a single column
+	and the tag of its independent collector types.
+
+	:param collectorset_description: iterable
+	:param predecessors: ItemCollectorSet
+	:return: (tuple[dict], TagCollector)
+	"""
+	phase = dict(filterfalse(
+		lambda item: item[0] is None or item[0] in predecessors,
+		((template.get_type(predecessors), template)
+			for template in collectorset_description)))
+	independent = TagCollector('independent', frozenset(phase.keys()), True)
+
+	phases = []
+	collector_min_phases = dict()
+	phase_pre_dependencies = None
+	phase_result_dependencies = set()
+
+	def must_add_dependency(dep):
+		return (dep not in phase and
+			dep not in phase_result_dependencies and
+			dep not in phase_pre_dependencies)
+
+	def add_dependencies(template):
+		if template.pre_dependencies:
+			for dep in filterfalse(predecessors.__contains__, template.pre_dependencies):
+				phase_pre_dependencies.setdefault(dep, dep)
+				collector_min_phases[dep] = len(phases) - 1
+		else:
+			for dep in filter(must_add_dependency, template.result_dependencies):
+				add_dependencies(dep)
+				phase_result_dependencies.add(dep)
+
+	# resolve dependencies and push them to an earlier phase
+	while phase:
+		phase_pre_dependencies = dict()
+		phase_result_dependencies.clear()
+		each(add_dependencies, phase.keys())
+		phases.append(phase)
+		phase = phase_pre_dependencies
+
+	# remove later duplicates
+	consume((
+		each(memberfn(dict.pop, ctype, None), islice(phases, 0, -min_phase_idx))
+		for ctype, min_phase_idx in collector_min_phases.items()))
+
+	return tuple(filter(None, reversed(phases))), independent
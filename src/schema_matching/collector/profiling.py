@@ -0,0 +1,256 @@
+import sys, time, functools
+from .base import ItemCollector
+from .set import ItemCollectorSet
+from .rows import RowCollector
+
+
+
+# the profiler that receives the counters of this process, if any
+active = None
+
+
+class CollectorProfiler(object):
+	"""
+	Records the number of calls and the cumulative wall and CPU time of the
+	'collect', 'get_result', 'get_transformer' and 'result_norm' methods of
+	each collector class and of RowCollector.transform_all and results_norms
+	per collection phase.
+
+	Profiling is switched on by entering a profiler as a context; only then
+	are the methods of the collector classes replaced with timed wrappers, so
+	that there is no overhead otherwise. 'collect_batch' counts as one
+	'collect' call per item and 'collect_weighted' as one per occurrence of
+	an item. Times are inclusive, i. e. the time of a
+	collector method includes the time of the methods of its dependencies that
+	it calls. 'result_norm', being a static method, is attributed to the
+	class defining it.
+	"""
+
+	def __init__(self):
+		super().__init__()
+		self.counters = {}
+		self.phase = None
+		self.running = set()
+		self.__previous = None
+
+
+	def __enter__(self):
+		global active
+		self.__previous = active
+		active = self
+		instrument()
+		return self
+
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		global active
+		active = self.__previous
+		self.__previous = None
+		if active is None:
+			uninstrument()
+
+
+	def enter_phase(self, phase):
+		"""
+		:param phase: int | None
+			the number of the collection phase that starts, or None if
+			collection has ended
+		"""
+		self.phase = phase
+		if phase is not None:
+			# collector classes may have been defined by description modules
+			instrument()
+
+
+	def add(self, name, method, calls, wall_time, cpu_time):
+		counter = self.counters.get((name, self.phase, method))
+		if counter is None:
+			self.counters[(name, self.phase, method)] = [calls, wall_time, cpu_time]
+		else:
+			counter[0] += calls
+			counter[1] += wall_time
+			counter[2] += cpu_time
+
+
+	def merge(self, counters):
+		"""
+		Adds the counters of another profiler, e. g. of a worker process.
+
+		:param counters: dict[(str, int, str), list]
+		:return: self
+		"""
+		for key, (calls, wall_time, cpu_time) in counters.items():
+			counter = self.counters.setdefault(key, [0, 0.0, 0.0])
+			counter[0] += calls
+			counter[1] += wall_time
+			counter[2] += cpu_time
+		return self
+
+
+	def merge_result(self, result):
+		"""
+		:param result: (object, dict)
+			the result of a _ProfiledCall
+		:return: object
+		"""
+		self.merge(result[1])
+		return result[0]
+
+
+	def print_table(self, file=sys.stderr):
+		"""Prints all counters sorted by decreasing wall time."""
+		rows = sorted(self.counters.items(), key=lambda kv: kv[1][1], reverse=True)
+		name_width = max((len(name) for (name, _, _), _ in rows), default=0)
+		name_width = max(name_width, len('Collector'))
+		print('{:<{}s} {:>5s} {:<15s} {:>10s} {:>10s} {:>10s}'.format(
+				'Collector', name_width, 'Phase', 'Method', 'Calls', 'Wall [s]',
+				'CPU [s]'),
+			file=file)
+		for (name, phase, method), (calls, wall_time, cpu_time) in rows:
+			print('{:<{}s} {:>5s} {:<15s} {:10d} {:10.4f} {:10.4f}'.format(
+					name, name_width, '-' if phase is None else str(phase), method,
+					calls, wall_time, cpu_time),
+				file=file)
+
+
+
+def executor_map(executor, fn, iterable):
+	"""
+	Like executor.map, but profiles the calls in the worker processes and
+	merges their counters into the active profiler, if any.
+
+	:param executor: concurrent.futures.Executor
+	:param fn: callable picklable
+	:param iterable: iterable
+	:return: iterable
+	"""
+	profiler = active
+	if profiler is None:
+		return executor.map(fn, iterable)
+	return map(profiler.merge_result,
+		executor.map(_ProfiledCall(fn, profiler.phase), iterable))
+
+
+
+class _ProfiledCall(object):
+
+	def __init__(self, fn, phase=None):
+		super().__init__()
+		self.fn = fn
+		self.phase = phase
+
+
+	def __call__(self, *args):
+		with CollectorProfiler() as profiler:
+			profiler.phase = self.phase
+			result = self.fn(*args)
+		return result, profiler.counters
+
+
+
+__instrumented = {}
+
+__collector_methods = (
+	('collect', 'collect'),
+	('collect_batch', 'collect'),
+	('collect_weighted', 'collect'),
+	('get_result', 'get_result'),
+	('get_transformer', 'get_transformer'),
+	('result_norm', 'result_norm'),
+)
+
+
+def instrument():
+	"""
+	Replaces the profiled methods of all collector classes, that weren't
+	already, with timed wrappers.
+	"""
+	if RowCollector not in __instrumented:
+		__instrument_class(RowCollector, (
+			('transform_all', 'transform_all'), ('results_norms', 'results_norms')))
+
+	classes = [ItemCollector]
+	while classes:
+		cls = classes.pop()
+		if not issubclass(cls, ItemCollectorSet):
+			if cls not in __instrumented:
+				__instrument_class(cls, __collector_methods)
+			classes.extend(cls.__subclasses__())
+
+
+def uninstrument():
+	"""Restores the original methods of all instrumented classes."""
+	for cls, originals in __instrumented.items():
+		for name, original in originals:
+			setattr(cls, name, original)
+	__instrumented.clear()
+
+
+def __instrument_class(cls, methods):
+	originals = []
+	for name, metric in methods:
+		original = cls.__dict__.get(name)
+		if original is None:
+			continue
+		if isinstance(original, staticmethod):
+			wrapper = staticmethod(
+				_timed_function(original.__func__, cls.__name__, metric))
+		else:
+			wrapper = _timed_method(original, metric, __call_counts.get(name))
+		originals.append((name, original))
+		setattr(cls, name, wrapper)
+	__instrumented[cls] = originals
+
+
+__call_counts = {
+	'collect_batch': lambda args: len(args[0]),
+	'collect_weighted': lambda args: sum(args[1]),
+}
+
+
+def _timed_method(fn, metric, call_count=None):
+	perf_counter = time.perf_counter
+	process_time = time.process_time
+
+	@functools.wraps(fn)
+	def wrapper(self, *args, **kwargs):
+		profiler = active
+		key = (id(self), metric)
+		# calls from the same method of the same object are already timed
+		if profiler is None or key in profiler.running:
+			return fn(self, *args, **kwargs)
+
+		profiler.running.add(key)
+		wall_time = perf_counter()
+		cpu_time = process_time()
+		try:
+			return fn(self, *args, **kwargs)
+		finally:
+			cpu_time = process_time() - cpu_time
+			wall_time = perf_counter() - wall_time
+			profiler.running.discard(key)
+			profiler.add(type(self).__name__, metric,
+				1 if call_count is None else call_count(args), wall_time, cpu_time)
+
+	return wrapper
+
+
+def _timed_function(fn, name, metric):
+	perf_counter = time.perf_counter
+	process_time = time.process_time
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		profiler = active
+		if profiler is None:
+			return fn(*args, **kwargs)
+
+		wall_time = perf_counter()
+		cpu_time = process_time()
+		try:
+			return fn(*args, **kwargs)
+		finally:
+			profiler.add(name, metric, 1,
+				perf_counter() - wall_time, process_time() - cpu_time)
+
+	return wrapper
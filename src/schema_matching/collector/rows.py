@@ -1,17 +1,41 @@
 from ..utilities import operator as uoperator
 from operator import methodcaller
+from itertools import islice
+from collections import Counter
 from ..utilities.iterator import each
+from ..utilities.functional import memberfn
 from ..utilities.string import join
+from .set import ItemCollectorSet
+from . import vectorized
 
 
 
 class RowCollector(list):
-	"""Manages collectors for a set of rows"""
+	"""
+	Manages collectors for a set of rows
+
+	Items are passed to the bound collect methods of each column's collectors
+	as compiled at the first item of a phase; collectors that saturate are
+	dropped at the next batch boundary or, when collecting row by row, after
+	at most 'saturation_check_interval' rows.
+
+	When deduplicating, the distinct items of each column are collected with
+	the number of their occurrences in batches of up to 'count_batch_size'
+	rows, which bounds the memory for counting them.
+	"""
+
+	saturation_check_interval = 4096
+
+	count_batch_size = 65536
+
 
 	def __init__(self, initialiser, verbosity=0):
 		list.__init__(self, initialiser)
 
 		self.__rowcount = 0
+		self.__collect_methods = None
+		self.__collects_batches = None
+		self.__rows_since_check = 0
 		if verbosity >= 2:
 			import sys
 			self.__stderr = sys.stderr
@@ -22,10 +46,43 @@ class RowCollector(list):
 	def reset(self, collectors):
 		self[:] = collectors
 		self.__rowcount = 0
+		self.__collect_methods = None
 
 
 	def collect(self, items):
 		"""Collects the data of all columns of a row"""
+		self.__check_row_length(items)
+		assert len(self) <= len(items)
+		for collector_set, collect_methods, item in zip(
+			self, self.__get_collect_methods(False), items
+		):
+			for collect in collect_methods:
+				collect(item, collector_set)
+
+		self.__rows_since_check += 1
+		if self.__rows_since_check >= self.saturation_check_interval:
+			self.__drop_saturated()
+
+
+	def __get_collect_methods(self, batch):
+		if self.__collect_methods is None or self.__collects_batches is not batch:
+			self.__collect_methods = \
+				list(map(methodcaller('get_collect_methods', batch), self))
+			self.__collects_batches = batch
+			self.__rows_since_check = 0
+		return self.__collect_methods
+
+
+	def __drop_saturated(self):
+		self.__rows_since_check = 0
+		collect_methods = self.__collect_methods
+		for column_idx, collector_set in enumerate(self):
+			if collector_set.has_saturated(collect_methods[column_idx]):
+				collect_methods[column_idx] = \
+					collector_set.get_collect_methods(self.__collects_batches)
+
+
+	def __check_row_length(self, items):
 		if self.__stderr is not None and len(self) != len(items):
 			self.__rowcount += 1
 			print(
@@ -33,20 +90,121 @@ class RowCollector(list):
 					self.__rowcount, len(items), len(self), items),
 				file=self.__stderr)
 
-		assert len(self) <= len(items)
-		each(self.__collect_column, self, items)
 
+	def collect_columns(self, columns):
+		"""Collects the data of consecutive items of all columns at once"""
+		for collector_set, collect_methods, items in zip(
+			self, self.__get_collect_methods(True), columns
+		):
+			for collect_batch in collect_methods:
+				collect_batch(items, collector_set)
+		self.__drop_saturated()
+
+
+	def collect_counts(self, column_counts, batch_size=4096):
+		"""
+		Collects the distinct items of all columns with the number of their
+		occurrences at once; see count_items.
+
+		:param column_counts: iterable[(sequence, sequence[int] | None)]
+			the distinct items and their counts of each column, or consecutive
+			items without counts, which are collected in batches of up to
+			'batch_size' items
+		"""
+		for collector_set, (items, counts) in zip(self, column_counts):
+			if counts is not None:
+				if items:
+					collector_set.collect_weighted(items, counts, collector_set)
+			else:
+				# saturated collectors drop out after each batch
+				for start in range(0, len(items), batch_size):
+					collector_set.collect_batch(
+						items[start:start + batch_size], collector_set)
+
+
+	def collect_all(self, rows, batch_size=4096, convergence=None,
+		deduplicate=False
+	):
+		"""
+		Collects all rows column by column in batches of up to 'batch_size'
+		rows. Rows that provide their columns themselves, i. e. a
+		ColumnarRowset, are not transposed; rows that collect themselves in
+		chunks, i. e. a ChunkedRowset, are merged from those.
 
-	@staticmethod
-	def __collect_column(collector, item):
-		collector.collect(item, collector)
+		With a ConvergenceCheck, that applies to the collectors of this phase,
+		the rows are collected in its order and only until it has converged;
+		see ConvergenceCheck.has_stopped.
 
+		If 'deduplicate' is true, the collectors receive each distinct item of a
+		batch of rows only once with the number of its occurrences; see
+		ItemCollector.collect_weighted. The results are the same up to rounding
+		as if the items were collected in the order of their first occurrence.
+		"""
+		collect_chunks = getattr(rows, 'collect_chunks', None)
+		if collect_chunks is not None:
+			each(self.merge, collect_chunks(list(self)))
+			self.__set_collected()
+			return
 
-	def collect_all(self, rows):
-		each(self.collect, rows)
+		column_batches = getattr(rows, 'column_batches', None)
+		if column_batches is not None and self.__stderr is not None:
+			for row_idx, column_count in rows.irregular_rows:
+				print('Row {} has {} columns, expected {}'.format(
+						row_idx + 1, column_count, len(self)),
+					file=self.__stderr)
+
+		if convergence is not None and convergence.applies_to(self):
+			for columns in convergence.column_batches(rows):
+				self.collect_columns(columns)
+				if convergence.has_converged(self):
+					break
+			self.__set_collected()
+			return
+
+		if deduplicate:
+			column_counts = getattr(rows, 'column_counts', None)
+			if column_counts is not None:
+				each(memberfn(self.collect_counts, batch_size),
+					column_counts(self.count_batch_size))
+				self.__set_collected()
+				return
+
+		elif column_batches is not None:
+			each(self.collect_columns, column_batches(batch_size))
+			self.__set_collected()
+			return
+
+		rows = iter(rows)
+		rows_per_batch = self.count_batch_size if deduplicate else batch_size
+		while True:
+			batch = list(islice(rows, rows_per_batch))
+			if not batch:
+				break
+			if self.__stderr is not None:
+				each(self.__check_row_length, batch)
+			assert all(len(self) <= len(items) for items in batch)
+			if deduplicate:
+				self.collect_counts(map(count_items, zip(*batch)), batch_size)
+			else:
+				self.collect_columns(zip(*batch))
+		self.__set_collected()
+
+
+	def __set_collected(self):
+		self.__collect_methods = None
 		each(methodcaller('set_collected'), self)
 
 
+	def merge(self, collector_sets):
+		"""
+		Merges the collector sets of the same phase, that collected the rows
+		following the ones collected by this, into the sets of this.
+
+		:param collector_sets: iterable[ItemCollectorSet]
+		"""
+		each(ItemCollectorSet.merge, self, collector_sets)
+
+
 	class __transformer(tuple):
 
 		def __call__(self, items):
@@ -54,11 +212,19 @@ class RowCollector(list):
 				items[i] = t(items[i])
 
 
-	def get_transformer(self):
-		column_transformers = tuple(
+	def get_column_transformers(self):
+		"""
+		:return: tuple[(int, callable)]
+			the indices of the columns to transform with their transformers
+		"""
+		return tuple(
 			filter(uoperator.second,
 				enumerate(map(methodcaller('get_transformer'), self))))
 
+
+	def get_transformer(self):
+		column_transformers = self.get_column_transformers()
+
 		if column_transformers:
 			def row_transformer(items):
 				for column_idx, column_transformer in column_transformers:
@@ -70,13 +236,43 @@ class RowCollector(list):
 
 
 	def transform_all(self, rows):
+		"""
+		Transforms all rows in place or, if they support it, defers the
+		transformation to the rows' add_transformer method or transforms whole
+		columns with their transform_columns method.
+		"""
+		transform_columns = getattr(rows, 'transform_columns', None)
+		if transform_columns is not None:
+			column_transformers = self.get_column_transformers()
+			if column_transformers:
+				transform_columns(column_transformers)
+				each(methodcaller('set_transformed'), self)
+			return
+
 		transformer = self.get_transformer()
 		if transformer is not None:
-			each(transformer, rows)
+			add_transformer = getattr(rows, 'add_transformer', None)
+			if add_transformer is None:
+				each(transformer, rows)
+			else:
+				add_transformer(transformer)
 			each(methodcaller('set_transformed'), self)
 
 
-	def results_norms(a, b, weights=None):
+	def results_norms(a, b, weights=None, backend=None):
+		"""
+		:param a: self
+		:param b: RowCollector
+		:param weights: WeightDict
+		:param backend: str
+			'numpy' or 'python'; None selects NumPy if it is available.
+		:return: list[list[float]]
+		"""
+		if backend == 'numpy' or (backend is None and
+			weights is not None and vectorized.available()
+		):
+			return vectorized.results_norms(a, b, weights)
+
 		get_result = methodcaller('get_result')
 		# Materialise results of inner loop because they'll be scanned multiple times.
 		resultsA = tuple(map(get_result, a))
@@ -94,3 +290,20 @@ class RowCollector(list):
 	def __str__(self): return self.as_str()
 
 	__format__ = as_str
+
+
+
+def count_items(items, max_distinct_share=0.5):
+	"""
+	:param items: sequence
+	:param max_distinct_share: float
+	:return: (list, list[int]) | (sequence, None)
+		the distinct items in the order of their first occurrence and the
+		number of their occurrences or, if more than 'max_distinct_share' of
+		the items are distinct, 'items' without counts, since counting them
+		doesn't pay off.
+	"""
+	counts = Counter(items)
+	if len(counts) > len(items) * max_distinct_share:
+		return items, None
+	return list(counts), list(counts.values())
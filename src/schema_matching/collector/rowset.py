@@ -0,0 +1,742 @@
+import sys, array, bisect, copy, collections, mmap, json, struct
+from itertools import chain, islice, count, accumulate, zip_longest
+from operator import methodcaller
+from functools import partial as partialfn
+from ..utilities import operator as uoperator
+from ..utilities.operator import noop
+from ..utilities.functional import composefn
+from .rows import RowCollector, count_items
+from . import profiling
+
+
+
+class StreamingRowset(object):
+	"""
+	A set of rows that is read anew from its source for every iteration
+	instead of being held in memory. Row transformers are recorded and applied
+	to each row as it is read.
+	"""
+
+	def __init__(self, read_rows, transformers=(), sampler=None):
+		"""
+		:param read_rows: callable
+			returns a fresh iterator over the (untransformed) rows of the source;
+			it is closed after each iteration, if possible.
+		:param transformers: iterable[callable]
+			functions that modify a row in place
+		:param sampler: utilities.sampling.Sampler
+			draws the same sample of rows in every iteration, if not None
+		"""
+		super().__init__()
+		self.read_rows = read_rows
+		self.transformers = list(transformers)
+		self.sampler = sampler
+
+
+	def __iter__(self):
+		rows = self.read_rows()
+		try:
+			sample = rows if self.sampler is None else self.sampler(rows)
+			if self.transformers:
+				for row in sample:
+					for transformer in self.transformers:
+						transformer(row)
+					yield row
+			else:
+				yield from sample
+		finally:
+			getattr(rows, 'close', noop)()
+
+
+	def add_transformer(self, transformer):
+		"""
+		Applies a row transformer to all rows of future iterations.
+
+		:param transformer: callable
+		"""
+		self.transformers.append(transformer)
+
+
+	def columncount(self):
+		"""
+		:return: int the number of columns of the first row
+		"""
+		rows = self.read_rows()
+		try:
+			return len(next(iter(rows), ()))
+		finally:
+			getattr(rows, 'close', noop)()
+
+
+
+class ChunkedRowset(object):
+	"""
+	A set of rows in consecutive chunks, e. g. byte ranges of a file, which
+	are read anew and collected by worker processes for every phase. The
+	results of all chunks are merged afterwards; see ItemCollector.merge.
+	Column transformers are recorded and applied to each row as it is read.
+
+	The results of rows preceding the chunks, e. g. of an earlier version of
+	a file, may be merged, too, as long as the merge and the column
+	transformers are compatible with them; otherwise ValueError is raised.
+	"""
+
+	def __init__(self, read_chunk_rows, chunks, executor=None,
+		previous_results=None
+	):
+		"""
+		:param read_chunk_rows: callable
+			returns a fresh iterator over the (untransformed) rows of a chunk;
+			must be picklable
+		:param chunks: sequence
+			picklable descriptions of the chunks passed to 'read_chunk_rows'
+		:param executor: concurrent.futures.Executor
+			None to collect the chunks in this process
+		:param previous_results: list[ItemCollectorSet]
+			the finished collector sets of all columns of the preceding rows
+		"""
+		super().__init__()
+		self.read_chunk_rows = read_chunk_rows
+		self.chunks = chunks
+		self.executor = executor
+		self.previous_results = previous_results
+		self.column_transformers = []
+		self.__previous_transformers = None
+
+
+	def collect_chunks(self, collector_sets):
+		"""
+		:param collector_sets: list[ItemCollectorSet]
+			the fresh collector sets of all columns for the current phase
+		:return: iterable[list[ItemCollectorSet]]
+			the collector sets of each chunk, in order, preceded by the previous
+			results, if any
+		"""
+		tasks = (
+			(self.read_chunk_rows, chunk, tuple(self.column_transformers),
+				collector_sets)
+			for chunk in self.chunks)
+		if self.executor is None:
+			# collect into copies like worker processes, made before anything is
+			# merged into 'collector_sets'
+			chunk_results = map(_collect_chunk, list(map(copy.deepcopy, tasks)))
+		else:
+			chunk_results = \
+				profiling.executor_map(self.executor, _collect_chunk, tasks)
+
+		if self.previous_results is None:
+			return chunk_results
+		if len(self.previous_results) != len(collector_sets):
+			raise ValueError('The previous results have a different column count')
+		self.__previous_transformers = \
+			list(map(_get_transformer, self.previous_results, collector_sets))
+		return chain((self.previous_results,), chunk_results)
+
+
+	def transform_columns(self, column_transformers):
+		"""
+		Applies column transformers to all rows of future iterations.
+
+		:param column_transformers: iterable[(int, callable)]
+			column indices with a picklable function to apply to each of their
+			items
+		"""
+		column_transformers = tuple(column_transformers)
+		if self.__previous_transformers is not None:
+			transformers = dict(column_transformers)
+			for column_idx, previous_transformer in enumerate(self.__previous_transformers):
+				if transformers.get(column_idx) != previous_transformer:
+					raise ValueError(
+						'Column {:d} was transformed differently before'.format(
+							column_idx + 1))
+		self.column_transformers.extend(column_transformers)
+
+
+	def columncount(self):
+		"""
+		:return: int the number of columns of the first row
+		"""
+		if not self.chunks:
+			return 0
+		rows = self.read_chunk_rows(self.chunks[0])
+		try:
+			return len(next(iter(rows), ()))
+		finally:
+			getattr(rows, 'close', noop)()
+
+
+
+def _collect_chunk(task):
+	read_chunk_rows, chunk, column_transformers, collector_sets = task
+	rows = read_chunk_rows(chunk)
+	try:
+		phase = RowCollector(collector_sets)
+		phase.collect_all(
+			map(partialfn(_transform_row, column_transformers), rows)
+				if column_transformers else
+			rows)
+	finally:
+		getattr(rows, 'close', noop)()
+	return list(phase)
+
+
+def _get_transformer(previous_collector_set, collector_set):
+	"""
+	:return: callable | None
+		the transformer of the previous counterparts of the collectors of the
+		current phase
+	"""
+	transformer = composefn(*filter(None, (
+		previous_collector_set[collector_type].get_transformer()
+		for collector_type, collector in collector_set.items()
+		if not collector.has_collected and collector_type in previous_collector_set)))
+	return None if transformer is uoperator.identity else transformer
+
+
+def _transform_row(column_transformers, row):
+	for column_idx, transformer in column_transformers:
+		row[column_idx] = transformer(row[column_idx])
+	return row
+
+
+
+class ColumnarRowset(object):
+	"""
+	Holds the rows of a schema instance column by column in compact, typed
+	storage: string columns as codes into a table of their distinct values,
+	integer and real columns as arrays of machine numbers. Collectors read
+	batches of columns and transformers are applied to whole columns.
+	"""
+
+	def __init__(self, rows=(), normalize=None, batch_size=4096):
+		"""
+		:param rows: iterable[sequence]
+			All rows must have at least as many items as the first; surplus
+			items are dropped and recorded in 'irregular_rows'.
+		:param normalize: callable
+			a function to apply to each item, e. g. str.strip; it's applied to
+			distinct items only.
+		:param batch_size: int
+			the number of rows to transpose and encode at once
+		"""
+		super().__init__()
+		self.columns = []
+		self.irregular_rows = []
+		self.__row_count = 0
+
+		rows = iter(rows)
+		batch = list(islice(rows, batch_size))
+		if not batch:
+			return
+
+		column_count = len(batch[0])
+		codes = tuple(array.array(_code_typecode) for _ in range(column_count))
+		value_codes = tuple(_value_code_dict() for _ in range(column_count))
+		while batch:
+			if min(map(len, batch)) != column_count or max(map(len, batch)) != column_count:
+				self.__check_row_lengths(batch, column_count)
+			columns = zip(*batch)
+			for column_codes, column_value_codes, column in zip(codes, value_codes, columns):
+				column_codes.extend(map(column_value_codes.__getitem__, column))
+			self.__row_count += len(batch)
+			batch = list(islice(rows, batch_size))
+
+		self.columns = [
+			_CodedColumn(*_normalize_codes(
+				column_codes, list(column_value_codes), normalize))
+			for column_codes, column_value_codes in zip(codes, value_codes)
+		]
+
+
+	def __check_row_lengths(self, batch, column_count):
+		for row_idx, row in enumerate(batch, self.__row_count):
+			if len(row) != column_count:
+				if len(row) < column_count:
+					raise ValueError(
+						'Row {} has {} columns, expected at least {}'.format(
+							row_idx + 1, len(row), column_count))
+				self.irregular_rows.append((row_idx, len(row)))
+
+
+	def __len__(self):
+		return self.__row_count
+
+
+	def columncount(self):
+		return len(self.columns)
+
+
+	def column_batches(self, batch_size, order=None):
+		"""
+		:param batch_size: int
+		:param order: sequence[int]
+			the indices of the rows in the order to visit them, if not all in
+			their original order
+		:return: iterable[tuple[list]]
+			the items of all columns in consecutive batches of up to
+			'batch_size' rows
+		"""
+		if order is not None:
+			for start in range(0, len(order), batch_size):
+				indices = order[start:start + batch_size]
+				yield tuple(column.take(indices) for column in self.columns)
+			return
+
+		for start in range(0, self.__row_count, batch_size):
+			stop = min(start + batch_size, self.__row_count)
+			yield tuple(column.items(start, stop) for column in self.columns)
+
+
+	def column_counts(self, batch_size):
+		"""
+		:param batch_size: int
+		:return: iterable[tuple[(list, list[int])]]
+			the distinct items of all columns with the number of their
+			occurrences in consecutive steps; see count_items. Columns of codes
+			are counted as a whole, since they hold their distinct values
+			anyway, other columns in batches of up to 'batch_size' rows.
+		"""
+		return zip_longest(
+			*(column.counts(batch_size) for column in self.columns),
+			fillvalue=((), ()))
+
+
+	def __iter__(self):
+		"""Iterates over the rows as lists."""
+		for batch in self.column_batches(4096):
+			yield from map(list, zip(*batch))
+
+
+	def transform_columns(self, column_transformers):
+		"""
+		:param column_transformers: iterable[(int, callable)]
+			column indices with a function to apply to each of their items
+		"""
+		for column_idx, transformer in column_transformers:
+			self.columns[column_idx] = \
+				self.columns[column_idx].transform(transformer)
+
+
+	def select_columns(self, columns):
+		"""
+		:param columns: slice
+		:return: ColumnarRowset
+			a rowset of the selected columns that shares their storage with this
+			one; irregular rows aren't carried over.
+		"""
+		selection = copy.copy(self)
+		selection.columns = self.columns[columns]
+		selection.irregular_rows = []
+		return selection
+
+
+	def select_rows(self, indices):
+		"""
+		:param indices: sequence[int]
+		:return: ColumnarRowset
+			a rowset of copies of the selected rows in the given order;
+			irregular rows aren't carried over.
+		"""
+		selection = copy.copy(self)
+		selection.columns = [column.select(indices) for column in self.columns]
+		selection.irregular_rows = []
+		selection.__row_count = len(indices)
+		return selection
+
+
+	def get_size(self):
+		"""
+		:return: int the approximate size of the column storage in bytes
+		"""
+		return sum(map(methodcaller('get_size'), self.columns))
+
+
+	__file_magic = b'SMCOLS\x00\x02'
+	__file_header = struct.Struct('<8sQ')
+
+
+	def write_to(self, f, key=None):
+		"""
+		Writes the columns in a binary format that map_file can map into memory:
+		an array of fixed-width codes per column followed by the byte offsets and
+		the UTF-8 encoded bytes of its distinct values. Only untransformed
+		columns can be written.
+
+		:param f: io.BufferedIOBase
+		:param key: object
+			a JSON serializable object that map_file compares to its 'key'
+			argument, e. g. to identify the source of the rows
+		"""
+		if not all(isinstance(column, _CodedColumn) for column in self.columns):
+			raise ValueError('Only untransformed columns can be written')
+
+		sections = []
+		column_layouts = []
+		offset = 0
+		for column in self.columns:
+			encoded_values = [
+				value.encode('utf-8', 'surrogatepass') for value in column.values]
+			value_offsets = array.array('Q',
+				chain((0,), accumulate(map(len, encoded_values))))
+			layout = []
+			for section in (
+				array.array(_code_typecode, column.codes), value_offsets,
+				b''.join(encoded_values)
+			):
+				layout.append(offset)
+				sections.append(section)
+				offset += _aligned_size(memoryview(section).nbytes)
+			column_layouts.append(
+				(_code_typecode, len(column.values), tuple(layout)))
+
+		# a plain header, since column files lie next to untrusted input
+		header = json.dumps({
+				'key': key, 'row_count': self.__row_count,
+				'irregular_rows': self.irregular_rows, 'columns': column_layouts,
+			}, separators=(',', ':')).encode('utf-8')
+		f.write(self.__file_header.pack(self.__file_magic, len(header)))
+		f.write(header)
+		f.write(bytes(_aligned_size(len(header)) - len(header)))
+		for section in sections:
+			size = memoryview(section).nbytes
+			f.write(section)
+			f.write(bytes(_aligned_size(size) - size))
+
+
+	@classmethod
+	def map_file(cls, path, key=None):
+		"""
+		Maps a file written by write_to into memory. The codes of the columns are
+		used in place; only their distinct values are decoded.
+
+		:param path: str
+		:param key: object
+		:return: ColumnarRowset | None
+			None if the file doesn't exist, isn't a column file, is damaged or
+			was written with a different key
+		"""
+		try:
+			with open(path, 'rb') as f:
+				magic, header_size = cls.__file_header.unpack(
+					f.read(cls.__file_header.size))
+				if magic != cls.__file_magic:
+					return None
+				header = f.read(header_size)
+				if len(header) != header_size:
+					return None
+				header = json.loads(header.decode('utf-8'))
+				# compare keys in their JSON form, e. g. tuples as lists
+				if header['key'] != json.loads(json.dumps(key)):
+					return None
+				data_start = cls.__file_header.size + _aligned_size(header_size)
+				data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+			self = cls()
+			self.__row_count = row_count = header['row_count']
+			self.irregular_rows = [
+				(row_idx, column_count)
+				for row_idx, column_count in header['irregular_rows']]
+			if not (isinstance(row_count, int) and row_count >= 0 and
+				all(isinstance(row_idx, int) and 0 <= row_idx < row_count
+					for row_idx, _ in self.irregular_rows)
+			):
+				return None
+			for typecode, value_count, layout in header['columns']:
+				self.columns.append(cls.__map_column(
+					data, data_start, row_count, typecode, value_count, layout))
+		except (FileNotFoundError, struct.error, EOFError, KeyError, TypeError,
+			ValueError, IndexError, _DamagedColumnFile
+		):
+			return None
+		return self
+
+
+	@staticmethod
+	def __map_column(data, data_start, row_count, typecode, value_count, layout):
+		"""
+		Maps a column after checking its sections against the size of the
+		file and the row and value counts.
+
+		:raises _DamagedColumnFile: if the sections don't fit
+		"""
+		if (typecode != _code_typecode or
+			not (isinstance(value_count, int) and value_count >= 0) or
+			len(layout) != 3 or
+			not all(isinstance(offset, int) and offset >= 0 and offset % 8 == 0
+				for offset in layout)
+		):
+			raise _DamagedColumnFile()
+		codes_offset, offsets_offset, values_offset = \
+			(data_start + offset for offset in layout)
+		codes_stop = codes_offset + row_count * array.array(typecode).itemsize
+		offsets_stop = offsets_offset + (value_count + 1) * 8
+		if codes_stop > len(data) or offsets_stop > len(data):
+			raise _DamagedColumnFile()
+
+		# all sections are aligned to 8 bytes
+		codes = data[codes_offset:codes_stop].cast(typecode)
+		value_offsets = data[offsets_offset:offsets_stop].cast('Q').tolist()
+		if (value_offsets[0] != 0 or
+			any(map(int.__gt__, value_offsets, islice(value_offsets, 1, None))) or
+			values_offset + value_offsets[-1] > len(data) or
+			(row_count and max(codes) >= value_count)
+		):
+			raise _DamagedColumnFile()
+		values = bytes(data[values_offset:values_offset + value_offsets[-1]])
+		return _CodedColumn(codes, [
+			values[start:stop].decode('utf-8', 'surrogatepass')
+			for start, stop in zip(value_offsets, islice(value_offsets, 1, None))
+		])
+
+
+
+class _DamagedColumnFile(Exception):
+	pass
+
+
+_code_typecode = 'I' if array.array('I').itemsize >= 4 else 'L'
+
+
+def _aligned_size(size, alignment=8):
+	return -(-size // alignment) * alignment
+
+
+class _CodedColumn(object):
+	"""
+	A column of codes into a table of distinct values; the codes may be an
+	array or a memoryview of a mapped file.
+	"""
+
+	def __init__(self, codes, values):
+		self.codes = codes
+		self.values = values
+
+
+	def __reduce__(self):
+		codes = self.codes
+		if isinstance(codes, memoryview):
+			codes = array.array(codes.format, codes)
+		return type(self), (codes, self.values)
+
+
+	def items(self, start, stop):
+		return list(map(self.values.__getitem__, self.codes[start:stop]))
+
+
+	def take(self, indices):
+		return list(map(self.values.__getitem__, map(self.codes.__getitem__, indices)))
+
+
+	def counts(self, batch_size):
+		codes, counts = count_items(self.codes)
+		if counts is not None:
+			yield list(map(self.values.__getitem__, codes)), counts
+		else:
+			for start in range(0, len(self.codes), batch_size):
+				yield self.items(start, start + batch_size), None
+
+
+	def select(self, indices):
+		return _CodedColumn(
+			array.array(_code_typecode, map(self.codes.__getitem__, indices)),
+			self.values)
+
+
+	def transform(self, transformer):
+		# transform each distinct value only once
+		return _decode_column(self.codes, list(map(transformer, self.values)))
+
+
+	def get_size(self):
+		return (self.codes.itemsize * len(self.codes) +
+			sum(map(sys.getsizeof, self.values)))
+
+
+
+class _NumberColumn(object):
+	"""
+	A column of machine numbers with a sorted list of the indices of missing
+	(None) items
+	"""
+
+	def __init__(self, data, missing):
+		self.data = data
+		self.missing = missing
+
+
+	def items(self, start, stop):
+		items = self.data[start:stop].tolist()
+		missing = self.missing
+		for idx in islice(missing,
+			bisect.bisect_left(missing, start), bisect.bisect_left(missing, stop)
+		):
+			items[idx - start] = None
+		return items
+
+
+	def take(self, indices):
+		items = list(map(self.data.__getitem__, indices))
+		missing = self.missing
+		if missing:
+			for item_idx, idx in enumerate(indices):
+				missing_idx = bisect.bisect_left(missing, idx)
+				if missing_idx < len(missing) and missing[missing_idx] == idx:
+					items[item_idx] = None
+		return items
+
+
+	def select(self, indices):
+		return _make_column(self.take(indices))
+
+
+	def counts(self, batch_size):
+		for start in range(0, len(self.data), batch_size):
+			yield count_items(self.items(start, start + batch_size))
+
+
+	def transform(self, transformer):
+		return _make_column(list(map(transformer, self.items(0, len(self.data)))))
+
+
+	def get_size(self):
+		return (self.data.itemsize * len(self.data) +
+			self.missing.itemsize * len(self.missing))
+
+
+
+class _ObjectColumn(list):
+	"""A column of arbitrary items"""
+
+	def items(self, start, stop):
+		return self[start:stop]
+
+
+	def take(self, indices):
+		return list(map(self.__getitem__, indices))
+
+
+	def select(self, indices):
+		return _ObjectColumn(self.take(indices))
+
+
+	def counts(self, batch_size):
+		for start in range(0, len(self), batch_size):
+			yield count_items(self[start:start + batch_size])
+
+
+	def transform(self, transformer):
+		return _make_column(list(map(transformer, self)))
+
+
+	def get_size(self):
+		return sys.getsizeof(self) + sum(map(sys.getsizeof, self))
+
+
+
+_number_typecodes = {int: 'q', float: 'd'}
+
+
+def _encode(items):
+	"""
+	:param items: iterable
+	:return: (array.array, list)
+		the codes of 'items' and their distinct values in order of appearance
+	"""
+	value_codes = _value_code_dict()
+	codes = array.array(_code_typecode, map(value_codes.__getitem__, items))
+	return codes, list(value_codes)
+
+
+def _value_code_dict():
+	"""
+	:return: collections.defaultdict
+		a dictionary that assigns consecutive codes to new values on lookup,
+		so that whole columns can be encoded without a Python call per item
+	"""
+	return collections.defaultdict(count().__next__)
+
+
+def _normalize_codes(codes, values, normalize=None):
+	"""
+	:param codes: array.array
+	:param values: list
+	:param normalize: callable
+	:return: (array.array, list)
+		the codes and distinct values after applying 'normalize' to 'values'
+	"""
+	if normalize is None:
+		return codes, values
+	values = list(map(normalize, values))
+	value_codes = dict.fromkeys(values)
+	if len(value_codes) == len(values):
+		return codes, values
+
+	# some values became equal
+	for code, value in enumerate(value_codes):
+		value_codes[value] = code
+	recode = list(map(value_codes.__getitem__, values))
+	return array.array(codes.typecode, map(recode.__getitem__, codes)), list(value_codes)
+
+
+def _make_column(items):
+	"""
+	:param items: list
+	:return: _CodedColumn | _NumberColumn | _ObjectColumn
+		the most compact column representation of 'items'
+	"""
+	item_types = set(map(type, items))
+	item_types.discard(type(None))
+
+	if item_types == {str}:
+		return _CodedColumn(*_encode(items))
+
+	elif len(item_types) == 1:
+		typecode = _number_typecodes.get(item_types.pop())
+		if typecode is not None:
+			missing = array.array('q',
+				(idx for idx, item in enumerate(items) if item is None))
+			if missing:
+				zero = 0 if typecode == 'q' else 0.0
+				items = [zero if item is None else item for item in items]
+			try:
+				return _NumberColumn(array.array(typecode, items), missing)
+			except OverflowError:
+				pass
+
+	return _ObjectColumn(items)
+
+
+def _decode_column(codes, values):
+	"""
+	Like _make_column, but determines the item types from the distinct values
+	and fills the column storage straight from the codes.
+
+	:param codes: array.array
+	:param values: list
+	:return: _CodedColumn | _NumberColumn | _ObjectColumn
+	"""
+	value_types = set(map(type, values))
+	value_types.discard(type(None))
+
+	if value_types == {str}:
+		return _CodedColumn(codes, values)
+
+	elif len(value_types) == 1:
+		typecode = _number_typecodes.get(value_types.pop())
+		if typecode is not None:
+			missing_codes = frozenset(
+				code for code, value in enumerate(values) if value is None)
+			if missing_codes:
+				missing = array.array('q',
+					(idx for idx, code in enumerate(codes) if code in missing_codes))
+				zero = 0 if typecode == 'q' else 0.0
+				values = [zero if value is None else value for value in values]
+			else:
+				missing = array.array('q')
+			try:
+				return _NumberColumn(
+					array.array(typecode, map(values.__getitem__, codes)), missing)
+			except OverflowError:
+				pass
+
+	return _ObjectColumn(map(values.__getitem__, codes))
@@ -11,6 +11,16 @@ from ..utilities.string import join
 
 
 
+def _wants_items(collector):
+	return not (collector.has_collected or collector.is_saturated or
+		not collector.collects_items())
+
+
+def _is_saturated(collect_method):
+	return collect_method.__self__.is_saturated
+
+
+
 class ItemCollectorSet(ItemCollector, collections.OrderedDict):
 	"""Manages a set of collectors for a single column"""
 
@@ -30,8 +40,7 @@ class ItemCollectorSet(ItemCollector, collections.OrderedDict):
 		collect = ItemCollector.collect
 		collect(self, item, self)
 		each(methodcaller('collect', item, self),
-			filterfalse(attrgetter('has_collected'),
-				self.values()))
+			filter(_wants_items, self.values()))
 
 
 	class __result_type(object):
@@ -77,6 +86,60 @@ class ItemCollectorSet(ItemCollector, collections.OrderedDict):
 				return utilities.NaN
 
 
+	def collect_batch(self, items, collector_set = None):
+		assert collector_set is self
+		each(methodcaller('collect_batch', items, self),
+			filter(_wants_items, self.values()))
+
+
+	def collect_weighted(self, items, weights, collector_set = None):
+		assert collector_set is self
+		each(methodcaller('collect_weighted', items, weights, self),
+			filter(_wants_items, self.values()))
+
+
+	def merge(self, other):
+		"""
+		Merges the collectors of 'other' into the ones of this set, except for
+		those carried over from the predecessor.
+
+		:param other: ItemCollectorSet
+		:return: self
+		"""
+		for collector_type, collector in self.items():
+			if not collector.has_collected:
+				other_collector = other.get(collector_type)
+				if other_collector is None:
+					raise ValueError('Missing collector to merge: {}'.format(
+						getattr(collector_type, '__name__', collector_type)))
+				collector.merge(other_collector)
+		return self
+
+
+	def get_collect_methods(self, batch=False):
+		"""
+		:param batch: bool
+		:return: tuple[callable]
+			the bound 'collect' (or 'collect_batch') methods of the collectors of
+			this set that still want items, in order; collectors that have
+			collected or saturated already or that don't override either method
+			are left out.
+		"""
+		return tuple(map(attrgetter('collect_batch' if batch else 'collect'),
+			filter(_wants_items, self.values())))
+
+
+	@staticmethod
+	def has_saturated(collect_methods):
+		"""
+		:param collect_methods: tuple[callable]
+			as returned by get_collect_methods
+		:return: bool
+			whether any of the collectors of 'collect_methods' has saturated
+		"""
+		return any(map(_is_saturated, collect_methods))
+
+
 	def set_collected(self): self.__forward_call()
 
 	def set_transformed(self): self.__forward_call()
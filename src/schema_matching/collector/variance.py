@@ -27,10 +27,38 @@ class ItemVarianceCollector(ItemCollector):
 			pass
 
 
+	def collect_weighted(self, items, weights, collector_set=None):
+		for item, weight in zip(items, weights):
+			try:
+				if not isnan(item):
+					self.sum_of_squares += square(item - self.average) * weight
+					self.sum_of_squares_count += weight
+			except TypeError:
+				pass
+
+
+	def merge(self, other):
+		if self.average != other.average:
+			raise ValueError('Variances around different averages can\'t be merged')
+		self.sum_of_squares += other.sum_of_squares
+		self.sum_of_squares_count += other.sum_of_squares_count
+		return self
+
+
 	def get_result(self, collector_set = None):
 		return self.sum_of_squares / self.sum_of_squares_count
 
 
+	def get_estimate(self):
+		"""
+		:return: float | None
+			the standard deviation of the items collected so far
+		"""
+		if not self.sum_of_squares_count:
+			return None
+		return sqrt(self.sum_of_squares / self.sum_of_squares_count)
+
+
 
 class ItemStandardDeviationCollector(ItemCollector):
 
@@ -0,0 +1,140 @@
+import math, numbers, collections
+from .base import ItemCollector
+from .set import ItemCollectorSet
+from .weight import WeightDict, normalize_exp
+from ..utilities import operator as uoperator
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+
+def available():
+	return numpy is not None
+
+
+def results_norms(a, b, weights):
+	"""
+	Computes the norms between all column pairs of two schema instances with
+	NumPy. The results equal those of ItemCollectorSet.result_norm up to
+	floating-point rounding.
+
+	:param a: list[ItemCollectorSet]
+	:param b: list[ItemCollectorSet]
+	:param weights: WeightDict
+	:return: list[list[float]]
+	"""
+	if numpy is None:
+		raise ImportError("The vectorised norm computation requires NumPy.")
+
+	norms = numpy.empty((len(b), len(a)))
+	groups_b = _group_by_signature(b)
+	for columns_a in _group_by_signature(a).values():
+		sets_a = tuple(map(a.__getitem__, columns_a))
+		for columns_b in groups_b.values():
+			norms[numpy.ix_(columns_b, columns_a)] = _block_norms(
+				sets_a, tuple(map(b.__getitem__, columns_b)), weights)
+	return norms.tolist()
+
+
+def _group_by_signature(collector_sets):
+	"""
+	Groups column indices by the types and dependency flags of their
+	collectors, which determine the terms of their norms.
+	"""
+	groups = collections.OrderedDict()
+	for idx, collector_set in enumerate(collector_sets):
+		signature = tuple(
+			(ctype, collector.isdependency)
+			for ctype, collector in collector_set.items())
+		groups.setdefault(signature, []).append(idx)
+	return groups
+
+
+def _block_norms(sets_a, sets_b, weights):
+	"""
+	Computes the norms between columns with the same signature each, i. e. a
+	block of the matrix of all norms.
+
+	:return: numpy.ndarray
+	"""
+	a0 = sets_a[0]
+	if not all(map(sets_b[0].__contains__, a0.keys())):
+		return numpy.full((len(sets_b), len(sets_a)),
+			weights[ItemCollectorSet].coefficient, float)
+
+	sum_element, sum_total = map(vectorize, weights.sum_data)
+	value_sum = numpy.zeros((len(sets_b), len(sets_a)))
+	weight_sum = 0
+	with numpy.errstate(invalid='ignore', over='ignore', divide='ignore'):
+		for ctype, collector in a0.items():
+			if collector.isdependency:
+				continue
+			weight = weights[type(collector)]
+			weight_sum += weight.coefficient
+			value_sum += sum_element(vectorize(weight)(
+				_distances(ctype, type(collector), sets_a, sets_b)))
+
+		value_sum = sum_total(value_sum)
+		norms = value_sum / weight_sum if weight_sum else value_sum
+	norms[value_sum == 0] = math.nan
+	return norms
+
+
+def _distances(ctype, collector_type, sets_a, sets_b):
+	results_a = [s[ctype].get_result(s) for s in sets_a]
+	results_b = [s[ctype].get_result(s) for s in sets_b]
+
+	if collector_type.result_norm is ItemCollector.result_norm:
+		# plain absolute differences of scalar results
+		if all(isinstance(r, numbers.Real)
+			for results in (results_a, results_b) for r in results
+		):
+			results_a = numpy.fromiter(results_a, float, len(results_a))
+			results_b = numpy.fromiter(results_b, float, len(results_b))
+			return numpy.abs(results_b[:, numpy.newaxis] - results_a)
+
+	# other (e. g. distribution) results keep their own kernel
+	result_norm = sets_a[0][ctype].result_norm
+	return numpy.array([
+		[result_norm(result_a, result_b) for result_a in results_a]
+		for result_b in results_b
+	], float)
+
+
+def _scale(factor):
+	return lambda x: x * factor
+
+
+_vectorized_functions = {
+	uoperator.identity: uoperator.identity,
+	uoperator.square: numpy.square,
+	abs: numpy.abs,
+	math.sqrt: numpy.sqrt,
+	normalize_exp: lambda x: -numpy.expm1(-x),
+} if numpy is not None else {}
+
+
+def vectorize(fn):
+	"""
+	Returns an element-wise array function equivalent to a scalar function,
+	preferably a native NumPy one.
+
+	:param fn: callable | WeightDict.WeightFunctor
+	:return: callable
+	"""
+	if isinstance(fn, WeightDict.WeightFunctor):
+		fn = fn.weightfn
+
+	vectorized_fn = _vectorized_functions.get(fn)
+	if vectorized_fn is not None:
+		return vectorized_fn
+
+	factor = getattr(fn, '__self__', None)
+	if getattr(fn, '__name__', None) == '__mul__' and \
+			isinstance(factor, numbers.Real):
+		return _scale(factor)
+
+	return numpy.vectorize(fn, otypes=(float,))
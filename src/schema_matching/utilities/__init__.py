@@ -1,6 +1,6 @@
 from . import (
-	argparse, distribution, functional, iterator, misc, operator, string,
-	timelimit,
+	argparse, assignment, distribution, functional, iterator, misc, operator,
+	string, timelimit,
 )
 from .misc import (
 	infinity, NaN, minmax, sliceout, starmap, issubset, rdict,
@@ -1,4 +1,5 @@
 import builtins, sys, argparse, itertools
+from . import compression
 
 
 
@@ -28,6 +29,32 @@ class NargsRangeAction(argparse.Action):
 
 
 
+class DecompressingFileType(argparse.FileType):
+	"""
+	Like argparse.FileType, but opens compressed files and a compressed
+	standard input for reading with compression.open_file and
+	compression.open_stream respectively.
+	"""
+
+	def __call__(self, string):
+		if self._mode not in ('r', 'rt'):
+			return super().__call__(string)
+		if string == '-':
+			stdin = getattr(sys.stdin, 'buffer', None)
+			if (stdin is None or not hasattr(stdin, 'peek') or
+				compression.detect_stream_compression(stdin) is None
+			):
+				return super().__call__(string)
+			return compression.open_stream(stdin, self._encoding, self._errors)
+		try:
+			return compression.open_file(
+				string, self._mode, self._encoding, self._errors)
+		except OSError as ex:
+			raise argparse.ArgumentTypeError(
+				"can't open '{}': {}".format(string, ex))
+
+
+
 class ChoicesRangeHelpFormatter(argparse.HelpFormatter):
 
 	def _expand_help(self, action):
@@ -0,0 +1,479 @@
+import operator, heapq, itertools
+from itertools import repeat, compress
+from functools import partial as partialfn
+from math import fsum
+from .misc import infinity, minmax
+from .functional import composefn
+from .timelimit import Timelimit
+
+
+
+def _isforbidden(cost):
+	return cost is None or cost == infinity
+
+
+def _forbidden_as_infinity(cost_matrix):
+	return [
+		[infinity if _isforbidden(cost) else cost for cost in row]
+		for row in cost_matrix
+	]
+
+
+def transpose(matrix):
+	return list(map(list, zip(*matrix)))
+
+
+def min_cost_assignment(cost_matrix, stats=None):
+	"""
+	Solves the rectangular linear assignment problem for a cost matrix with
+	shortest augmenting paths and dual potentials (Hungarian method in the
+	formulation of Jonker and Volgenant) in O(n² · m).
+
+	Entries that are None or infinite mark forbidden pairs.
+
+	If there are no more rows than columns, every row is assigned a distinct
+	column; otherwise every column is assigned a distinct row and the
+	remaining rows are left unassigned.
+
+	:param cost_matrix: list[list[float]]
+	:param stats: dict
+	:return: (float, tuple[int]) the total cost and the assigned column index of
+		every row (or None); (infinity, None) if there is no feasible assignment
+	"""
+	if stats is not None:
+		stats.update(nodes=0, interrupted=False, lower_bound=None)
+
+	if not cost_matrix or not cost_matrix[0]:
+		return 0, tuple(repeat(None, len(cost_matrix)))
+
+	if len(cost_matrix) > len(cost_matrix[0]):
+		total, column_assignment = \
+			min_cost_assignment(transpose(cost_matrix), stats)
+		if column_assignment is None:
+			return total, None
+		row_assignment = list(repeat(None, len(cost_matrix)))
+		for j, i in enumerate(column_assignment):
+			row_assignment[i] = j
+		return total, tuple(row_assignment)
+
+	cost_matrix = _forbidden_as_infinity(cost_matrix)
+	n = len(cost_matrix)
+	m = len(cost_matrix[0])
+	assert all(map(m.__eq__, map(len, cost_matrix)))
+
+	# Index 0 of the column arrays is a virtual column for the row that is
+	# currently being inserted.
+	u = list(repeat(0, n + 1))
+	v = list(repeat(0, m + 1))
+	column_owner = list(repeat(0, m + 1))
+	way = list(repeat(0, m + 1))
+	columns = range(1, m + 1)
+
+	for i in range(1, n + 1):
+		column_owner[0] = i
+		j0 = 0
+		minv = list(repeat(infinity, m + 1))
+		used = list(repeat(False, m + 1))
+
+		while True:
+			if stats is not None:
+				stats['nodes'] += 1
+			used[j0] = True
+			i0 = column_owner[j0]
+			row = cost_matrix[i0 - 1]
+			u_i0 = u[i0]
+			delta = infinity
+			j1 = 0
+			for j in columns:
+				if not used[j]:
+					reduced_cost = row[j - 1] - u_i0 - v[j]
+					if reduced_cost < minv[j]:
+						minv[j] = reduced_cost
+						way[j] = j0
+					if minv[j] < delta:
+						delta = minv[j]
+						j1 = j
+
+			if not j1:
+				# only forbidden pairs left to augment the assignment
+				return infinity, None
+
+			for j in range(m + 1):
+				if used[j]:
+					u[column_owner[j]] += delta
+					v[j] -= delta
+				else:
+					minv[j] -= delta
+
+			j0 = j1
+			if not column_owner[j0]:
+				break
+
+		# augment along the alternating path
+		while j0:
+			j1 = way[j0]
+			column_owner[j0] = column_owner[j1]
+			j0 = j1
+
+	row_assignment = list(repeat(None, n))
+	for j in columns:
+		if column_owner[j]:
+			row_assignment[column_owner[j] - 1] = j - 1
+	total = fsum(map(operator.getitem, cost_matrix, row_assignment))
+	if stats is not None:
+		stats['lower_bound'] = total
+	return total, tuple(row_assignment)
+
+
+def min_cost_column_assignment(distance_matrix, stats=None):
+	"""
+	Assigns a distinct row to every column of a matrix with at least as many
+	rows as columns, such that the sum of the distances is minimal.
+
+	:param distance_matrix: list[list[float]]
+	:param stats: dict
+	:return: (float, tuple[int])
+	"""
+	assert len(distance_matrix) >= len(distance_matrix[0])
+	return min_cost_assignment(transpose(distance_matrix), stats)
+
+
+def branch_and_bound_column_assignment(distance_matrix, stats=None):
+	"""
+	Finds the same assignment as min_cost_column_assignment with a depth-first
+	branch-and-bound search that can be interrupted at any time.
+
+	The search starts from a greedy assignment and explores the cheapest
+	branches first. Branches are pruned with an admissible lower bound, the
+	larger of the sums of the column minima and of the smallest row minima of
+	the remaining sub-matrix.
+
+	If Timelimit interrupts the search, the best assignment found so far is
+	returned and the item 'lower_bound' of 'stats' holds a lower bound of the
+	optimal norm.
+
+	:param distance_matrix: list[list[float]]
+	:param stats: dict
+	:return: (float, tuple[int])
+	"""
+	assert operator.eq(*minmax(map(len, distance_matrix)))
+	maxI = len(distance_matrix) # row count
+	maxJ = len(distance_matrix[0]) # column count
+	assert maxI >= maxJ
+	if stats is None:
+		stats = dict()
+	stats.update(nodes=0, interrupted=False, lower_bound=None)
+
+	columns = transpose(_forbidden_as_infinity(distance_matrix))
+	# Search the most expensive columns first to tighten the bounds early on.
+	column_order = sorted(range(maxJ), key=composefn(columns.__getitem__, min),
+		reverse=True)
+	columns = list(map(columns.__getitem__, column_order))
+
+	def lower_bound(depth, used_rows):
+		free_rows = tuple(map(operator.not_, used_rows))
+		column_bound = fsum(map(min,
+			map(partialfn(compress, selectors=free_rows), columns[depth:])))
+		row_minima = map(min,
+			zip(*map(partialfn(compress, selectors=free_rows), columns[depth:])))
+		row_bound = fsum(heapq.nsmallest(maxJ - depth, row_minima))
+		return max(column_bound, row_bound)
+
+	def greedy():
+		used_rows = list(repeat(False, maxI))
+		cost = 0
+		path = []
+		for column in columns:
+			i = min(compress(range(maxI), map(operator.not_, used_rows)),
+				key=column.__getitem__)
+			if column[i] == infinity:
+				return infinity, None
+			used_rows[i] = True
+			cost += column[i]
+			path.append(i)
+		return cost, tuple(path)
+
+	incumbent_cost, incumbent = greedy()
+	used_rows = list(repeat(False, maxI))
+	root_bound = lower_bound(0, used_rows) if maxJ else 0
+	# stack items: (bound, cost, path)
+	stack = [(root_bound, 0, ())]
+
+	while stack:
+		if Timelimit.interrupted_flag:
+			stats['interrupted'] = True
+			break
+		bound, cost, path = stack.pop()
+		if bound >= incumbent_cost:
+			continue
+		depth = len(path)
+		if depth == maxJ:
+			incumbent_cost, incumbent = cost, path
+			continue
+
+		stats['nodes'] += 1
+		used_rows[:] = repeat(False, maxI)
+		for i in path:
+			used_rows[i] = True
+		column = columns[depth]
+		children = []
+		for i in compress(range(maxI), map(operator.not_, used_rows)):
+			if column[i] != infinity:
+				used_rows[i] = True
+				child_cost = cost + column[i]
+				child_bound = child_cost + (
+					lower_bound(depth + 1, used_rows) if depth + 1 < maxJ else 0)
+				used_rows[i] = False
+				if child_bound < incumbent_cost:
+					children.append((child_bound, child_cost, path + (i,)))
+
+		# push the most promising child last to explore it first
+		children.sort(key=operator.itemgetter(0), reverse=True)
+		stack.extend(children)
+
+	if stats['interrupted']:
+		stats['lower_bound'] = min(incumbent_cost,
+			min(map(operator.itemgetter(0), stack), default=infinity))
+	else:
+		stats['lower_bound'] = incumbent_cost
+
+	if incumbent is None:
+		return infinity, None
+	mapping = list(repeat(None, maxJ))
+	for j, i in zip(column_order, incumbent):
+		mapping[j] = i
+	return incumbent_cost, tuple(mapping)
+
+
+def connected_components(distance_matrix):
+	"""
+	Splits the bipartite graph of the rows and columns of a matrix, with an
+	edge for every allowed (i. e. not forbidden) entry, into its connected
+	components.
+
+	:param distance_matrix: list[list[float]]
+	:return: iterable[(tuple[int], tuple[int])] the row and column indices of
+		each component
+	"""
+	row_count = len(distance_matrix)
+	column_count = len(distance_matrix[0]) if row_count else 0
+	row_seen = list(repeat(False, row_count))
+	column_seen = list(repeat(False, column_count))
+
+	for start in range(row_count):
+		if row_seen[start]:
+			continue
+		row_seen[start] = True
+		rows = [start]
+		columns = []
+		for i in rows:
+			for j, d in enumerate(distance_matrix[i]):
+				if not column_seen[j] and not _isforbidden(d):
+					column_seen[j] = True
+					columns.append(j)
+					for i2 in range(row_count):
+						if not row_seen[i2] and not _isforbidden(distance_matrix[i2][j]):
+							row_seen[i2] = True
+							rows.append(i2)
+		yield tuple(sorted(rows)), tuple(sorted(columns))
+
+	for j in compress(range(column_count), map(operator.not_, column_seen)):
+		yield (), (j,)
+
+
+def decomposed_column_assignment(distance_matrix,
+	search=min_cost_column_assignment, stats=None, map_blocks=map
+):
+	"""
+	Solves the column assignment problem separately for every connected
+	component of allowed pairs (see connected_components) and stitches the
+	partial solutions together.
+
+	Columns that cannot be mapped because their component has too few rows or
+	too many forbidden pairs remain unmapped (None), while the number of
+	mapped columns is maximised.
+
+	:param distance_matrix: list[list[float]]
+	:param search: callable
+	:param stats: dict
+	:param map_blocks: callable
+		a map implementation to solve the components with, e. g. of an
+		executor; only used if at least two components have more than
+		'parallel_block_size' rows and columns, the others are solved in place.
+	:return: (float, tuple[int])
+	"""
+	components = tuple(filter(operator.itemgetter(1),
+		connected_components(distance_matrix)))
+	whole_matrix = (
+		tuple(range(len(distance_matrix))), tuple(range(len(distance_matrix[0]))))
+	if components == (whole_matrix,):
+		norm, mapping = search(distance_matrix, stats)
+		if mapping is not None:
+			return norm, mapping
+
+	blocks = [
+		[[distance_matrix[i][j] for j in columns] for i in rows]
+		for rows, columns in components
+	]
+	large_block_indices = ()
+	if map_blocks is not map:
+		large_block_indices = [
+			block_idx for block_idx, block in enumerate(blocks)
+			if block and min(len(block), len(block[0])) > parallel_block_size]
+		if len(large_block_indices) < 2:
+			large_block_indices = ()
+	# solve the small blocks here while the large ones are mapped
+	large_results = map_blocks(_solve_block,
+		map(blocks.__getitem__, large_block_indices), repeat(search))
+	results = [
+		None if block_idx in large_block_indices else _solve_block(block, search)
+		for block_idx, block in enumerate(blocks)]
+	for block_idx, result in zip(large_block_indices, large_results):
+		results[block_idx] = result
+
+	mapping = list(repeat(None, len(distance_matrix[0])))
+	for (rows, columns), (_, block_mapping, _) in zip(components, results):
+		for j, i in zip(columns, block_mapping):
+			if i is not None:
+				mapping[j] = rows[i]
+
+	if stats is not None:
+		block_stats = tuple(map(operator.itemgetter(2), results))
+		lower_bounds = tuple(map(operator.itemgetter('lower_bound'), block_stats))
+		stats.update(
+			nodes=sum(map(operator.itemgetter('nodes'), block_stats)),
+			interrupted=any(map(operator.itemgetter('interrupted'), block_stats)),
+			lower_bound=None if None in lower_bounds else fsum(lower_bounds),
+			components=len(components))
+	return fsum(map(operator.itemgetter(0), results)), tuple(mapping)
+
+
+parallel_block_size = 8
+
+
+def _solve_block(block, search):
+	stats = dict(nodes=0, interrupted=False, lower_bound=0)
+	if not block:
+		return 0, (None,), stats
+
+	if len(block) >= len(block[0]):
+		norm, mapping = search(block, stats)
+		if mapping is not None:
+			return norm, mapping, stats
+
+	# Pad the block with dummy rows, which are more expensive than any
+	# combination of real pairs, to leave the excess columns unmapped.
+	column_count = len(block[0])
+	penalty = 1 + fsum(map(abs,
+		itertools.filterfalse(_isforbidden, itertools.chain.from_iterable(block))))
+	padded_block = block + [
+		list(repeat(penalty, column_count)) for _ in range(column_count)]
+	_, mapping = min_cost_column_assignment(padded_block, stats)
+	mapping = tuple(i if i < len(block) else None for i in mapping)
+	norm = fsum(block[i][j] for j, i in enumerate(mapping) if i is not None)
+	stats['lower_bound'] = norm
+	return norm, mapping, stats
+
+
+def ranked_column_assignments(distance_matrix,
+	search=min_cost_column_assignment
+):
+	"""
+	Enumerates the column assignments of a distance matrix in the order of
+	ascending norms with Murty's partitioning of the solution space.
+
+	Each yielded assignment costs one solution of a sub-problem per column,
+	which are all solved with 'search'.
+
+	:param distance_matrix: list[list[float]]
+	:param search: callable
+	:return: iterable[(float, tuple[int])]
+	"""
+	tie_breaker = itertools.count()
+	queue = []
+
+	def push(matrix):
+		norm, mapping = search(matrix)
+		if mapping is not None:
+			heapq.heappush(queue, (norm, next(tie_breaker), mapping, matrix))
+
+	push(distance_matrix)
+	while queue:
+		norm, _, mapping, matrix = heapq.heappop(queue)
+		yield norm, mapping
+
+		# Partition the remaining solutions of this sub-problem: the t-th
+		# partition keeps the first t-1 pairs of 'mapping' and forbids its t-th.
+		matrix = list(map(list, matrix))
+		for j, i in enumerate(mapping):
+			column = tuple(map(operator.itemgetter(j), matrix))
+			if len(column) - sum(map(_isforbidden, column)) > 1:
+				partition = list(map(list, matrix))
+				partition[i][j] = None
+				push(partition)
+
+			# force the pair (i, j) for the following partitions
+			for i2, row in enumerate(matrix):
+				if i2 != i:
+					row[j] = None
+			matrix[i][:] = repeat(None, len(mapping))
+			matrix[i][j] = distance_matrix[i][j]
+
+
+def exhaustive_column_assignment(distance_matrix, stats=None):
+	"""
+	Finds the same assignment as min_cost_column_assignment by recursive
+	enumeration of all possible mappings. This takes factorial time and is
+	mostly useful as a reference.
+
+	:param distance_matrix: list[list[float]]
+	:param stats: dict
+	:return: (float, tuple[int])
+	"""
+	if stats is None:
+		stats = dict()
+	stats.update(nodes=0, interrupted=False, lower_bound=None)
+	assert operator.eq(*minmax(map(len, distance_matrix)))
+	successor = (1).__add__
+	predecessor = (1).__rsub__
+
+	maxI = len(distance_matrix) # row count
+	maxJ = len(distance_matrix[0]) # column count
+	assert maxI >= maxJ
+	rangeJ = range(maxJ)
+	known_mappings = list(repeat(None, maxJ))
+
+	iter_unmapped = partialfn(filter,
+		composefn(known_mappings.__getitem__, partialfn(operator.is_, None)),
+		rangeJ)
+
+	def sweep_row(i, skippable_count):
+		stats['nodes'] += 1
+		if Timelimit.interrupted_flag or skippable_count < 0:
+			return infinity, None
+		if i == maxI:
+			return 0, tuple(known_mappings)
+
+		# try to skip column j
+		minlength, minpath = sweep_row(successor(i), predecessor(skippable_count))
+
+		for j in iter_unmapped():
+			if Timelimit.interrupted_flag:
+				break
+			d = distance_matrix[i][j]
+			if d is not None:
+				known_mappings[j] = i
+				length, path = sweep_row(successor(i), skippable_count)
+				known_mappings[j] = None
+				length += d
+				if length < minlength:
+					assert path is not None
+					minlength = length
+					minpath = path
+		return minlength, minpath
+
+	result = sweep_row(0, maxI - maxJ)
+	stats['interrupted'] = bool(Timelimit.interrupted_flag)
+	if not stats['interrupted']:
+		stats['lower_bound'] = result[0]
+	return result
@@ -0,0 +1,111 @@
+import os, os.path, pickle, tempfile
+from operator import itemgetter
+
+
+
+class LRUDirectoryCache(object):
+	"""
+	Stores pickled objects as files in a directory. When the total size of the
+	files exceeds a limit, the least recently used ones are evicted.
+	"""
+
+	suffix = '.pickle'
+
+
+	def __init__(self, path, max_size=256 << 20):
+		"""
+		:param path: str
+		:param max_size: int
+			the maximum total size of the cache files in bytes
+		"""
+		super().__init__()
+		self.path = path
+		self.max_size = max_size
+
+
+	def __filename(self, key):
+		return os.path.join(self.path, key + self.suffix)
+
+
+	def get(self, key, default=None):
+		"""
+		Returns the object stored with the given key and marks it as recently
+		used.
+
+		:param key: str
+		:param default: object
+		:return: object
+		"""
+		filename = self.__filename(key)
+		try:
+			with open(filename, 'rb') as f:
+				value = pickle.load(f)
+		except FileNotFoundError:
+			return default
+		except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+			# unreadable or outdated entry
+			self.discard(key)
+			return default
+
+		try:
+			os.utime(filename)
+		except OSError:
+			pass
+		return value
+
+
+	def __contains__(self, key):
+		return os.path.exists(self.__filename(key))
+
+
+	def __setitem__(self, key, value):
+		os.makedirs(self.path, exist_ok=True)
+		fd, tmp_filename = tempfile.mkstemp(self.suffix + '.tmp', '.', self.path)
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+			os.replace(tmp_filename, self.__filename(key))
+		except:
+			os.unlink(tmp_filename)
+			raise
+		self.evict()
+
+
+	def discard(self, key):
+		try:
+			os.unlink(self.__filename(key))
+		except FileNotFoundError:
+			pass
+
+
+	def evict(self, max_size=None):
+		"""
+		Removes the least recently used entries until the total size is at most
+		max_size.
+
+		:param max_size: int
+		:return: int the number of removed entries
+		"""
+		if max_size is None:
+			max_size = self.max_size
+
+		entries = []
+		with os.scandir(self.path) as it:
+			for entry in it:
+				if entry.name.endswith(self.suffix) and entry.is_file():
+					stat = entry.stat()
+					entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+		total_size = sum(map(itemgetter(1), entries))
+		removed_count = 0
+		entries.sort(key=itemgetter(0))
+		for _, size, path in entries:
+			if total_size <= max_size:
+				break
+			try:
+				os.unlink(path)
+			except FileNotFoundError:
+				pass
+			total_size -= size
+			removed_count += 1
+		return removed_count
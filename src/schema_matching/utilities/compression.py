@@ -0,0 +1,189 @@
+import io, os.path, threading, queue, gzip, bz2, lzma
+
+
+
+__formats = (
+	(b'\x1f\x8b', gzip, '.gz'),
+	(b'BZh', bz2, '.bz2'),
+	(b'\xfd7zXZ\x00', lzma, '.xz'),
+)
+
+suffixes = tuple(suffix for _, _, suffix in __formats)
+
+__magic_size = max(len(format_magic) for format_magic, _, _ in __formats)
+
+
+def detect_compression(path):
+	"""
+	Detects the compression of a file from its magic number.
+
+	:param path: str
+	:return: module | None
+		the module to decompress the file with, i. e. gzip, bz2 or lzma, or
+		None if the file isn't compressed in one of those formats
+	"""
+	with open(path, 'rb') as f:
+		return __match_magic(f.read(__magic_size))
+
+
+def detect_stream_compression(f):
+	"""
+	Detects the compression of a binary stream from its magic number without
+	consuming it, e. g. of the standard input.
+
+	:param f: io.BufferedReader
+	:return: module | None
+		like detect_compression
+	"""
+	return __match_magic(f.peek(__magic_size))
+
+
+def __match_magic(magic):
+	for format_magic, module, _ in __formats:
+		if magic.startswith(format_magic):
+			return module
+	return None
+
+
+def strip_suffix(path):
+	"""
+	:param path: str
+	:return: str 'path' without a compression suffix, if any
+	"""
+	root, ext = os.path.splitext(path)
+	return root if ext in suffixes else path
+
+
+def open_file(path, mode='r', encoding=None, errors=None,
+	block_size=1 << 20, queue_size=8
+):
+	"""
+	Opens a file like 'open'. Compressed files are detected by their magic
+	number and opened for reading as a text stream of their decompressed
+	content, which is decompressed in a background thread. Such streams have
+	an attribute 'compression' with the name of the decompression module and
+	aren't seekable.
+
+	:param path: str
+	:param mode: str
+	:param block_size: int
+		the size of the decompressed blocks passed from the background thread
+	:param queue_size: int
+		the number of decompressed blocks that may wait to be read
+	:return: io.IOBase
+	"""
+	compression = (
+		detect_compression(path)
+		if mode in ('r', 'rt') and os.path.isfile(path) else
+		None)
+	if compression is None:
+		return open(path, mode, encoding=encoding, errors=errors)
+
+	return __open_decompressed(
+		path, compression, encoding, errors, block_size, queue_size)
+
+
+def open_stream(f, encoding=None, errors=None, block_size=1 << 20,
+	queue_size=8
+):
+	"""
+	Like open_file for a binary stream, e. g. the standard input. Compressed
+	streams are detected by their magic number; others are wrapped in a text
+	stream as they are.
+
+	:param f: io.BufferedReader
+	:return: io.TextIOBase
+	"""
+	compression = detect_stream_compression(f)
+	if compression is None:
+		return io.TextIOWrapper(f, encoding, errors)
+	return __open_decompressed(
+		f, compression, encoding, errors, block_size, queue_size)
+
+
+def __open_decompressed(source, compression, encoding, errors, block_size,
+	queue_size
+):
+	raw = DecompressingReader(source, compression, block_size, queue_size)
+	f = io.TextIOWrapper(io.BufferedReader(raw, block_size), encoding, errors)
+	f.compression = compression.__name__
+	return f
+
+
+
+class DecompressingReader(io.RawIOBase):
+	"""
+	A raw binary stream of the decompressed content of a file or a binary
+	stream that is read and decompressed in a background thread, so that
+	decompression overlaps with the processing of the content.
+	"""
+
+	def __init__(self, source, compression, block_size=1 << 20, queue_size=8):
+		"""
+		:param source: str | io.BufferedIOBase
+			the path of a file or a binary stream
+		:param compression: module
+			a module with an 'open' function like gzip, bz2 or lzma
+		:param block_size: int
+		:param queue_size: int
+		"""
+		super().__init__()
+		self.name = source if isinstance(source, str) else getattr(source, 'name', None)
+		self.__blocks = queue.Queue(queue_size)
+		self.__block = memoryview(b'')
+		self.__eof = False
+		self.__closing = threading.Event()
+		self.__thread = threading.Thread(target=self.__decompress,
+			args=(compression.open(source, 'rb'), block_size), daemon=True)
+		self.__thread.start()
+
+
+	def __decompress(self, f, block_size):
+		try:
+			with f:
+				while not self.__closing.is_set():
+					block = f.read(block_size)
+					self.__put(block)
+					if not block:
+						break
+		except Exception as ex:
+			self.__put(ex)
+
+
+	def __put(self, item):
+		while not self.__closing.is_set():
+			try:
+				self.__blocks.put(item, timeout=0.1)
+				return
+			except queue.Full:
+				pass
+
+
+	def readable(self):
+		return True
+
+
+	def readinto(self, b):
+		while not self.__block:
+			if self.__eof:
+				return 0
+			block = self.__blocks.get()
+			if isinstance(block, Exception):
+				self.__eof = True
+				raise block
+			if not block:
+				self.__eof = True
+				return 0
+			self.__block = memoryview(block)
+
+		size = min(len(b), len(self.__block))
+		b[:size] = self.__block[:size]
+		self.__block = self.__block[size:]
+		return size
+
+
+	def close(self):
+		if not self.closed:
+			self.__closing.set()
+			self.__thread.join()
+		super().close()
@@ -1,5 +1,5 @@
 import numbers, array, itertools, operator, math
-from collections import defaultdict
+from collections import defaultdict, Counter
 from math import fsum
 from .misc import minmax2
 from .string import join, format_char
@@ -46,7 +46,7 @@ class SparseDistributionTable(DistributionTable, defaultdict):
 
 
 	def distance_to(self, other):
-		return fsum((abs(p - other[bin]) for bin, p in self.items())) + \
+		return fsum((abs(p - other.get(bin, 0)) for bin, p in self.items())) + \
 			fsum(p for bin, p in other.items() if bin not in self)
 
 
@@ -58,6 +58,29 @@ class SparseDistributionTable(DistributionTable, defaultdict):
 		self[item] += value
 
 
+	def increase_all(self, items):
+		"""
+		Increases the frequency of each item by one, in the same order as
+		repeated calls to 'increase' would.
+
+		:param items: iterable
+		"""
+		for item, value in Counter(items).items():
+			self[item] += value
+
+
+	def merge(self, other):
+		"""
+		Adds the frequencies of another table to this one.
+
+		:param other: SparseDistributionTable
+		:return: self
+		"""
+		for item, value in other.items():
+			self[item] += value
+		return self
+
+
 	def __truediv__(self, divisor):
 		"""
 		:param divisor: numbers.Real
@@ -159,6 +182,29 @@ class UniformBinDistributionTable(DistributionTable):
 		self.data[self.getbinidx(key)] += value
 
 
+	def increase_all(self, keys):
+		data = self.data
+		for idx in map(self.getbinidx, keys):
+			data[idx] += 1
+
+
+	def merge(self, other):
+		"""
+		Adds the frequencies of another table with the same bins to this one.
+
+		:param other: UniformBinDistributionTable
+		:return: self
+		"""
+		if not (self.lower == other.lower and self.upper == other.upper and
+			self.__step == other.__step and len(self.data) == len(other.data)
+		):
+			raise ValueError('Distribution tables with different bins can\'t be merged')
+		data = self.data
+		for idx, value in enumerate(other.data):
+			data[idx] += value
+		return self
+
+
 	def __len__(self):
 		return len(self.data)
 
@@ -0,0 +1,193 @@
+import sys, time, json, collections, contextlib, tracemalloc
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+
+
+# the report that receives the records of this process, if any
+active = None
+
+REPORT_VERSION = 1
+
+
+class RunReport(object):
+	"""
+	Records the size and the stages of each schema instance and the stages of
+	the comparison of schema instances, e. g. the norm computation and the
+	search for the best mapping, with their wall time and peak memory use.
+
+	Peak memory is reported as the peak of the allocations traced by
+	tracemalloc during the stage ('tracemalloc_peak') and as the peak
+	resident set size of the process so far ('peak_rss'). The latter is
+	cumulative: it never decreases, so a stage after a larger one reports
+	the same value. Stages of schema instances collected in worker processes
+	carry the peak memory of those.
+	"""
+
+	def __init__(self, trace_allocations=True):
+		"""
+		:param trace_allocations: bool
+			Start tracemalloc while the report is active, unless it's tracing
+			already. Tracing slows down the run.
+		"""
+		super().__init__()
+		self.instances = collections.OrderedDict()
+		self.stages = []
+		self.start_time = time.perf_counter()
+		self.trace_allocations = trace_allocations
+		self.__previous = None
+		self.__started_tracing = False
+
+
+	def __enter__(self):
+		global active
+		self.__previous = active
+		active = self
+		if self.trace_allocations and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.__started_tracing = True
+		return self
+
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		global active
+		active = self.__previous
+		self.__previous = None
+		if self.__started_tracing:
+			tracemalloc.stop()
+			self.__started_tracing = False
+
+
+	def instance(self, name):
+		"""
+		:param name: str
+		:return: dict the record of a schema instance
+		"""
+		record = self.instances.get(name)
+		if record is None:
+			record = self.instances[name] = {'name': name, 'stages': []}
+		return record
+
+
+	@contextlib.contextmanager
+	def stage(self, name, instance=None):
+		"""
+		Measures a stage of the run of a schema instance or, if 'instance' is
+		None, of the whole run.
+
+		:param name: str
+		:param instance: str
+		:return: context manager of dict
+			the record of the stage, to which further values may be added
+		"""
+		record = {'name': name}
+		tracing = tracemalloc.is_tracing()
+		# before Python 3.9 the peak can't be reset and is that of the run so far
+		if tracing and hasattr(tracemalloc, 'reset_peak'):
+			tracemalloc.reset_peak()
+		start_time = time.perf_counter()
+		yield record
+		record['wall_time'] = time.perf_counter() - start_time
+		record['peak_rss'] = get_peak_rss()
+		record['tracemalloc_peak'] = \
+			tracemalloc.get_traced_memory()[1] if tracing else None
+		(self.stages if instance is None else self.instance(instance)['stages']) \
+			.append(record)
+
+
+	def merge(self, instances):
+		"""
+		Adds the instance records of another report, e. g. of a worker process.
+
+		:param instances: iterable[dict]
+		:return: self
+		"""
+		for other in instances:
+			record = self.instance(other['name'])
+			for key, value in other.items():
+				if key == 'stages':
+					record['stages'].extend(value)
+				elif key != 'name':
+					record[key] = value
+		return self
+
+
+	def as_dict(self):
+		return {
+			'version': REPORT_VERSION,
+			'wall_time': time.perf_counter() - self.start_time,
+			'peak_rss': get_peak_rss(),
+			'instances': list(map(_instance_summary, self.instances.values())),
+			'stages': self.stages,
+		}
+
+
+	def write(self, f):
+		"""
+		:param f: io.TextIOBase
+		"""
+		json.dump(self.as_dict(), f, indent='\t')
+		f.write('\n')
+
+
+
+def _instance_summary(record):
+	"""
+	Adds the derived values to a copy of an instance record: the number of
+	distinct collection phases executed, the bytes read and the rows per
+	second of wall time of all stages.
+	"""
+	record = dict(record)
+	stages = record['stages']
+	record['phases'] = len(set(
+		stage['name'] for stage in stages if stage['name'].startswith('phase')))
+	file_size = record.pop('file_size', None)
+	streamed = record.pop('streamed', False)
+	if file_size is not None:
+		parse_count = sum(1 for stage in stages if stage['name'] == 'parse')
+		record['bytes_read'] = \
+			file_size * (record['phases'] if streamed else parse_count)
+	else:
+		record['bytes_read'] = None
+	wall_time = sum(stage['wall_time'] for stage in stages)
+	rows = record.get('rows')
+	record['rows_per_second'] = rows / wall_time if rows and wall_time else None
+	return record
+
+
+def get_peak_rss():
+	"""
+	:return: int | None
+		the peak resident set size of this process in bytes, if known
+	"""
+	if resource is None:
+		return None
+	peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# kibibytes except on macOS
+	return peak_rss if sys.platform == 'darwin' else peak_rss << 10
+
+
+def stage(name, instance=None):
+	"""
+	:return: context manager
+		RunReport.stage of the active report or, without one, a context that
+		does nothing
+	"""
+	if active is None:
+		return _null_stage()
+	return active.stage(name, instance)
+
+
+@contextlib.contextmanager
+def _null_stage():
+	# like contextlib.nullcontext({}), which needs Python 3.7
+	yield {}
+
+
+def update_instance(name, **values):
+	"""Updates the record of a schema instance in the active report, if any."""
+	if active is not None:
+		active.instance(name).update(values)
@@ -0,0 +1,114 @@
+import math, random
+from itertools import islice, count
+
+
+
+class Sampler(object):
+	"""
+	Draws a seeded random sample from an iterable, either a fixed number of
+	items with reservoir sampling or each item independently with a fixed
+	probability (Bernoulli sampling), both in a single pass. Every pass over
+	the same items draws the same sample, so that a source can be sampled
+	again for each collection phase. The sampled items keep their order.
+	"""
+
+	def __init__(self, size=None, fraction=None, seed=0):
+		"""
+		:param size: int
+			the number of items to draw
+		:param fraction: float
+			the probability of each item to be drawn, if 'size' is None
+		:param seed: int
+		"""
+		assert (size is None) is not (fraction is None)
+		assert size is None or size >= 0
+		assert fraction is None or 0 <= fraction <= 1
+		super().__init__()
+		self.size = size
+		self.fraction = fraction
+		self.seed = seed
+		self.population_size = None
+		self.sample_size = None
+
+
+	def __call__(self, iterable):
+		"""
+		:param iterable: iterable
+		:return: iterable
+			the sampled items of 'iterable'; the population and sample size are
+			recorded once it is exhausted.
+		"""
+		rnd = random.Random(self.seed)
+		# number the items to count them while skipping; 'zip' only draws a
+		# number for an existing item.
+		numbers = count(1)
+		items = zip(iterable, numbers)
+		if self.size is not None:
+			return iter(self.__reservoir(items, numbers, rnd))
+		return self.__bernoulli(items, numbers, rnd)
+
+
+	def __reservoir(self, items, numbers, rnd):
+		"""Li's 'Algorithm L', which skips a geometric number of items at a time"""
+		size = self.size
+		reservoir = list(islice(items, size))
+		if size and len(reservoir) == size:
+			w = math.exp(math.log(_random(rnd)) / size)
+			while True:
+				# 'w' may round to 1 for large samples
+				skip = (
+					math.floor(math.log(_random(rnd)) / math.log1p(-w)) if w < 1 else 0)
+				drawn = tuple(islice(items, skip, skip + 1))
+				if not drawn:
+					break
+				reservoir[rnd.randrange(size)] = drawn[0]
+				w *= math.exp(math.log(_random(rnd)) / size)
+
+		reservoir.sort(key=_second)
+		self.population_size = next(numbers) - 1
+		self.sample_size = len(reservoir)
+		return [item for item, _ in reservoir]
+
+
+	def __bernoulli(self, items, numbers, rnd):
+		fraction = self.fraction
+		sample_size = 0
+		if fraction >= 1:
+			for item, _ in items:
+				sample_size += 1
+				yield item
+		elif fraction > 0:
+			log_complement = math.log1p(-fraction)
+			while True:
+				skip = math.floor(math.log(_random(rnd)) / log_complement)
+				drawn = tuple(islice(items, skip, skip + 1))
+				if not drawn:
+					break
+				sample_size += 1
+				yield drawn[0][0]
+		else:
+			for _ in items:
+				pass
+
+		self.population_size = next(numbers) - 1
+		self.sample_size = sample_size
+
+
+	def __repr__(self):
+		return '{}(size={!r}, fraction={!r}, seed={!r})'.format(
+			type(self).__name__, self.size, self.fraction, self.seed)
+
+
+
+def _random(rnd):
+	"""
+	:return: float a uniform random number in (0, 1)
+	"""
+	while True:
+		x = rnd.random()
+		if x:
+			return x
+
+
+def _second(pair):
+	return pair[1]
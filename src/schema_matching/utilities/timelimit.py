@@ -21,7 +21,7 @@ class Timelimit(object):
 		if self.seconds > 0:
 			if self.interrupted_flag is not None:
 				raise RuntimeError("Multiple time limits aren't supported")
-			self.interrupted_flag = False
+			type(self).interrupted_flag = False
 			signal.signal(signal.SIGALRM, self.__timeout_handler)
 			if signal.alarm(self.seconds):
 				raise RuntimeError('Who set the alarm before us?!!')
@@ -40,7 +40,7 @@ class Timelimit(object):
 					file=sys.stderr)
 
 		assert self.interrupted_flag is not None or not self.seconds
-		self.interrupted_flag = None
+		type(self).interrupted_flag = None
 
 
 	@classmethod
@@ -0,0 +1,331 @@
+import unittest, random, tempfile, os.path, io, contextlib, types, gzip
+from concurrent.futures import ProcessPoolExecutor
+from schema_matching.actions.collect import (
+	collect, collect_all, get_file_chunks, read_file_chunk_rows,
+	read_schema_instance, file_digest, file_digests, file_prefix_digest,
+	COLUMN_CACHE_SUFFIX)
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.rowset import (
+	ColumnarRowset, ChunkedRowset, StreamingRowset)
+from schema_matching.collector.base import ItemCollector
+from schema_matching.collector.plan import can_merge
+from schema_matching.collector.itemcount import ItemCountCollector
+from schema_matching.collector.description.normal import L1, L2
+from schema_matching.utilities.report import RunReport
+from schema_matching.utilities import compression
+
+
+
+class CollectAllTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma')
+		self.rows = [
+			[str(rnd.randint(-5, 50)), rnd.choice(words), format(rnd.random(), '.4f'),
+				rnd.choice(('xy', 'yz'))]
+			for _ in range(80)
+		]
+
+
+	def __collect_results(self, srcs, jobs):
+		return [
+			collector.merged_predecessors.as_str()
+			for collector in collect_all(srcs, L1, jobs)
+		]
+
+
+	def test_collectors(self):
+		expected = self.__collect_results(
+			(MultiphaseCollector(ColumnarRowset(map(list, self.rows))),), 1)
+		result = self.__collect_results(
+			(MultiphaseCollector(ColumnarRowset(map(list, self.rows))),), 3)
+		self.assertEqual(result, expected)
+
+
+	def test_files(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			paths = []
+			for i in range(2):
+				paths.append(os.path.join(tmpdir, '{:d}.csv'.format(i)))
+				with open(paths[-1], 'w') as f:
+					f.writelines(','.join(row) + '\n' for row in self.rows[i::2])
+
+			expected = self.__collect_results([open(path) for path in paths], 1)
+			result = self.__collect_results([open(path) for path in paths], 4)
+			self.assertEqual(result, expected)
+
+
+	def test_sample(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			path = os.path.join(tmpdir, 'rows.csv')
+			with open(path, 'w') as f:
+				f.writelines(','.join(row) + '\n' for row in self.rows)
+
+			results = []
+			for streaming in (False, True):
+				with open(path) as f:
+					collector = read_schema_instance(f, streaming=streaming, sample=20)
+				collector.do_phases(L1.descriptions)
+				item_count = collector.merged_predecessors[0][ItemCountCollector]
+				self.assertEqual(item_count.get_result(), 20)
+				self.assertEqual(item_count.get_population_count(), len(self.rows))
+				results.append(collector.merged_predecessors.as_str())
+			self.assertEqual(results[0], results[1])
+
+
+	def test_report(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			path = os.path.join(tmpdir, 'rows.csv')
+			with open(path, 'w') as f:
+				f.writelines(','.join(row) + '\n' for row in self.rows)
+
+			for jobs in (1, 3):
+				with RunReport() as run_report:
+					collect_all([open(path)], L1, jobs, field_delimiter=',')
+				instance = run_report.as_dict()['instances'][0]
+				self.assertEqual(instance['name'], 'rows.csv')
+				self.assertEqual(instance['rows'], len(self.rows))
+				self.assertEqual(instance['columns'], 4)
+				self.assertEqual(instance['phases'], 3)
+				self.assertEqual(
+					instance['bytes_read'], jobs * os.path.getsize(path))
+				stage_names = set(stage['name'] for stage in instance['stages'])
+				self.assertLessEqual(
+					{'parse', 'phase 1', 'transform 1', 'phase 3'}, stage_names)
+				for stage in instance['stages']:
+					self.assertGreater(stage['tracemalloc_peak'], 0)
+
+
+
+class LengthSumCollector(ItemCollector):
+	"""A collector without 'merge', like those of third-party descriptions"""
+
+	def __init__(self, previous_collector_set=None):
+		super().__init__(previous_collector_set)
+		self.length_sum = 0
+
+
+	def collect(self, item, collector_set):
+		self.length_sum += len(item)
+
+
+	def get_result(self, collector_set=None):
+		return self.length_sum
+
+
+	@staticmethod
+	def result_norm(a, b):
+		return abs(a - b)
+
+
+
+class ChunkedCollectTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma', 'delta', 'Epsilon', 'zeta 7')
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmpdir.name, 'rows.csv')
+		with open(self.path, 'w') as f:
+			for _ in range(300):
+				print(rnd.randint(0, 1000), format(rnd.gauss(5, 2), '.3f'),
+					rnd.choice(words),
+					rnd.randint(0, 9) if rnd.random() < 0.95 else rnd.choice(words),
+					sep=',', file=f)
+
+
+	def tearDown(self):
+		self.tmpdir.cleanup()
+
+
+	def test_chunks(self):
+		chunks = get_file_chunks(self.path, 7)
+		self.assertEqual(len(chunks), 7)
+		self.assertEqual(chunks[0][0], 0)
+		self.assertEqual(chunks[-1][1], os.path.getsize(self.path))
+		with open(self.path) as f:
+			rows = [row for chunk in chunks
+				for row in read_file_chunk_rows(self.path, chunk=chunk)]
+			self.assertEqual(rows, list(read_schema_instance(f).rowset))
+
+
+	def test_results(self):
+		with ProcessPoolExecutor(2) as executor:
+			for description in (L1, L2):
+				with open(self.path) as f:
+					expected = read_schema_instance(f)
+				expected.do_phases(description.descriptions)
+				with open(self.path) as f:
+					chunked = read_schema_instance(f, streaming=True,
+						chunk_executor=executor, chunk_count=3)
+				self.assertIsInstance(chunked.rowset, ChunkedRowset)
+				chunked.do_phases(description.descriptions)
+				self.assertEqual(
+					chunked.merged_predecessors.as_str('.9g'),
+					expected.merged_predecessors.as_str('.9g'))
+
+
+
+class IncrementalCollectTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.random = random.Random(0x5eed)
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmpdir.name, 'rows.csv')
+		self.options = dict(field_delimiter=',', verbose=1,
+			profile_cache=os.path.join(self.tmpdir.name, 'cache'))
+
+
+	def tearDown(self):
+		self.tmpdir.cleanup()
+
+
+	def __append_rows(self, count, make_item):
+		words = ('alpha', 'beta', 'gamma', 'delta', 'zeta 7')
+		with open(self.path, 'a') as f:
+			for _ in range(count):
+				print(self.random.choice(words), make_item(self.random), sep=',',
+					file=f)
+
+
+	def __collect(self, description, **kwargs):
+		stderr = io.StringIO()
+		with open(self.path) as f, contextlib.redirect_stderr(stderr):
+			result = collect(f, description, **dict(self.options, **kwargs))
+		return result.merged_predecessors.as_str('.9g'), stderr.getvalue()
+
+
+	def test_appended_rows(self):
+		make_item = lambda rnd: rnd.choice(('xy', 'yz', 'x z'))
+		self.__append_rows(200, make_item)
+		for description in (L1, L2):
+			self.__collect(description, incremental=True)
+		self.__append_rows(50, make_item)
+		for description in (L1, L2):
+			expected, _ = self.__collect(description, profile_cache=None,
+				streaming=True)
+			result, messages = self.__collect(description, incremental=True)
+			self.assertEqual(result, expected)
+			self.assertEqual(messages, '')
+
+
+	def test_fallback(self):
+		self.__append_rows(200, lambda rnd: rnd.randint(0, 1000))
+		self.__collect(L1, incremental=True)
+		# turns the second column from int to str
+		self.__append_rows(10, lambda rnd: rnd.choice(('xy', 'yz')))
+		expected, _ = self.__collect(L1, profile_cache=None, streaming=True)
+		result, messages = self.__collect(L1, incremental=True)
+		self.assertEqual(result, expected)
+		self.assertIn('out of date', messages)
+
+
+	def test_unmergeable(self):
+		description = types.ModuleType('length_sum')
+		description.descriptions = (LengthSumCollector,)
+		self.__append_rows(20, lambda rnd: rnd.randint(0, 1000))
+		for _ in range(2):
+			expected, _ = self.__collect(description, profile_cache=None)
+			result, messages = self.__collect(description, incremental=True)
+			self.assertEqual(result, expected)
+			self.assertEqual(messages, '')
+			self.__append_rows(5, lambda rnd: rnd.randint(0, 1000))
+
+
+	def test_digests(self):
+		self.__append_rows(300, lambda rnd: rnd.randint(0, 1000))
+		size = os.path.getsize(self.path)
+		with open(self.path) as f:
+			digest = file_digest(f)
+			for prefix_size in (None, 0, 1000, size, size + 1):
+				self.assertEqual(file_digests(f, prefix_size, 256), (digest,
+					None if prefix_size is None or prefix_size > size else
+						file_prefix_digest(self.path, prefix_size)))
+			self.assertEqual(f.read(), open(self.path).read())
+
+
+
+class ColumnCacheTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmpdir.name, 'rows.csv')
+		with open(self.path, 'w') as f:
+			for _ in range(100):
+				print(rnd.randint(0, 1000), format(rnd.gauss(5, 2), '.3f'),
+					rnd.choice(('alpha', 'beta ', 'gämma')), sep=', ', file=f)
+			print('1, 2, 3, 4', file=f)
+
+
+	def tearDown(self):
+		self.tmpdir.cleanup()
+
+
+	def __read(self):
+		with open(self.path, encoding='utf-8') as f:
+			return read_schema_instance(f, column_cache=True)
+
+
+	def test_mapped_columns(self):
+		with open(self.path, encoding='utf-8') as f:
+			expected = read_schema_instance(f)
+		parsed = self.__read()
+		self.assertTrue(os.path.isfile(self.path + COLUMN_CACHE_SUFFIX))
+		mapped = self.__read()
+		self.assertIsInstance(mapped.rowset.columns[0].codes, memoryview)
+		self.assertEqual(list(mapped.rowset), list(expected.rowset))
+		self.assertEqual(mapped.rowset.irregular_rows, [(100, 4)])
+
+		for collector in (expected, parsed, mapped):
+			collector.do_phases(L2.descriptions)
+		self.assertEqual(mapped.merged_predecessors.as_str(),
+			expected.merged_predecessors.as_str())
+
+
+	def test_outdated(self):
+		self.__read()
+		with open(self.path, 'a') as f:
+			print('5, 6.5, delta', file=f)
+		rowset = self.__read().rowset
+		self.assertNotIsInstance(rowset.columns[0].codes, memoryview)
+		self.assertEqual(len(rowset), 102)
+		self.assertIsInstance(self.__read().rowset.columns[0].codes, memoryview)
+
+
+	def test_compressed(self):
+		with open(self.path, encoding='utf-8') as f:
+			expected = list(read_schema_instance(f).rowset)
+		path = self.path + '.gz'
+		with open(self.path, 'rb') as f, gzip.open(path, 'wb') as f_gz:
+			f_gz.write(f.read())
+		with compression.open_file(path, encoding='utf-8') as f:
+			rowset = read_schema_instance(f, column_cache=True).rowset
+		self.assertEqual(list(rowset), expected)
+		self.assertFalse(os.path.exists(path + COLUMN_CACHE_SUFFIX))
+
+
+	def test_damaged(self):
+		with open(self.path, encoding='utf-8') as f:
+			expected = list(read_schema_instance(f).rowset)
+		self.__read()
+		cache_path = self.path + COLUMN_CACHE_SUFFIX
+		with open(cache_path, 'rb') as f:
+			content = f.read()
+		for damaged in (
+			content[:len(content) // 2 + 3], content[:len(content) // 2 // 8 * 8],
+			content[:20], content[:16] + b'[' + content[17:],
+		):
+			with open(cache_path, 'wb') as f:
+				f.write(damaged)
+			rowset = self.__read().rowset
+			self.assertNotIsInstance(rowset.columns[0].codes, memoryview)
+			self.assertEqual(list(rowset), expected)
+			# the column file was rewritten
+			self.assertIsInstance(self.__read().rowset.columns[0].codes, memoryview)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
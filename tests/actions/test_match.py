@@ -0,0 +1,49 @@
+import unittest, random, itertools, operator
+from schema_matching.actions.match import get_ranked_schema_mappings
+
+
+
+class RankedSchemaMappingsTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		self.distance_matrix = [[rnd.random() for _ in range(4)] for _ in range(5)]
+		self.expected = sorted(
+			(sum(self.distance_matrix[i][j] for j, i in enumerate(mapping)), mapping)
+			for mapping in itertools.permutations(range(5), 4))
+
+
+	def __assert_ranked(self, best_match, alternatives, count):
+		ranked = [best_match] + alternatives
+		self.assertEqual(len(ranked), count + 1)
+		self.assertEqual(list(map(operator.itemgetter(1), ranked)),
+			list(map(operator.itemgetter(1), self.expected[:count + 1])))
+		for (norm, _), (expected_norm, _) in zip(ranked, self.expected):
+			self.assertAlmostEqual(norm, expected_norm)
+
+
+	def test_optimal(self):
+		best_match, alternatives = \
+			get_ranked_schema_mappings(self.distance_matrix, self.expected[0], 3)
+		self.assertIs(best_match, self.expected[0])
+		self.__assert_ranked(best_match, alternatives, 3)
+
+
+	def test_suboptimal(self):
+		# e. g. the incumbent of an interrupted search
+		for rank in (1, 2, 10):
+			best_match, alternatives = get_ranked_schema_mappings(
+				self.distance_matrix, self.expected[rank], 3)
+			self.__assert_ranked(best_match, alternatives, 3)
+
+
+	def test_no_alternatives(self):
+		best_match = self.expected[5]
+		self.assertEqual(
+			get_ranked_schema_mappings(self.distance_matrix, best_match, 0),
+			(best_match, []))
+
+
+
+if __name__ == '__main__':
+	unittest.main()
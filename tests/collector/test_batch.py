@@ -0,0 +1,164 @@
+import unittest, random, itertools, collections
+from schema_matching.collector.set import ItemCollectorSet
+from schema_matching.collector.itemcount import ItemCountCollector
+from schema_matching.collector.itemsum import ItemSumCollector
+from schema_matching.collector.minitem import MinItemCollector
+from schema_matching.collector.maxitem import MaxItemCollector
+from schema_matching.collector.lettercount import ItemLetterCountCollector
+from schema_matching.collector.letterfrequency import LetterFrequencyCollector
+from schema_matching.collector.columntype import ColumnTypeItemCollector
+from schema_matching.collector.onlinevariance import (
+	OnlineItemVarianceCollector, OnlineLetterVarianceCollector,
+	OnlineItemStandardDeviationCollector)
+from schema_matching.collector.rows import RowCollector
+from schema_matching.collector.rowset import ColumnarRowset
+
+
+
+class CollectBatchTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.random = random.Random(0x5eed)
+
+
+	def __do_test(self, collectors, items, batch_size=7):
+		expected = ItemCollectorSet(collectors)
+		for item in items:
+			expected.collect(item, expected)
+		expected.set_collected()
+
+		result = ItemCollectorSet(collectors)
+		for i in range(0, len(items), batch_size):
+			result.collect_batch(items[i:i+batch_size], result)
+		result.set_collected()
+
+		# runs of equal items with their lengths
+		runs = [(item, len(tuple(run))) for item, run in itertools.groupby(items)]
+		weighted = ItemCollectorSet(collectors)
+		for i in range(0, len(runs), batch_size):
+			weighted.collect_weighted(*zip(*runs[i:i+batch_size]), weighted)
+		weighted.set_collected()
+
+		for ctype, collector in expected.items():
+			expected_result = collector.get_result(expected)
+			for result_set in (result, weighted):
+				result_result = result_set[ctype].get_result(result_set)
+				if isinstance(expected_result, float):
+					self.assertAlmostEqual(result_result, expected_result)
+				else:
+					self.assertEqual(result_result, expected_result)
+
+
+	def test_numbers(self):
+		items = [self.random.gauss(100, 15) for _ in range(100)]
+		items[5:20] = [items[5]] * 15
+		items[::9] = [None] * len(items[::9])
+		items[::13] = [float('nan')] * len(items[::13])
+		self.__do_test((ItemCountCollector, ItemSumCollector, MinItemCollector,
+			MaxItemCollector, OnlineItemVarianceCollector), items)
+
+
+	def test_strings(self):
+		items = [
+			''.join(self.random.choice('abcxyz ') for _ in range(self.random.randint(0, 12)))
+			for _ in range(100)
+		]
+		self.__do_test((ItemCountCollector, ItemLetterCountCollector,
+			LetterFrequencyCollector, OnlineLetterVarianceCollector,
+			ColumnTypeItemCollector), items)
+
+
+	def test_column_types(self):
+		for items, item_count in (
+			(['12', '-', '3'] * 5, None),
+			(['1', '2.5', '-3,25', '+7.', '4'] * 4, None),
+			(['1', '2.5', '3.5x', '4.25'] * 6, None),
+			(['1', '2.5', '3.5x', '4.25'] * 6, 24),
+			(['1', '2.5', '3.5x', '4.25'] * 6, 20),
+			(['1', '2.5', '3.5x', '4.25', 'abc', '5'] * 3, 18),
+			(['\u00b9', '2'], None),
+			(['-'] * 5 + ['7'], None),
+		):
+			collector_set = item_count and {ItemCountCollector: ItemCountCollector(item_count)}
+			expected = ColumnTypeItemCollector(collector_set, total_max_invalid=0.25)
+			for item in items:
+				expected.collect(item)
+			expected.set_collected()
+			for batch_size in (1, 3, 7, len(items)):
+				result = ColumnTypeItemCollector(collector_set, total_max_invalid=0.25)
+				for i in range(0, len(items), batch_size):
+					result.collect_batch(items[i:i+batch_size])
+				result.set_collected()
+				self.assertEqual(result.as_str(), expected.as_str(), (items, batch_size))
+
+			# the distinct items in the order of their first occurrence
+			result = ColumnTypeItemCollector(collector_set, total_max_invalid=0.25)
+			result.collect_weighted(*zip(*collections.Counter(items).items()))
+			result.set_collected()
+			self.assertIs(result.get_result(), expected.get_result(), items)
+
+		# missing numbers alone don't make a column numeric
+		result = ColumnTypeItemCollector()
+		result.collect_batch(['-'] * 5)
+		result.set_collected()
+		self.assertIs(result.get_result(), str)
+
+
+	def test_rows(self):
+		rows = [
+			[self.random.randint(0, 50), 'x' * self.random.randint(1, 9)]
+			for _ in range(300)
+		]
+		collectors = ((ItemCountCollector, ItemSumCollector),
+			(ItemCountCollector, LetterFrequencyCollector))
+
+		expected = RowCollector(map(ItemCollectorSet, collectors))
+		for row in rows:
+			expected.collect(row)
+		for collector_set in expected:
+			collector_set.set_collected()
+		result = RowCollector(map(ItemCollectorSet, collectors))
+		result.collect_all(rows, 16)
+		self.assertEqual(result.as_str(), expected.as_str())
+
+		for rowset in (rows, ColumnarRowset(rows)):
+			result = RowCollector(map(ItemCollectorSet, collectors))
+			result.count_batch_size = 100
+			result.collect_all(rowset, 16, deduplicate=True)
+			for expected_set, result_set in zip(expected, result):
+				self.assertEqual(
+					list(map(str, result_set.get_result())),
+					list(map(str, expected_set.get_result())))
+
+
+
+class CollectMethodsTestCase(unittest.TestCase):
+
+	class CountingColumnTypeCollector(ColumnTypeItemCollector):
+
+		batch_count = 0
+
+		def collect_batch(self, items, collector_set=None):
+			type(self).batch_count += 1
+			super().collect_batch(items, collector_set)
+
+
+	def test_collect_methods(self):
+		collector_set = ItemCollectorSet(
+			(ItemCountCollector(10), OnlineItemStandardDeviationCollector))
+		self.assertEqual(
+			[method.__self__ for method in collector_set.get_collect_methods()],
+			[collector_set[OnlineItemVarianceCollector]])
+
+
+	def test_saturation(self):
+		collector_type = self.CountingColumnTypeCollector
+		rows = [['1'], ['2'], ['x']] + [['3']] * 20
+		collector = RowCollector((ItemCollectorSet((collector_type,)),))
+		collector.collect_all(rows, 2)
+		self.assertEqual(collector_type.batch_count, 2)
+		self.assertIs(collector[0][collector_type].get_result(), str)
+
+
+if __name__ == '__main__':
+	unittest.main()
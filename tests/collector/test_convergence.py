@@ -0,0 +1,76 @@
+import unittest, random
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.rowset import ColumnarRowset
+from schema_matching.collector.convergence import ConvergenceCheck, StridedOrder
+from schema_matching.collector.itemcount import ItemCountCollector
+from schema_matching.collector.onlinevariance import OnlineItemVarianceCollector
+from schema_matching.collector.description.normal import L1
+
+
+
+class ConvergenceCheckTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma', 'delta')
+		# sorted by the first column, whose average a prefix would get wrong
+		self.rows = [
+			[str(i), format(rnd.gauss(5, 2), '.3f'), rnd.choice(words)]
+			for i in range(20000)]
+
+
+	def test_strided_order(self):
+		for count in (0, 1, 2, 10, 12, 1000):
+			order = StridedOrder(count)
+			self.assertEqual(sorted(order), list(range(count)))
+			self.assertEqual(order[:], list(order))
+		# any prefix spreads over all rows
+		self.assertGreaterEqual(
+			len(set(index // 100 for index in StridedOrder(1000)[:10])), 8)
+
+
+	def test_early_termination(self):
+		convergence = ConvergenceCheck(0.01, 500)
+		collector = MultiphaseCollector(
+			ColumnarRowset(self.rows), convergence=convergence)
+		collector.do_phases(L1.descriptions)
+
+		row_count = convergence.row_count
+		self.assertLess(row_count, len(self.rows))
+		self.assertEqual(len(collector.rowset), row_count)
+		for collector_set in collector.merged_predecessors:
+			item_count = collector_set[ItemCountCollector]
+			self.assertEqual(item_count.count, row_count)
+			self.assertEqual(item_count.get_population_count(), len(self.rows))
+
+		variance = collector.merged_predecessors[0][OnlineItemVarianceCollector]
+		self.assertEqual(variance.count, row_count)
+		self.assertAlmostEqual(variance.mean / (len(self.rows) - 1), 0.5, delta=0.01)
+
+
+	def test_no_termination(self):
+		rows = self.rows[:1000]
+		results = []
+		# rows in lists are transformed in place
+		for rowset in (ColumnarRowset(rows), [row[:] for row in rows]):
+			convergence = ConvergenceCheck(0, 100)
+			collector = MultiphaseCollector(rowset, convergence=convergence)
+			collector.do_phases(L1.descriptions)
+			self.assertFalse(convergence.has_stopped)
+			results.append(
+				[collector_set[OnlineItemVarianceCollector].get_estimate()
+					for collector_set in collector.merged_predecessors[:2]])
+
+		expected = MultiphaseCollector(ColumnarRowset(rows))
+		expected.do_phases(L1.descriptions)
+		for estimates in results:
+			for estimate, collector_set in zip(estimates, expected.merged_predecessors):
+				expected_estimate = \
+					collector_set[OnlineItemVarianceCollector].get_estimate()
+				for value, expected_value in zip(estimate, expected_estimate):
+					self.assertAlmostEqual(value, expected_value)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,99 @@
+import unittest, random
+from schema_matching.collector.set import ItemCollectorSet
+from schema_matching.collector.itemcount import ItemCountCollector
+from schema_matching.collector.itemsum import ItemSumCollector
+from schema_matching.collector.minitem import MinItemCollector
+from schema_matching.collector.maxitem import MaxItemCollector
+from schema_matching.collector.lettercount import ItemLetterCountCollector
+from schema_matching.collector.letterfrequency import LetterFrequencyCollector
+from schema_matching.collector.itemfrequency import ItemFrequencyCollector
+from schema_matching.collector.columntype import ColumnTypeItemCollector
+from schema_matching.collector.onlinevariance import (
+	OnlineItemVarianceCollector, OnlineLetterVarianceCollector)
+from schema_matching.utilities.distribution import UniformBinDistributionTable
+
+
+
+class MergeTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.random = random.Random(0x5eed)
+
+
+	def __do_test(self, collectors, items, chunk_sizes=(1, 5, 17)):
+		expected = ItemCollectorSet(collectors)
+		expected.collect_batch(items, expected)
+		expected.set_collected()
+
+		for chunk_size in chunk_sizes:
+			result = ItemCollectorSet(collectors)
+			for i in range(0, len(items), chunk_size):
+				chunk = ItemCollectorSet(collectors)
+				chunk.collect_batch(items[i:i+chunk_size], chunk)
+				chunk.set_collected()
+				result.merge(chunk)
+			result.set_collected()
+
+			for ctype, collector in expected.items():
+				expected_result = collector.get_result(expected)
+				result_result = result[ctype].get_result(result)
+				if isinstance(expected_result, float):
+					self.assertAlmostEqual(result_result, expected_result)
+				else:
+					self.assertEqual(result_result, expected_result)
+			self.assertEqual(result.as_str(None, '.9g'), expected.as_str(None, '.9g'))
+
+
+	def test_numbers(self):
+		items = [self.random.randint(-50, 50) for _ in range(100)]
+		items[::9] = [None] * len(items[::9])
+		self.__do_test((ItemCountCollector, ItemSumCollector, MinItemCollector,
+			MaxItemCollector, OnlineItemVarianceCollector), items)
+
+
+	def test_strings(self):
+		items = [
+			''.join(self.random.choice('abcxyz ') for _ in range(self.random.randint(0, 12)))
+			for _ in range(100)
+		]
+		self.__do_test((ItemCountCollector, ItemLetterCountCollector,
+			LetterFrequencyCollector, OnlineLetterVarianceCollector), items)
+
+
+	def test_column_types(self):
+		for items in (
+			['12', '-', '3'] * 5,
+			['1', '2.5', '-3,25', '4'] * 5,
+			['1', '2.5', '3.5x', '4.25'] * 6,
+			['1', '²', '3.5x', '4', 'abc', '5'] * 3,
+			['1', '2', '²', '2.5'],
+			['2.5', '1', '²', '3'],
+		):
+			self.__do_test((ColumnTypeItemCollector,), items)
+
+
+	def test_uniform_bins(self):
+		items = [self.random.gauss(0, 10) for _ in range(100)]
+		predecessor = ItemCollectorSet((ItemCountCollector(len(items)),
+			MinItemCollector, MaxItemCollector, OnlineItemVarianceCollector))
+		predecessor.collect_batch(items, predecessor)
+		predecessor[ColumnTypeItemCollector] = ColumnTypeItemCollector()
+		predecessor[ColumnTypeItemCollector].collect('1.5')
+		predecessor.set_collected()
+
+		expected = ItemFrequencyCollector(predecessor)
+		expected.collect_batch(items)
+		result = ItemFrequencyCollector(predecessor)
+		for i in range(0, len(items), 30):
+			chunk = ItemFrequencyCollector(predecessor)
+			chunk.collect_batch(items[i:i+30])
+			result.merge(chunk)
+		self.assertEqual(list(result.get_result()), list(expected.get_result()))
+
+		self.assertRaises(ValueError, UniformBinDistributionTable(0, 10, 5).merge,
+			UniformBinDistributionTable(0, 10, 4))
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,66 @@
+import unittest, random
+from schema_matching.collector.set import ItemCollectorSet
+from schema_matching.collector.itemcount import ItemCountCollector
+from schema_matching.collector.itemaverage import ItemAverageCollector
+from schema_matching.collector.letteraverage import ItemLetterAverageCollector
+from schema_matching.collector.variance import (
+	ItemVarianceCollector, ItemVariationCoefficientCollector)
+from schema_matching.collector.lettervariance import (
+	LetterVarianceCollector, LetterVariationCoefficient)
+from schema_matching.collector.onlinevariance import (
+	OnlineItemVarianceCollector, OnlineItemVariationCoefficientCollector,
+	OnlineLetterVarianceCollector, OnlineLetterVariationCoefficient)
+
+
+
+class OnlineVarianceTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.random = random.Random(0x5eed)
+
+
+	@staticmethod
+	def __collect(collectors, items, predecessor=None):
+		collector_set = ItemCollectorSet(collectors, predecessor)
+		for item in items:
+			collector_set.collect(item, collector_set)
+		collector_set.set_collected()
+		return collector_set
+
+
+	def __do_test(self, items, average, variance, coefficient,
+		online_variance, online_coefficient
+	):
+		first_pass = self.__collect((ItemCountCollector, average), items)
+		two_pass = self.__collect((variance, coefficient), items, first_pass)
+		one_pass = self.__collect(
+			(ItemCountCollector, online_variance, online_coefficient), items)
+		for expected, result in (
+			(variance, online_variance), (coefficient, online_coefficient)
+		):
+			self.assertAlmostEqual(
+				two_pass[expected].get_result(two_pass),
+				one_pass[result].get_result(one_pass))
+
+
+	def test_items(self):
+		items = [self.random.gauss(1e4, 30) for _ in range(500)]
+		items[::7] = [float('nan')] * len(items[::7])
+		items[::11] = [None] * len(items[::11])
+		self.__do_test(items,
+			ItemAverageCollector, ItemVarianceCollector,
+			ItemVariationCoefficientCollector, OnlineItemVarianceCollector,
+			OnlineItemVariationCoefficientCollector)
+
+
+	def test_letters(self):
+		items = ['x' * self.random.randint(0, 40) for _ in range(500)]
+		self.__do_test(items,
+			ItemLetterAverageCollector, LetterVarianceCollector,
+			LetterVariationCoefficient, OnlineLetterVarianceCollector,
+			OnlineLetterVariationCoefficient)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector import plan
+from schema_matching.collector.columntype import ColumnTypeItemCollector
+from schema_matching.collector.onlinevariance import OnlineItemVarianceCollector
+from schema_matching.collector.itemprobability import ItemProbabilityCollector
+from schema_matching.collector.letterprobability import LetterProbablilityCollector
+from schema_matching.collector.description.normal import L1
+
+
+
+class CollectionPlanTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.rows = [[str(i), 'abc' * (i % 4), str(i * 0.5)] for i in range(20)]
+
+
+	def test_passes(self):
+		collector = MultiphaseCollector(self.rows)
+		plan = collector.get_plan(L1.descriptions)
+		self.assertTrue(plan.is_partial)
+		self.assertEqual(len(plan), 1)
+		for column_description in plan.passes[0]:
+			self.assertEqual(tuple(column_description), (ColumnTypeItemCollector,))
+
+		self.assertEqual(collector.do_phases(L1.descriptions), 3)
+		self.assertIn(OnlineItemVarianceCollector, collector.merged_predecessors[0])
+		self.assertIn(ItemProbabilityCollector, collector.merged_predecessors[2])
+		self.assertIn(LetterProbablilityCollector, collector.merged_predecessors[1])
+
+
+	def test_cache(self):
+		a = MultiphaseCollector(self.rows)
+		b = MultiphaseCollector([row[:] for row in self.rows[:10]])
+		self.assertIs(a.get_plan(L1.descriptions), b.get_plan(L1.descriptions))
+
+		# the cache is bounded
+		cached_plan = a.get_plan(L1.descriptions)
+		for size in range(plan.plan_cache_size):
+			MultiphaseCollector([['1'] * (size + 4)]).get_plan(L1.descriptions)
+		self.assertIsNot(a.get_plan(L1.descriptions), cached_plan)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from schema_matching.collector import profiling
+from schema_matching.collector.base import ItemCollector
+from schema_matching.collector.rows import RowCollector
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.columntype import ColumnTypeItemCollector
+from schema_matching.collector.lettercount import ItemLetterCountCollector
+from schema_matching.collector.description import default as default_description
+
+
+
+class CollectorProfilerTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.rows = [[str(i), 'abc' * (i % 4), str(i * 0.5)] for i in range(50)]
+		self.originals = (
+			ColumnTypeItemCollector.collect, ItemLetterCountCollector.collect_batch,
+			ItemCollector.result_norm, RowCollector.transform_all)
+
+
+	def test_counters(self):
+		a = MultiphaseCollector([row[:] for row in self.rows])
+		b = MultiphaseCollector([row[:] for row in self.rows])
+		with profiling.CollectorProfiler() as profiler:
+			self.assertIs(profiling.active, profiler)
+			a.do_phases(default_description.descriptions)
+			b.do_phases(default_description.descriptions)
+			a.results_norms(b, default_description.weights, 'python')
+		self.assertIsNone(profiling.active)
+		self.assertEqual(self.originals, (
+			ColumnTypeItemCollector.collect, ItemLetterCountCollector.collect_batch,
+			ItemCollector.result_norm, RowCollector.transform_all))
+
+		counters = profiler.counters
+		# every item of every column in the first phase of both instances
+		self.assertEqual(
+			counters[('ColumnTypeItemCollector', 1, 'collect')][0], 2 * 3 * 50)
+		self.assertEqual(counters[('RowCollector', None, 'results_norms')][0], 1)
+		self.assertIn(('RowCollector', 1, 'transform_all'), counters)
+		self.assertTrue(any(
+			phase is None and method == 'get_result'
+			for _, phase, method in counters))
+		for calls, wall_time, cpu_time in counters.values():
+			self.assertGreater(calls, 0)
+			self.assertGreaterEqual(wall_time, 0)
+			self.assertGreaterEqual(cpu_time, 0)
+
+
+	def test_merge(self):
+		profiler = profiling.CollectorProfiler()
+		profiler.add('A', 'collect', 3, 1.0, 0.5)
+		profiler.merge({('A', None, 'collect'): [2, 0.5, 0.25],
+			('B', 1, 'get_result'): [1, 0.1, 0.1]})
+		self.assertEqual(profiler.counters, {
+			('A', None, 'collect'): [5, 1.5, 0.75],
+			('B', 1, 'get_result'): [1, 0.1, 0.1]})
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,114 @@
+import unittest, random, copy
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.rowset import StreamingRowset, ColumnarRowset
+from schema_matching.collector.description.normal import L1, L2
+
+
+
+class StreamingRowsetTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma', 'delta', 'Epsilon', 'zeta 7')
+		self.rows = [
+			[
+				str(rnd.randint(0, 1000)),
+				format(rnd.gauss(5, 2), '.3f'),
+				rnd.choice(words),
+				# mostly, but not always, numeric
+				str(rnd.randint(0, 9)) if rnd.random() < 0.9 else rnd.choice(words),
+			]
+			for _ in range(60)
+		]
+		self.read_count = 0
+
+
+	def __read_rows(self):
+		self.read_count += 1
+		return map(list, self.rows)
+
+
+	def test_transformers(self):
+		rowset = StreamingRowset(self.__read_rows)
+		rowset.add_transformer(lambda row: row.__setitem__(0, int(row[0])))
+		self.assertEqual(rowset.columncount(), 4)
+		self.assertEqual([row[0] for row in rowset],
+			[int(row[0]) for row in self.rows])
+		self.assertIsInstance(self.rows[0][0], str)
+
+
+	def test_results(self):
+		for description in (L1, L2):
+			expected = MultiphaseCollector(copy.deepcopy(self.rows), 'memory')
+			expected.do_phases(description.descriptions)
+			self.read_count = 0
+			streaming = MultiphaseCollector(
+				StreamingRowset(self.__read_rows), 'streaming')
+			phase_count = streaming.do_phases(description.descriptions)
+			self.assertEqual(self.read_count, phase_count + 1)
+			self.assertEqual(
+				streaming.merged_predecessors.as_str(),
+				expected.merged_predecessors.as_str())
+			self.assertEqual(
+				expected.results_norms(expected, description.weights, 'python'),
+				streaming.results_norms(expected, description.weights, 'python'))
+
+
+
+class ColumnarRowsetTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma')
+		self.rows = [
+			[str(rnd.randint(-5, 5)), rnd.choice(words), format(rnd.random(), '.4f'),
+				rnd.choice(('xy', 'yz'))]
+			for _ in range(50)
+		]
+		self.rows[7][0] = 'n/a'
+		self.rows[9].append('surplus')
+
+
+	def test_rows(self):
+		for batch_size in (4, 4096):
+			rowset = ColumnarRowset(map(list, self.rows), batch_size=batch_size)
+			self.assertEqual(len(rowset), len(self.rows))
+			self.assertEqual(rowset.columncount(), 4)
+			self.assertEqual(rowset.irregular_rows, [(9, 5)])
+			self.assertEqual(list(rowset), [row[:4] for row in self.rows])
+		self.assertRaises(ValueError, ColumnarRowset, [['a', 'b'], ['c']])
+
+
+	def test_normalize(self):
+		rows = [[' a', 'x'], ['a ', 'y '], ['b', 'x'], ['a', ' y']]
+		rowset = ColumnarRowset(rows, str.strip, 3)
+		self.assertEqual(list(rowset), [[item.strip() for item in row] for row in rows])
+		self.assertEqual(rowset.columns[0].values, ['a', 'b'])
+
+
+	def test_transform(self):
+		rowset = ColumnarRowset(map(list, self.rows))
+		rowset.transform_columns((
+			(0, lambda item: int(item) if item.lstrip('-').isdigit() else None),
+			(2, float)))
+		column0, column1, column2, _ = next(rowset.column_batches(len(rowset)))
+		self.assertIsNone(column0[7])
+		self.assertEqual(column0[8], int(self.rows[8][0]))
+		self.assertEqual(column1, [row[1] for row in self.rows])
+		self.assertEqual(column2, [float(row[2]) for row in self.rows])
+
+
+	def test_results(self):
+		for description in (L1, L2):
+			expected = MultiphaseCollector(copy.deepcopy(self.rows))
+			expected.do_phases(description.descriptions)
+			columnar = MultiphaseCollector(ColumnarRowset(map(list, self.rows)))
+			columnar.do_phases(description.descriptions)
+			self.assertEqual(
+				columnar.merged_predecessors.as_str(),
+				expected.merged_predecessors.as_str())
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,57 @@
+import unittest, random, math
+from schema_matching.collector import vectorized
+from schema_matching.collector.multiphase import MultiphaseCollector
+from schema_matching.collector.description.normal import L1, L2
+
+
+
+@unittest.skipUnless(vectorized.available(), 'requires NumPy')
+class VectorizedResultsNormsTestCase(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(0x5eed)
+		words = ('alpha', 'beta', 'gamma', 'delta', 'Epsilon', 'zeta 7')
+
+		def make_rows(count):
+			return [
+				[
+					str(rnd.randint(0, 1000)),
+					format(rnd.gauss(5, 2), '.3f'),
+					rnd.choice(words),
+					'{}-{:02d}'.format(rnd.choice(words), rnd.randint(0, 99)),
+				]
+				for _ in range(count)
+			]
+
+		self.collectors = (
+			MultiphaseCollector(make_rows(50), 'a'),
+			MultiphaseCollector(make_rows(80), 'b'))
+
+
+	def __do_test(self, description):
+		for collector in self.collectors:
+			collector.reset(None).do_phases(description.descriptions)
+		a, b = self.collectors
+		expected = a.results_norms(b, description.weights, 'python')
+		result = a.results_norms(b, description.weights, 'numpy')
+		self.assertEqual(len(result), len(expected))
+		for expected_row, row in zip(expected, result):
+			self.assertEqual(len(row), len(expected_row))
+			for expected_norm, norm in zip(expected_row, row):
+				if math.isnan(expected_norm):
+					self.assertTrue(math.isnan(norm))
+				else:
+					self.assertAlmostEqual(norm, expected_norm)
+
+
+	def test_L1(self):
+		self.__do_test(L1)
+
+
+	def test_L2(self):
+		self.__do_test(L2)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,173 @@
+import unittest, random, itertools, operator
+from utilities import infinity
+from utilities.timelimit import Timelimit
+from utilities.assignment import (
+	min_cost_assignment, min_cost_column_assignment,
+	branch_and_bound_column_assignment, exhaustive_column_assignment,
+	ranked_column_assignments, connected_components,
+	decomposed_column_assignment)
+
+
+
+class ColumnAssignmentTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.random = random.Random(0x5eed)
+
+
+	def __random_matrix(self, rows, columns, forbidden=0):
+		return [
+			[
+					None
+				if self.random.random() < forbidden else
+					self.random.random()
+				for _ in range(columns)
+			]
+			for _ in range(rows)
+		]
+
+
+	def __assert_valid(self, distance_matrix, result):
+		norm, mapping = result
+		self.assertEqual(len(mapping), len(distance_matrix[0]))
+		self.assertEqual(len(set(mapping)), len(mapping))
+		self.assertAlmostEqual(norm,
+			sum(distance_matrix[i][j] for j, i in enumerate(mapping)))
+
+
+	def __do_test(self, distance_matrix):
+		expected = exhaustive_column_assignment(distance_matrix)
+		for search in (min_cost_column_assignment,
+			branch_and_bound_column_assignment
+		):
+			result = search(distance_matrix)
+			if expected[1] is None:
+				self.assertEqual(result, (infinity, None))
+			else:
+				self.__assert_valid(distance_matrix, result)
+				self.assertAlmostEqual(result[0], expected[0])
+
+
+	def test_square(self):
+		for n in range(1, 7):
+			self.__do_test(self.__random_matrix(n, n))
+
+
+	def test_rectangular(self):
+		for m in range(1, 6):
+			for n in range(m, 8):
+				self.__do_test(self.__random_matrix(n, m))
+
+
+	def test_forbidden(self):
+		for _ in range(20):
+			self.__do_test(self.__random_matrix(6, 4, 0.4))
+
+
+	def test_infinity(self):
+		distance_matrix = [
+			[0.5, infinity],
+			[infinity, 0.25],
+			[0.125, infinity],
+		]
+		self.assertEqual(
+			min_cost_column_assignment(distance_matrix), (0.375, (2, 1)))
+
+
+	def test_infeasible(self):
+		distance_matrix = [[None, 1], [infinity, 2]]
+		self.assertEqual(
+			min_cost_column_assignment(distance_matrix), (infinity, None))
+		self.assertEqual(
+			exhaustive_column_assignment(distance_matrix)[1], None)
+
+
+	def test_interrupted_branch_and_bound(self):
+		distance_matrix = self.__random_matrix(12, 10)
+		optimum = min_cost_column_assignment(distance_matrix)[0]
+		stats = dict()
+		Timelimit.interrupted_flag = True
+		try:
+			result = branch_and_bound_column_assignment(distance_matrix, stats)
+		finally:
+			Timelimit.interrupted_flag = None
+		self.assertTrue(stats['interrupted'])
+		self.__assert_valid(distance_matrix, result)
+		self.assertLessEqual(stats['lower_bound'], optimum)
+		self.assertLessEqual(optimum, result[0])
+
+
+	def test_ranked(self):
+		distance_matrix = self.__random_matrix(5, 4, 0.2)
+		expected = sorted(
+			sum(distance_matrix[i][j] for j, i in enumerate(mapping))
+			for mapping in itertools.permutations(range(5), 4)
+			if all(distance_matrix[i][j] is not None
+				for j, i in enumerate(mapping)))
+		ranked = tuple(ranked_column_assignments(distance_matrix))
+		self.assertEqual(len(ranked), len(expected))
+		self.assertEqual(len(set(map(operator.itemgetter(1), ranked))), len(ranked))
+		for (norm, mapping), expected_norm in zip(ranked, expected):
+			self.__assert_valid(distance_matrix, (norm, mapping))
+			self.assertAlmostEqual(norm, expected_norm)
+
+
+	def test_decomposed(self):
+		distance_matrix = self.__random_matrix(7, 5)
+		for i, row in enumerate(distance_matrix):
+			for j in range(len(row)):
+				if (i < 4) is not (j < 3):
+					row[j] = infinity
+		self.assertEqual(tuple(connected_components(distance_matrix)),
+			(((0, 1, 2, 3), (0, 1, 2)), ((4, 5, 6), (3, 4))))
+
+		expected = exhaustive_column_assignment(distance_matrix)
+		for search in (min_cost_column_assignment,
+			branch_and_bound_column_assignment
+		):
+			stats = dict()
+			result = decomposed_column_assignment(distance_matrix, search, stats)
+			self.__assert_valid(distance_matrix, result)
+			self.assertAlmostEqual(result[0], expected[0])
+			self.assertEqual(stats['components'], 2)
+
+
+	def test_decomposed_map_blocks(self):
+		# blocks of 10, 9 and 2 columns
+		block_bounds = (0, 10, 19, 21)
+		distance_matrix = self.__random_matrix(21, 21)
+		for i, row in enumerate(distance_matrix):
+			for j in range(len(row)):
+				if any((i < bound) is not (j < bound) for bound in block_bounds):
+					row[j] = infinity
+
+		mapped_blocks = []
+		def map_blocks(fn, blocks, *args):
+			blocks = list(blocks)
+			mapped_blocks.extend(map(len, blocks))
+			return map(fn, blocks, *args)
+
+		self.assertEqual(
+			decomposed_column_assignment(distance_matrix, map_blocks=map_blocks),
+			decomposed_column_assignment(distance_matrix))
+		self.assertEqual(mapped_blocks, [10, 9])
+
+
+	def test_decomposed_unmapped(self):
+		distance_matrix = [[1, None, 4], [2, None, 3], [None, 5, None]]
+		self.assertEqual(decomposed_column_assignment(distance_matrix),
+			(9, (0, 2, 1)))
+		distance_matrix = [[1, 2, None], [None, None, 3]]
+		self.assertEqual(decomposed_column_assignment(distance_matrix + [[None] * 3]),
+			(4, (0, None, 1)))
+
+
+	def test_more_rows_than_columns(self):
+		norm, assignment = min_cost_assignment([[3, 1], [1, 3], [5, 5]])
+		self.assertEqual(norm, 2)
+		self.assertEqual(assignment, (1, 0, None))
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,48 @@
+import unittest, tempfile, os
+from utilities.cache import LRUDirectoryCache
+
+
+
+class LRUDirectoryCacheTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.cache = LRUDirectoryCache(os.path.join(self.tmpdir.name, 'cache'))
+
+
+	def tearDown(self):
+		self.tmpdir.cleanup()
+
+
+	def test_roundtrip(self):
+		self.assertIsNone(self.cache.get('a'))
+		self.cache['a'] = [1, 2.5, 'x']
+		self.assertIn('a', self.cache)
+		self.assertEqual(self.cache.get('a'), [1, 2.5, 'x'])
+		self.cache.discard('a')
+		self.assertNotIn('a', self.cache)
+
+
+	def test_evict(self):
+		for i, key in enumerate('abc'):
+			self.cache[key] = bytes(1000)
+			os.utime(os.path.join(self.cache.path, key + self.cache.suffix),
+				(i, i))
+		self.cache.get('a')
+		self.assertEqual(self.cache.evict(2500), 1)
+		self.assertIn('a', self.cache)
+		self.assertNotIn('b', self.cache)
+		self.assertIn('c', self.cache)
+
+
+	def test_corrupt(self):
+		self.cache['a'] = 1
+		with open(os.path.join(self.cache.path, 'a' + self.cache.suffix), 'wb') as f:
+			f.write(b'garbage')
+		self.assertEqual(self.cache.get('a', 0), 0)
+		self.assertNotIn('a', self.cache)
+
+
+
+if __name__ == '__main__':
+	unittest.main()
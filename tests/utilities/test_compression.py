@@ -0,0 +1,77 @@
+import unittest, tempfile, os.path, io, gzip, bz2, lzma
+from utilities import compression
+
+
+
+class OpenFileTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.content = ''.join(
+			'{:d};wört {:d};{:f}\n'.format(i, i % 7, i / 3) for i in range(5000))
+
+
+	def tearDown(self):
+		self.tmpdir.cleanup()
+
+
+	def test_formats(self):
+		for module, suffix in ((gzip, '.gz'), (bz2, '.bz2'), (lzma, '.xz')):
+			# the suffix doesn't matter
+			path = os.path.join(self.tmpdir.name, 'rows' + suffix + '.bin')
+			with module.open(path, 'wt', encoding='utf-8') as f:
+				f.write(self.content)
+			self.assertIs(compression.detect_compression(path), module)
+			with compression.open_file(path, encoding='utf-8', block_size=1000) as f:
+				self.assertEqual(f.compression, module.__name__)
+				self.assertEqual(f.name, path)
+				self.assertEqual(f.read(), self.content)
+
+		path = os.path.join(self.tmpdir.name, 'rows.csv')
+		with open(path, 'w', encoding='utf-8') as f:
+			f.write(self.content)
+		self.assertIsNone(compression.detect_compression(path))
+		with compression.open_file(path, encoding='utf-8') as f:
+			self.assertFalse(hasattr(f, 'compression'))
+			self.assertEqual(f.read(), self.content)
+
+
+	def test_streams(self):
+		content = self.content.encode('utf-8')
+		for module in (gzip, bz2, lzma, None):
+			data = content if module is None else module.compress(content)
+			stream = io.BufferedReader(io.BytesIO(data))
+			self.assertIs(compression.detect_stream_compression(stream), module)
+			with compression.open_stream(stream, encoding='utf-8') as f:
+				self.assertEqual(getattr(f, 'compression', None),
+					module and module.__name__)
+				self.assertEqual(f.read(), self.content)
+
+
+	def test_early_close(self):
+		path = os.path.join(self.tmpdir.name, 'rows.csv.gz')
+		with gzip.open(path, 'wt', encoding='utf-8') as f:
+			f.write(self.content)
+		with compression.open_file(path, encoding='utf-8', block_size=100,
+			queue_size=2
+		) as f:
+			self.assertEqual(f.readline(), self.content[:self.content.index('\n') + 1])
+
+
+	def test_corrupt(self):
+		path = os.path.join(self.tmpdir.name, 'rows.csv.gz')
+		with open(path, 'wb') as f:
+			f.write(gzip.compress(self.content.encode())[:-100])
+		with compression.open_file(path) as f:
+			self.assertRaises(EOFError, f.read)
+
+
+	def test_strip_suffix(self):
+		self.assertEqual(compression.strip_suffix('a/b.csv.gz'), 'a/b.csv')
+		self.assertEqual(compression.strip_suffix('a/b.csv.xz'), 'a/b.csv')
+		self.assertEqual(compression.strip_suffix('a/b.csv'), 'a/b.csv')
+
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,46 @@
+import unittest, collections
+from utilities.sampling import Sampler
+
+
+
+class SamplerTestCase(unittest.TestCase):
+
+	def test_reservoir(self):
+		sampler = Sampler(size=100, seed=3)
+		sample = list(sampler(iter(range(10000))))
+		self.assertEqual(len(sample), 100)
+		self.assertEqual(sample, sorted(set(sample)))
+		self.assertEqual((sampler.population_size, sampler.sample_size), (10000, 100))
+		# every pass draws the same sample
+		self.assertEqual(list(sampler(range(10000))), sample)
+
+		self.assertEqual(list(sampler(range(5))), list(range(5)))
+		self.assertEqual((sampler.population_size, sampler.sample_size), (5, 5))
+
+
+	def test_bernoulli(self):
+		sampler = Sampler(fraction=0.1, seed=3)
+		sample = list(sampler(iter(range(10000))))
+		self.assertEqual(sample, sorted(set(sample)))
+		self.assertEqual(sampler.population_size, 10000)
+		self.assertEqual(sampler.sample_size, len(sample))
+		self.assertAlmostEqual(len(sample) / 10000, 0.1, delta=0.02)
+		self.assertEqual(list(sampler(range(10000))), sample)
+
+		sampler = Sampler(fraction=1)
+		self.assertEqual(list(sampler(range(7))), list(range(7)))
+		self.assertEqual((sampler.population_size, sampler.sample_size), (7, 7))
+
+
+	def test_uniformity(self):
+		for sampler_args in ({'size': 3}, {'fraction': 0.3}):
+			counts = collections.Counter()
+			for seed in range(2000):
+				counts.update(Sampler(seed=seed, **sampler_args)(range(10)))
+			for item in range(10):
+				self.assertAlmostEqual(counts[item] / 2000, 0.3, delta=0.05)
+
+
+
+if __name__ == '__main__':
+	unittest.main()